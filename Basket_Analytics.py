@@ -0,0 +1,210 @@
+import os
+import hashlib
+import pandas as pd
+from scipy.stats import pearsonr, ttest_ind
+
+
+
+# === Paths ===
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+BASKET_CACHE_PATH = os.path.join(BASE_PATH, 'Cache', 'baskets')
+
+# ITU DataHub exports kept next to the code (see "Script Maps and Access Charts").
+# Each export holds several series (US$, %GNI and PPP prices; subscriptions as a count
+# and per 100 inhabitants), so every label keeps only the series code it stands for.
+BASKET_FILES = {
+    "Combo_Basket_%GNI": ("mobile-data-and-voice-low-consumption-basket_1753728231022.csv.zip", "i271mb_low_ts_GNI"),
+    "DataOnly_Basket_%GNI": ("data-only-mobile-broadband-basket_1753728368896.csv.zip", "i271mb_ts_GNI"),
+    "VoiceOnly_Basket_%GNI": ("mobile-cellular-low-usage-basket_1753728330158.csv.zip", "i154_MobLow_ts_GNI"),
+    "Avg_Mobile_Subscriptions": ("mobile-cellular-subscriptions_1753728062739.csv.zip", "i271"),
+    "Avg_Population": ("total-population_1753731141449.csv.zip", "i61"),
+}
+
+# Only the columns the analyses use, with compact dtypes
+CSV_COLUMNS = {
+    "seriesCode": "category",
+    "entityIso": "category",
+    "entityName": "category",
+    "dataYear": "Int16",
+    "dataValue": "float64",
+}
+CHUNK_SIZE = 50_000
+
+# --- Region & dev status mapping (as in the notebook)
+REGION_MAP = {
+    "India": "Asia", "China": "Asia", "Bangladesh": "Asia", "Pakistan": "Asia",
+    "Kenya": "Africa", "Nigeria": "Africa", "Ethiopia": "Africa", "South Africa": "Africa",
+    "Brazil": "Americas", "Mexico": "Americas", "United States": "Americas", "Haiti": "Americas",
+    "Germany": "Europe", "France": "Europe", "Ukraine": "Europe", "Poland": "Europe"
+}
+
+DEV_STATUS_MAP = {
+    "India": "Developing", "Kenya": "Developing", "Bangladesh": "Developing",
+    "Nigeria": "Developing", "Ethiopia": "Developing", "Pakistan": "Developing",
+    "Brazil": "Developing", "South Africa": "Developing", "Haiti": "Developing",
+    "Germany": "Developed", "France": "Developed", "United States": "Developed", "Poland": "Developed"
+}
+
+try:
+    import pyarrow  # noqa: F401  optional, enables the Parquet cache
+    CACHE_FORMAT = "parquet"
+except ImportError:
+    CACHE_FORMAT = "pkl"
+
+
+
+# === Reading ===
+def read_series(path, series_code=None, chunksize=CHUNK_SIZE):
+    """
+    Read one ITU DataHub CSV in typed chunks, cleaning each chunk as it arrives
+    (other series, nulls and negative values dropped), then drop duplicate observations.
+    """
+    chunks = []
+    for chunk in pd.read_csv(path, usecols=list(CSV_COLUMNS), dtype=CSV_COLUMNS, chunksize=chunksize):
+        if series_code is not None:
+            chunk = chunk[chunk["seriesCode"] == series_code]
+        chunk = chunk.dropna(subset=["entityName", "dataValue", "dataYear"])
+        chunks.append(chunk[chunk["dataValue"] >= 0])
+    if not chunks:
+        return pd.DataFrame(columns=list(CSV_COLUMNS))
+    # Chunks carry different categories, so concat falls back to object; re-categorize once
+    data = pd.concat(chunks, ignore_index=True)
+    for col, dtype in CSV_COLUMNS.items():
+        if dtype == "category":
+            data[col] = data[col].astype("category")
+    return data.drop_duplicates(ignore_index=True)
+
+
+def _sources_key(files=BASKET_FILES, base_path=BASE_PATH):
+    # Cheap cache key: file names, sizes and modification times
+    digest = hashlib.sha1()
+    for label, (name, series_code) in sorted(files.items()):
+        stat = os.stat(os.path.join(base_path, name))
+        digest.update(f"{label}|{name}|{series_code}|{stat.st_size}|{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()[:20]
+
+
+def _read_cache(path):
+    return pd.read_parquet(path) if CACHE_FORMAT == "parquet" else pd.read_pickle(path)
+
+
+def _write_cache(data, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if CACHE_FORMAT == "parquet":
+        data.to_parquet(path, index=False)
+    else:
+        data.to_pickle(path)
+
+
+def load_baskets(files=BASKET_FILES, base_path=BASE_PATH, use_cache=True, cache_path=BASKET_CACHE_PATH):
+    """
+    All series in one long table: Series, seriesCode, entityIso, entityName, dataYear, dataValue.
+    """
+    cache_file = os.path.join(cache_path, f"baskets_{_sources_key(files, base_path)}.{CACHE_FORMAT}")
+    if use_cache and os.path.exists(cache_file):
+        return _read_cache(cache_file)
+
+    frames = [
+        read_series(os.path.join(base_path, name), series_code).assign(Series=label)
+        for label, (name, series_code) in files.items()
+    ]
+    long_data = pd.concat(frames, ignore_index=True)
+    for col in ["Series", "seriesCode", "entityIso", "entityName"]:
+        long_data[col] = long_data[col].astype("category")
+
+    if use_cache:
+        _write_cache(long_data, cache_file)
+    return long_data
+
+
+# === Merged basket / GNI table ===
+def merge_summary(long_data, years=None):
+    """
+    Per-country averages of every series joined in a single pass (replaces the pairwise
+    functools.reduce merges and the merged_summary.csv round-trip), plus per-capita ratios
+    and the region / development status used by the hypothesis tests.
+    """
+    if years is not None:
+        long_data = long_data[long_data["dataYear"].isin(list(years))]
+
+    # One groupby over all series, one hash join on entityName via unstack
+    merged = (long_data.groupby(["entityName", "Series"], observed=True)["dataValue"].mean()
+              .unstack("Series")
+              .reindex(columns=list(BASKET_FILES)))
+    merged.columns.name = None
+    merged = merged.reset_index()
+    merged["entityName"] = merged["entityName"].astype(str)
+
+    merged["Region"] = merged["entityName"].map(REGION_MAP)
+    merged["Development_Status"] = merged["entityName"].map(DEV_STATUS_MAP)
+
+    # --- Per capita calculations
+    merged["Mobile_Sub_per_Capita"] = merged["Avg_Mobile_Subscriptions"] / merged["Avg_Population"]
+    merged["GNI_proxy"] = 1 / merged["Combo_Basket_%GNI"]
+    return merged
+
+
+def load_merged(use_cache=True, cache_path=BASKET_CACHE_PATH):
+    """
+    Cached merged basket / GNI table, so top-N and hypothesis tests start instantly.
+    """
+    cache_file = os.path.join(cache_path, f"merged_{_sources_key()}.{CACHE_FORMAT}")
+    if use_cache and os.path.exists(cache_file):
+        return _read_cache(cache_file)
+
+    merged = merge_summary(load_baskets(use_cache=use_cache, cache_path=cache_path))
+    if use_cache:
+        _write_cache(merged, cache_file)
+    return merged
+
+
+# === Analyses ===
+def top_n(long_data, series, year, n=15, most=True):
+    """
+    Top (or bottom) n countries of one series in one year, e.g. the most expensive data baskets.
+    """
+    sub = long_data[(long_data["Series"] == series) & (long_data["dataYear"] == year)]
+    sub = sub[["entityName", "dataValue"]]
+    picked = sub.nlargest(n, "dataValue") if most else sub.nsmallest(n, "dataValue")
+    return picked.rename(columns={"entityName": "Country", "dataValue": series}).reset_index(drop=True)
+
+
+def hypothesis_tests(merged):
+    """
+    The notebook's hypotheses that the bundled files support. The internet-subscription
+    hypotheses (H1, H4, H6) need a series that is not among the bundled exports.
+    """
+    df_clean = merged.dropna(subset=[
+        "Combo_Basket_%GNI", "DataOnly_Basket_%GNI",
+        "Mobile_Sub_per_Capita", "Development_Status", "Region"
+    ])
+
+    results = []
+    dev = df_clean[df_clean["Development_Status"] == "Developing"]["DataOnly_Basket_%GNI"]
+    devd = df_clean[df_clean["Development_Status"] == "Developed"]["DataOnly_Basket_%GNI"]
+    t2, p2 = ttest_ind(dev, devd, nan_policy="omit")
+    results.append(("H2", "Developing countries pay more for internet", None, p2, t2))
+
+    africa = df_clean[df_clean["Region"] == "Africa"]["DataOnly_Basket_%GNI"]
+    europe = df_clean[df_clean["Region"] == "Europe"]["DataOnly_Basket_%GNI"]
+    t3, p3 = ttest_ind(africa, europe, nan_policy="omit")
+    results.append(("H3", "Africa pays more for internet than Europe", None, p3, t3))
+
+    r5, p5 = pearsonr(df_clean["GNI_proxy"], df_clean["Mobile_Sub_per_Capita"])
+    results.append(("H5", "Higher GNI → More Mobile Subscriptions", r5, p5, None))
+
+    asia = df_clean[df_clean["Region"] == "Asia"]["DataOnly_Basket_%GNI"]
+    americas = df_clean[df_clean["Region"] == "Americas"]["DataOnly_Basket_%GNI"]
+    t7, p7 = ttest_ind(asia, americas, nan_policy="omit")
+    results.append(("H7", "Asia vs Americas (Internet Cost)", None, p7, t7))
+
+    r8, p8 = pearsonr(df_clean["GNI_proxy"], df_clean["Combo_Basket_%GNI"])
+    results.append(("H8", "Higher GNI → Lower Mobile Cost", r8, p8, None))
+
+    return pd.DataFrame(results, columns=["Hypothesis", "Description", "r", "p", "t"])
+
+
+
+# === Module Guard ===
+if __name__ == "__main__":
+    print("This is a helper module. Please run ITU_Main.py instead.")
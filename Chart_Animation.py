@@ -0,0 +1,247 @@
+import shutil
+import subprocess
+import numpy as np
+import matplotlib
+import matplotlib.pyplot as plt
+from PIL import Image
+
+from Create_Charts import (ANIMATED_CHART_TYPES, build_palette, chart_data_for, with_int_years,
+                           y_axis_label, y_tick_formatter, map_values, map_figure, update_map, numbered_chart_base)
+
+
+
+# 1080p frames: 12.8 x 7.2 inches at 150 dpi, close to the 14-inch stills so type sizes match
+FRAME_SIZE = (1920, 1080)
+FRAME_DPI = 150
+FRAME_SECONDS = 0.8  # one selected year per frame
+HOLD_FRAMES = 3  # the last year stays on screen this many frames longer
+ANIMATION_FORMATS = ("gif", "mp4")
+
+
+
+def select_animation_format():
+    print("\nSave animation as:")
+    print("1. GIF")
+    print("2. MP4 (needs ffmpeg)")
+    format_input = input("Select format (Enter for GIF): ").strip().lower()
+    if format_input in ("2", "mp4"):
+        return "mp4"
+    return "gif"
+
+
+def ffmpeg_path():
+    return shutil.which(matplotlib.rcParams["animation.ffmpeg_path"])
+
+
+# === Figures with in-place updates ===
+# Each builder draws everything that stays the same (axes, ticks, legend, colorbar) once and
+# returns (fig, animated artists, update(k)); update only changes artist data for year k.
+def _frame_figure():
+    return plt.subplots(figsize=(FRAME_SIZE[0] / FRAME_DPI, FRAME_SIZE[1] / FRAME_DPI), dpi=FRAME_DPI)
+
+
+def _wide(chart_data, selected_years):
+    chart_data = chart_data.copy()
+    chart_data["Hue"] = chart_data["Country"] + " - " + chart_data["Indicator"]
+    hue_list = list(chart_data["Hue"].unique())
+    wide = chart_data.pivot_table(index="Year", columns="Hue", values="Value", aggfunc="first")
+    return wide.reindex(index=selected_years, columns=hue_list), build_palette(hue_list)
+
+
+def _finish_axes(fig, ax, selected_indicators, chart_type, mode, n_hues):
+    # Axis labels, tick format and bottom legend as in plot_chart
+    formatter = y_tick_formatter(selected_indicators, chart_type)
+    if formatter is not None:
+        ax.yaxis.set_major_formatter(formatter)
+    ax.set_ylabel(y_axis_label(selected_indicators, chart_type, mode))
+    ax.set_xlabel("Year")
+    ax.legend(title="", frameon=False, loc='upper center', bbox_to_anchor=(0.5, -0.2),
+              ncol=min(n_hues, 3), fontsize='small', handletextpad=0.5, columnspacing=1.0, borderaxespad=0.5)
+    # Year label above the axes; a placeholder reserves its room in the layout
+    label = ax.text(0, 1.02, "0000", transform=ax.transAxes, fontsize='large', fontweight='bold', va='bottom')
+    fig.tight_layout()
+    label.set_animated(True)
+    return label
+
+
+def _value_limits(values, include_zero=False):
+    low, high = np.nanmin(values), np.nanmax(values)
+    if include_zero:
+        low, high = min(low, 0), max(high, 0)
+    pad = (high - low) * 0.05 or 1
+    return low - (0 if include_zero and low == 0 else pad), high + pad
+
+
+def _line_animation(chart_data, selected_indicators, selected_years, mode):
+    wide, palette = _wide(chart_data, selected_years)
+    years = np.asarray(selected_years, dtype=float)
+    fig, ax = _frame_figure()
+    series = []
+    for hue in wide.columns:
+        values = wide[hue].to_numpy(dtype=float)
+        line, = ax.plot([], [], marker="D", color=palette[hue], label=hue, animated=True)
+        series.append((line, values))
+    ax.set_xlim(years[0] - 0.5, years[-1] + 0.5)
+    ax.set_ylim(*_value_limits(wide.to_numpy(dtype=float)))
+    label = _finish_axes(fig, ax, selected_indicators, "line", mode, len(series))
+
+    def update(k):
+        for line, values in series:
+            shown = ~np.isnan(values[:k + 1])
+            line.set_data(years[:k + 1][shown], values[:k + 1][shown])
+        label.set_text(str(selected_years[k]))
+
+    return fig, [line for line, _ in series] + [label], update
+
+
+def _bar_animation(chart_data, selected_indicators, selected_years, mode):
+    wide, palette = _wide(chart_data, selected_years)
+    fig, ax = _frame_figure()
+    width = 0.8 / len(wide.columns)
+    positions = np.arange(len(selected_years))
+    series = []
+    for i, hue in enumerate(wide.columns):
+        bars = ax.bar(positions - 0.4 + width * (i + 0.5), np.zeros(len(positions)), width,
+                      color=palette[hue], label=hue)
+        for bar in bars:
+            bar.set_animated(True)
+        series.append((bars, np.nan_to_num(wide[hue].to_numpy(dtype=float))))
+    ax.set_xticks(positions, [str(year) for year in selected_years])
+    ax.set_xlim(-0.5, len(positions) - 0.5)
+    ax.set_ylim(*_value_limits(wide.to_numpy(dtype=float), include_zero=True))
+    label = _finish_axes(fig, ax, selected_indicators, "bar", mode, len(series))
+
+    def update(k):
+        for bars, heights in series:
+            bars[k].set_height(heights[k])
+        label.set_text(str(selected_years[k]))
+
+    # Bars of earlier years keep their height; all of them are redrawn over the background
+    return fig, [bar for bars, _ in series for bar in bars] + [label], update
+
+
+def _map_animation(chart_data, selected_indicators, selected_years, mode):
+    figsize = (FRAME_SIZE[0] / FRAME_DPI, FRAME_SIZE[1] / FRAME_DPI)
+    fig, ax, artists = map_figure(chart_data, selected_indicators, selected_years[0], figsize, FRAME_DPI)
+    fig.subplots_adjust(bottom=1.0 / figsize[1])  # stills get the colorbar label room from bbox_inches='tight'
+    animated = [artists["collection"], artists["points"], artists["label"]]
+    for artist in animated:
+        artist.set_animated(True)
+    year_values = [map_values(chart_data, year) for year in selected_years]
+
+    def update(k):
+        update_map(artists, year_values[k], str(selected_years[k]))
+
+    return fig, animated, update
+
+
+ANIMATION_BUILDERS = {
+    "line": _line_animation,
+    "bar": _bar_animation,
+    "map": _map_animation,
+}
+
+
+# === Frames ===
+def iter_frames(fig, animated, update, n_frames):
+    """
+    Blitted frames as RGB arrays: the static figure is drawn once and restored for every
+    frame, then only the animated artists are drawn on top of it.
+    """
+    canvas = fig.canvas
+    canvas.draw()  # animated artists are left out of this draw
+    background = canvas.copy_from_bbox(fig.bbox)
+    for k in range(n_frames):
+        canvas.restore_region(background)
+        update(k)
+        for artist in animated:
+            fig.draw_artist(artist)
+        yield np.asarray(canvas.buffer_rgba())[..., :3].copy()
+
+
+def write_gif(frames, path, frame_seconds=FRAME_SECONDS, hold=HOLD_FRAMES):
+    """
+    Encode RGB frames as a looping GIF. Frames share one palette and a frame identical to the
+    previous one only lengthens its duration; Pillow stores each later frame as the changed
+    rectangle only, so a growing chart costs a fraction of a full frame.
+    """
+    images, durations, previous, palette = [], [], None, None
+    for frame in frames:
+        if previous is not None and np.array_equal(frame, previous):
+            durations[-1] += frame_seconds * 1000
+            continue
+        image = Image.fromarray(frame)
+        if palette is None:
+            palette = image.quantize(colors=255, method=Image.Quantize.MEDIANCUT)
+        images.append(image.quantize(palette=palette, dither=Image.Dither.NONE))
+        durations.append(frame_seconds * 1000)
+        previous = frame
+    durations[-1] += hold * frame_seconds * 1000
+    images[0].save(path, save_all=True, append_images=images[1:], duration=[round(d) for d in durations],
+                   loop=0, optimize=False, disposal=1)
+    return path
+
+
+def write_mp4(frames, path, frame_seconds=FRAME_SECONDS, hold=HOLD_FRAMES):
+    """
+    Stream raw RGB frames to ffmpeg (H.264) while they are rendered.
+    """
+    ffmpeg = ffmpeg_path()
+    if ffmpeg is None:
+        raise RuntimeError("ffmpeg not found.")
+    width, height = FRAME_SIZE
+    command = [
+        ffmpeg, "-y", "-loglevel", "error",
+        "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}", "-r", f"{1 / frame_seconds:g}", "-i", "-",
+        "-vcodec", "libx264", "-pix_fmt", "yuv420p", "-crf", "20", path,
+    ]
+    process = subprocess.Popen(command, stdin=subprocess.PIPE)
+    try:
+        frame = None
+        for frame in frames:
+            process.stdin.write(frame.tobytes())
+        for _ in range(hold if frame is not None else 0):
+            process.stdin.write(frame.tobytes())
+    finally:
+        process.stdin.close()
+        if process.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed with exit code {process.returncode}.")
+    return path
+
+
+# === Export ===
+def render_animation(df, charts_path, selected_indicators, selected_years, chart_type, selected_names,
+                     mode="total", animation_format="gif"):
+    """
+    One frame per selected year of a line, bar or map chart, saved as a numbered GIF or MP4
+    next to the charts. MP4 falls back to GIF without ffmpeg. Returns the path, or None without data.
+    """
+    if chart_type not in ANIMATED_CHART_TYPES:
+        raise ValueError(f"'{chart_type}' charts cannot be animated.")
+    selected_years = sorted(selected_years)
+    chart_data = chart_data_for(with_int_years(df), selected_indicators, selected_years, chart_type,
+                                selected_names, mode)
+    if chart_data.empty:
+        print("❌ No data for any selected indicator.")
+        return None
+    if animation_format == "mp4" and ffmpeg_path() is None:
+        print("⚠️ ffmpeg not found, saving the animation as GIF.")
+        animation_format = "gif"
+
+    fig, animated, update = ANIMATION_BUILDERS[chart_type](chart_data, selected_indicators, selected_years, mode)
+    path = f"{numbered_chart_base(charts_path, selected_indicators, selected_names, animation_format)}.{animation_format}"
+    try:
+        frames = iter_frames(fig, animated, update, len(selected_years))
+        if animation_format == "mp4":
+            write_mp4(frames, path)
+        else:
+            write_gif(frames, path)
+    finally:
+        plt.close(fig)
+    return path
+
+
+
+# === Module Guard ===
+if __name__ == "__main__":
+    print("This is a helper module. Please run ITU_Main.py instead.")
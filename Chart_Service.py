@@ -0,0 +1,287 @@
+import os
+import json
+import hashlib
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, urlencode
+from urllib.request import Request, urlopen
+from urllib.error import HTTPError
+import matplotlib.pyplot as plt
+
+from Create_Charts import (INDICATORS, CHART_TYPE_MAP, MAP_NAME, with_int_years, available_years, entity_options,
+                           data_hash, spec_chart_data, plot_chart, write_chart_files, _init_render_worker)
+from Indicator_Registry import AGGREGATION_MODES
+
+
+
+# === Paths ===
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+SERVICE_CACHE_PATH = os.path.join(BASE_PATH, 'Cache', 'service')
+
+SERVICE_HOST = "127.0.0.1"  # local only
+SERVICE_PORT = 8765
+SERVICE_FORMATS = {"png": "image/png", "jpeg": "image/jpeg", "svg": "image/svg+xml", "pdf": "application/pdf"}
+RENDER_TIMEOUT = 120  # seconds a request waits for its chart
+MAX_AGE = 300  # seconds clients may reuse a chart before revalidating with its ETag
+# type= takes the menu numbers and names as well as the canonical names ("facet", "100_stacked")
+CHART_TYPES = {**CHART_TYPE_MAP, **{chart_type: chart_type for chart_type in CHART_TYPE_MAP.values()}}
+
+
+
+class ChartRequestError(ValueError):
+    """Query parameters that do not describe a chart (HTTP 400)."""
+
+
+# === Chart specs ===
+def _values(query, name):
+    # "a,b" and repeated "name=a&name=b" are the same list
+    return [part.strip() for value in query.get(name, []) for part in value.split(",") if part.strip()]
+
+
+def _lookup(tokens, options, what):
+    by_key = {option.lower(): option for option in options}
+    unknown = [token for token in tokens if token.lower() not in by_key]
+    if unknown:
+        raise ChartRequestError(f"Unknown {what}: {', '.join(unknown)}.")
+    return list(dict.fromkeys(by_key[token.lower()] for token in tokens))
+
+
+def _years(tokens, years):
+    selected = set()
+    for token in tokens:
+        try:
+            if "-" in token:
+                start, end = (int(part) for part in token.split("-", 1))
+                selected.update(range(start, end + 1))
+            else:
+                selected.add(int(token))
+        except ValueError:
+            raise ChartRequestError(f"Invalid year: {token}.") from None
+    return sorted(selected & set(years))
+
+
+def canonical_spec(query, years, names):
+    """
+    Chart spec of a query ({"indicators": [...], "names": [...], "years": [...], "type", "mode"}),
+    normalized so that spellings of the same chart (case, number vs name, "2008-2010" vs
+    "2008,2009,2010", duplicates) give the same spec. Raises ChartRequestError.
+    """
+    indicators = [INDICATORS.get(token, token) for token in _values(query, "indicators")]
+    selected_indicators = _lookup(indicators, INDICATORS.values(), "indicator")
+    year_tokens = _values(query, "years")
+    selected_years = list(years) if year_tokens in ([], ["all"]) else _years(year_tokens, years)
+    chart_type = CHART_TYPES.get((_values(query, "type") or ["line"])[0].lower())
+    mode = (_values(query, "mode") or ["total"])[0].lower()
+
+    if not selected_indicators:
+        raise ChartRequestError("Missing 'indicators'.")
+    if not selected_years:
+        raise ChartRequestError("No data years selected.")
+    if chart_type is None:
+        raise ChartRequestError(f"Unknown chart type; use one of {', '.join(sorted(set(CHART_TYPES.values())))}.")
+    if mode not in AGGREGATION_MODES:
+        raise ChartRequestError(f"Unknown mode; use one of {', '.join(AGGREGATION_MODES)}.")
+    if chart_type in ("pie", "map") and len(selected_years) != 1:
+        raise ChartRequestError(f"A {chart_type} chart needs exactly one year.")
+
+    if chart_type == "map":
+        selected_indicators, selected_names, mode = selected_indicators[:1], [MAP_NAME], "total"
+    else:
+        selected_names = _lookup(_values(query, "names"), names, "name")
+        if not selected_names:
+            raise ChartRequestError("Missing 'names'.")
+    return {
+        "selected_indicators": selected_indicators, "selected_years": selected_years,
+        "chart_type": chart_type, "selected_names": selected_names, "mode": mode,
+    }
+
+
+def spec_key(spec, output_format, df_hash):
+    # Cache key and ETag: the canonical spec, the file format and the data it was drawn from
+    canonical = json.dumps({"spec": spec, "format": output_format, "data": df_hash}, sort_keys=True)
+    return hashlib.sha1(canonical.encode()).hexdigest()[:24]
+
+
+def render_chart_file(chart_data, spec, path):
+    """
+    Pool worker: draw one chart and move it into the cache only once it is complete.
+    """
+    fig, _ = plot_chart(chart_data, spec["selected_indicators"], spec["selected_years"], spec["chart_type"],
+                        spec["mode"])
+    folder, name = os.path.split(path)
+    tmp_path = os.path.join(folder, f".{os.getpid()}.{name}")
+    try:
+        write_chart_files(fig, tmp_path)
+    finally:
+        plt.close(fig)
+    os.replace(tmp_path, path)
+    return path
+
+
+# === Service ===
+class ChartService:
+    """
+    The chart engine behind a cache: identical requests share one render (the first
+    request renders, concurrent ones wait on its future), finished charts are files in
+    Cache/service keyed by spec and data hash, and renders run on a process pool.
+    """
+
+    def __init__(self, df, cache_path=SERVICE_CACHE_PATH, max_workers=None):
+        self.df = with_int_years(df)
+        self.df_hash = data_hash(self.df)
+        self.years = [int(year) for year in available_years(self.df)]
+        countries, income_groups, regions = entity_options(self.df)
+        self.names = countries + income_groups + regions + ["World"]
+        self.cache_path = cache_path
+        os.makedirs(cache_path, exist_ok=True)
+        self.pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_render_worker)
+        self.lock = threading.Lock()
+        self.inflight = {}
+        self.stats = {"hits": 0, "renders": 0, "coalesced": 0, "empty": 0}
+
+    def chart(self, query, output_format="png"):
+        """
+        (ETag, file path or None without data) of the chart a query asks for.
+        """
+        if output_format not in SERVICE_FORMATS:
+            raise ChartRequestError(f"Unknown format; use one of {', '.join(SERVICE_FORMATS)}.")
+        spec = canonical_spec(query, self.years, self.names)
+        key = spec_key(spec, output_format, self.df_hash)
+        path = os.path.join(self.cache_path, f"{key}.{output_format}")
+
+        with self.lock:
+            future = self.inflight.get(key)
+            if future is not None:
+                self.stats["coalesced"] += 1
+                leader = False
+            elif os.path.exists(path):
+                self.stats["hits"] += 1
+                return key, path
+            else:
+                future = self.inflight[key] = Future()
+                leader = True
+
+        if leader:
+            try:
+                future.set_result(self._render(spec, path))
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                with self.lock:
+                    del self.inflight[key]
+        return key, future.result(timeout=RENDER_TIMEOUT)
+
+    def _render(self, spec, path):
+        chart_data = spec_chart_data(self.df, spec)  # aggregation is memoized per data hash
+        if chart_data.empty:
+            with self.lock:
+                self.stats["empty"] += 1
+            return None
+        self.pool.submit(render_chart_file, chart_data, spec, path).result(timeout=RENDER_TIMEOUT)
+        with self.lock:
+            self.stats["renders"] += 1
+        return path
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+class ChartRequestHandler(BaseHTTPRequestHandler):
+    """
+    GET /chart.png?indicators=ARPU&names=Africa,Europe&years=2008-2023&type=line[&mode=total]
+    (also .jpeg, .svg, .pdf), GET /health and GET /stats.
+    """
+    server_version = "ITUChartService/1.0"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        service = self.server.service
+        if url.path == "/health":
+            return self._send_json(200, {"status": "ok", "data": service.df_hash[:12]})
+        if url.path == "/stats":
+            with service.lock:
+                return self._send_json(200, dict(service.stats, inflight=len(service.inflight)))
+        if not url.path.startswith("/chart."):
+            return self._send_json(404, {"error": "Use /chart.png, /chart.jpeg, /chart.svg or /chart.pdf."})
+
+        try:
+            etag, path = service.chart(parse_qs(url.query), url.path.split(".", 1)[1])
+        except ChartRequestError as e:
+            return self._send_json(400, {"error": str(e)})
+        except Exception as e:
+            return self._send_json(500, {"error": f"Chart rendering failed: {e}"})
+        if path is None:
+            return self._send_json(404, {"error": "No data for the selected indicators and names."})
+
+        etag = f'"{etag}"'
+        headers = {"ETag": etag, "Cache-Control": f"public, max-age={MAX_AGE}"}
+        if etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            return self._send(304, b"", None, headers)
+        with open(path, "rb") as f:
+            body = f.read()
+        self._send(200, body, SERVICE_FORMATS[os.path.splitext(path)[1].lstrip(".")], headers)
+
+    def _send_json(self, status, payload):
+        self._send(status, json.dumps(payload).encode(), "application/json")
+
+    def _send(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # dashboards poll; keep the menu quiet
+
+
+def start_service(df, host=SERVICE_HOST, port=SERVICE_PORT, cache_path=SERVICE_CACHE_PATH, max_workers=None):
+    """
+    Serve charts of df on a background thread. port=0 picks a free port (see server.server_address).
+    Returns the server; stop it with stop_service(server).
+    """
+    server = ThreadingHTTPServer((host, port), ChartRequestHandler)
+    server.daemon_threads = True
+    server.service = ChartService(df, cache_path, max_workers)
+    threading.Thread(target=server.serve_forever, name="chart-service", daemon=True).start()
+    return server
+
+
+def stop_service(server):
+    server.shutdown()
+    server.server_close()
+    server.service.close()
+
+
+def service_url(server):
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+# === Local client ===
+def fetch_chart(base_url, etag=None, timeout=RENDER_TIMEOUT, **params):
+    """
+    GET a chart from a running service, e.g. fetch_chart(url, indicators="ARPU", names="Africa,Europe",
+    years="2008-2023", type="line"). Pass the previous ETag to revalidate.
+    Returns (status, ETag, body); body is empty for 304 Not Modified.
+    """
+    output_format = params.pop("format", "png")
+    request = Request(f"{base_url}/chart.{output_format}?{urlencode(params)}")
+    if etag:
+        request.add_header("If-None-Match", etag)
+    try:
+        with urlopen(request, timeout=timeout) as response:
+            return response.status, response.headers.get("ETag"), response.read()
+    except HTTPError as e:
+        return e.code, e.headers.get("ETag"), e.read()
+
+
+
+# === Module Guard ===
+if __name__ == "__main__":
+    print("This is a helper module. Please run ITU_Main.py instead.")
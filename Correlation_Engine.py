@@ -0,0 +1,181 @@
+import os
+import re
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+import seaborn as sns
+from matplotlib.colors import LinearSegmentedColormap
+from scipy import special
+
+from Create_Charts import INDICATORS, indicator_labels, aggregate_all_entities, data_hash, save_chart
+
+
+
+# === Paths ===
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+CHARTS_PATH = os.path.join(BASE_PATH, 'Charts')
+CORRELATION_CACHE_PATH = os.path.join(BASE_PATH, 'Cache', 'correlations')
+
+# Same comparability window as the rest of the analysis
+ANALYSIS_YEARS = list(range(2008, 2024))
+MIN_OBSERVATIONS = 3
+
+# Diverging palette in the presentation colours: navy (-1) to white (0) to crimson (+1)
+CORRELATION_CMAP = LinearSegmentedColormap.from_list("itu_corr", ["#203864", "#FFFFFF", "#C00000"])
+
+
+
+# === Entity x Year x Indicator array ===
+def build_panel(df, indicators=None, years=None):
+    """
+    Aggregate every entity and pivot into a dense float array of shape (entity, year, indicator).
+    Missing values are NaN. Returns (panel, entities, levels, years, indicators).
+    """
+    indicators = list(indicators or INDICATORS.values())
+    years = list(years or ANALYSIS_YEARS)
+
+    long_data = aggregate_all_entities(df, indicators, years)
+    levels = long_data.drop_duplicates("Country").set_index("Country")["Level"]
+    entities = list(levels.index)
+
+    wide = long_data.pivot_table(index=["Country", "Year"], columns="Indicator", values="Value", aggfunc="first")
+    full_index = pd.MultiIndex.from_product([entities, years], names=["Country", "Year"])
+    wide = wide.reindex(index=full_index, columns=indicators)
+
+    panel = wide.to_numpy(dtype=float).reshape(len(entities), len(years), len(indicators))
+    return panel, entities, list(levels.values), years, indicators
+
+
+# === Vectorized pairwise statistics ===
+def pairwise_stats(panel):
+    """
+    Pearson r, OLS slope/intercept (y on x), p-value and n for every indicator pair of every entity.
+    Uses pairwise-complete years. All outputs have shape (entity, indicator_x, indicator_y).
+    """
+    x = panel[:, :, :, None]
+    y = panel[:, :, None, :]
+    valid = ~np.isnan(x) & ~np.isnan(y)
+
+    n = valid.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_x = np.where(valid, x, 0.0).sum(axis=1) / n
+        mean_y = np.where(valid, y, 0.0).sum(axis=1) / n
+        dx = np.where(valid, x - mean_x[:, None], 0.0)
+        dy = np.where(valid, y - mean_y[:, None], 0.0)
+
+        sxx = (dx * dx).sum(axis=1)
+        syy = (dy * dy).sum(axis=1)
+        sxy = (dx * dy).sum(axis=1)
+
+        r = sxy / np.sqrt(sxx * syy)
+        r = np.clip(r, -1.0, 1.0)
+        slope = sxy / sxx
+        intercept = mean_y - slope * mean_x
+
+        # Two-sided p-value of r from the t distribution with n - 2 degrees of freedom
+        dof = n - 2
+        t = r * np.sqrt(dof / np.maximum(1.0 - r * r, 1e-300))
+        p = 2.0 * special.stdtr(dof, -np.abs(t))
+
+    too_few = n < MIN_OBSERVATIONS
+    for arr in (r, slope, intercept, p):
+        arr[too_few] = np.nan
+    return {"n": n, "r": r, "p": p, "slope": slope, "intercept": intercept}
+
+
+def summary_table(stats, entities, levels, indicators):
+    """
+    Flatten the pairwise statistics into one row per (entity, x, y) with x != y.
+    """
+    n_ent, n_ind = len(entities), len(indicators)
+    ent_idx, x_idx, y_idx = np.meshgrid(np.arange(n_ent), np.arange(n_ind), np.arange(n_ind), indexing="ij")
+    keep = (x_idx != y_idx).ravel()
+
+    table = pd.DataFrame({
+        "Entity": np.asarray(entities, dtype=object)[ent_idx.ravel()],
+        "Level": np.asarray(levels, dtype=object)[ent_idx.ravel()],
+        "X": np.asarray(indicators, dtype=object)[x_idx.ravel()],
+        "Y": np.asarray(indicators, dtype=object)[y_idx.ravel()],
+        "n": stats["n"].ravel(),
+        "r": stats["r"].ravel(),
+        "p": stats["p"].ravel(),
+        "slope": stats["slope"].ravel(),
+        "intercept": stats["intercept"].ravel(),
+    })
+    return table[keep].reset_index(drop=True)
+
+
+def correlate_all(df, indicators=None, years=None, use_cache=True, cache_path=CORRELATION_CACHE_PATH):
+    """
+    Screen every indicator pair for every entity in one pass. Results are cached by data hash.
+    """
+    indicators = list(indicators or INDICATORS.values())
+    years = list(years or ANALYSIS_YEARS)
+    key = data_hash(df) + "_" + re.sub(r'\W+', '', "_".join(indicators)) + f"_{years[0]}_{years[-1]}_{len(years)}"
+    cache_file = os.path.join(cache_path, f"{key}.pkl")
+    if use_cache and os.path.exists(cache_file):
+        return pd.read_pickle(cache_file)
+
+    panel, entities, levels, years, indicators = build_panel(df, indicators, years)
+    table = summary_table(pairwise_stats(panel), entities, levels, indicators)
+
+    if use_cache:
+        os.makedirs(cache_path, exist_ok=True)
+        table.to_pickle(cache_file)
+    return table
+
+
+def correlation_matrix(table, entity="World"):
+    """
+    Indicator x indicator matrix of r for one entity from a correlate_all table.
+    """
+    sub = table[table["Entity"] == entity]
+    matrix = sub.pivot(index="Y", columns="X", values="r")
+    order = [ind for ind in INDICATORS.values() if ind in matrix.index]
+    matrix = matrix.reindex(index=order, columns=order)
+    for ind in order:
+        matrix.loc[ind, ind] = 1.0
+    return matrix
+
+
+# === Outputs ===
+def plot_correlation_heatmap(table, entity="World", charts_path=CHARTS_PATH):
+    """
+    Save the correlation matrix of one entity as a heatmap (JPEG and PNG) and return the paths.
+    """
+    matrix = correlation_matrix(table, entity)
+    labels = [indicator_labels.get(ind, ind) for ind in matrix.index]
+
+    fig, ax = plt.subplots(figsize=(14, 6))
+    sns.heatmap(matrix, annot=True, fmt=".2f", vmin=-1, vmax=1, cmap=CORRELATION_CMAP,
+                xticklabels=labels, yticklabels=labels, cbar_kws={"label": "r"}, ax=ax)
+    ax.set_xlabel("")
+    ax.set_ylabel("")
+    ax.set_title(f"Correlation of Key Indicators, {entity}")
+    ax.tick_params(axis='x', labelrotation=0)
+    fig.tight_layout()
+
+    os.makedirs(charts_path, exist_ok=True)
+    # Numbered like every other chart, e.g. Charts/Correlations_World_2.jpeg
+    paths = save_chart(fig, charts_path, ["Correlations"], [entity])
+    plt.close(fig)
+    return paths
+
+
+def save_summary(table, path):
+    table.to_csv(path, index=False, float_format="%.6g")
+    return path
+
+
+def strongest_pairs(table, top=15, max_p=0.05):
+    """
+    Strongest significant relationships across all entities, one row per unordered pair.
+    """
+    sig = table[(table["p"] <= max_p) & (table["X"] < table["Y"])]
+    return sig.reindex(sig["r"].abs().sort_values(ascending=False).index).head(top)
+
+
+
+# === Module Guard ===
+if __name__ == "__main__":
+    print("This is a helper module. Please run ITU_Main.py instead.")
@@ -1,18 +1,28 @@
 import os
 import re
 import math
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.ticker as mtick
-from matplotlib.colors import to_rgb, to_hex
+from matplotlib.transforms import blended_transform_factory
+from matplotlib.colors import to_rgb, to_hex, LinearSegmentedColormap, Normalize
+from matplotlib.collections import PolyCollection
 import colorsys
+from PIL import Image
 import seaborn as sns
 from seaborn import light_palette, dark_palette
-from adjustText import adjust_text
-import tkinter as tk
-from tkinter import filedialog, Tk, Toplevel, Label, Button 
-from PIL import Image, ImageTk
 import itertools
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from Lineage import record_chart
+from Slide_Builder import svg_fallback_path
+from Label_Placement import spread_positions, place_point_labels
+from World_Map import projected_geometry
+from Parquet_Store import is_store
+from Indicator_Registry import INDICATOR_REGISTRY, AGGREGATION_MODES, evaluate_wide, group_means
 
 
 
@@ -33,230 +43,428 @@ plt.rcParams.update({
     'font.family': 'Calibri'
 })
 
-indicator_labels = {
-    "ARPU": "ARPU (US$)",
-    "Market Size": "Market Size (Billions)",
-    "Penetration Rate": "Penetration Rate (%)",
-    "Population": "Population (Millions)",
-    "Subscribers": "Subscribers (Millions)",
+# Indicators, labels and unit scaling come from the declarative registry
+indicator_labels = {name: spec["label"] for name, spec in INDICATOR_REGISTRY.items()}
+
+INDICATORS = {str(i): name for i, name in enumerate(INDICATOR_REGISTRY, 1)}
+SUM_INDICATORS = [name for name, spec in INDICATOR_REGISTRY.items() if spec["aggregate"] == "sum"]
+
+CHART_TYPE_MAP = {
+    "1": "line", "line": "line",
+    "2": "bar", "bar": "bar",
+    "3": "stacked", "stacked column": "stacked",
+    "4": "100_stacked", "100%": "100_stacked",
+    "5": "pie", "pie": "pie",
+    "6": "scatter", "scatter": "scatter",
+    "7": "facet", "small multiples": "facet",
+    "8": "map", "map": "map"
 }
+CHART_TYPE_NAMES = {
+    "line": "Line", "bar": "Bar", "stacked": "Stacked Column", "100_stacked": "100% Stacked Column",
+    "pie": "Pie", "scatter": "Scatter", "facet": "Small multiples (one panel per country/region)",
+    "map": "World map (all countries, one indicator)",
+}  # menu order, numbered as in CHART_TYPE_MAP
+ANIMATED_CHART_TYPES = ("line", "bar", "map")  # Chart_Animation: one frame per selected year
+GROUPING_CHART_TYPES = ("line", "bar", "stacked", "100_stacked", "pie", "scatter")  # render_grouping: one member per chart
+
+# Files written per chart: 300 dpi raster, or vector for print and the PDF version of decks
+CHART_FORMATS = {
+    "raster": ("jpeg", "png"),
+    "vector": ("svg", "pdf"),
+}
+RASTER_DPI = 300
+FALLBACK_DPI = 150  # PNG stand-in PowerPoint shows where it cannot draw the SVG
+
+# Glyphs are embedded as a subset of the used characters (SVG outlines, PDF TrueType),
+# and paths are simplified where points are closer than half a pixel
+VECTOR_RC = {
+    "svg.fonttype": "path",
+    "pdf.fonttype": 42,
+    "path.simplify": True,
+    "path.simplify_threshold": 0.5,
+    "svg.hashsalt": "ITU",
+}
+# No timestamps, so an unchanged chart saves to an identical file
+VECTOR_METADATA = {"svg": {"Date": None}, "pdf": {"CreationDate": None}}
 
-def create(df, charts_path):
-    indicators = {
-        "1": "ARPU",
-        "2": "Population",
-        "3": "Subscribers",
-        "4": "Market Size",
-        "5": "Penetration Rate"
-    }
-    SUM_INDICATORS = ["Population", "Subscribers", "Market Size"]
+GROUPING_COLUMNS = {
+    "1": "ITU Region",
+    "2": "WB Income Group",
+    "3": "Country"
+}
 
-    # --- Select indicator(s)
+# --- Color palette
+BASE_COLORS = ["#C00000", "#FF6600", "#203864"]
+
+
+# --- Color palette: proportional lighter shades
+def create_mixed_color_grades_from_base(base_colors, grades_per_color=5, sets=3):
+    """
+    Start with original base colors, then generate progressively lighter shades.
+    """
+    all_colors = []
+
+    for s in range(sets):
+        for i in range(grades_per_color):
+            for color in base_colors:
+                # Convert hex to RGB
+                rgb = tuple(int(color[j:j+2], 16)/255 for j in (1, 3, 5))
+                h, l, s_ = colorsys.rgb_to_hls(*rgb)
+
+                # Compute proportional lightness increment
+                # Lighter shades gradually go from current lightness to 1.0
+                step_multiplier = 1.8  # >1 = bigger steps, <1 = smaller steps
+                light_factor = l + (((1 - l) / (grades_per_color * sets - 1)) * (i + s*grades_per_color)) * step_multiplier
+
+                new_l = min(1.0, light_factor)
+
+                # Convert back to RGB and append
+                new_rgb = colorsys.hls_to_rgb(h, new_l, s_)
+                all_colors.append(to_hex(new_rgb))
+
+    return all_colors
+
+
+FULL_COLORS = create_mixed_color_grades_from_base(BASE_COLORS, grades_per_color=6, sets=3)
+
+
+def build_palette(hue_list):
+    color_repeat = (len(hue_list) // len(FULL_COLORS)) + 1
+    return dict(zip(hue_list, (FULL_COLORS * color_repeat)[:len(hue_list)]))
+
+
+# === Selection prompts ===
+def parse_number_input(input_str):
+    """
+    Parse '1,3-5' style input into a set of integers.
+    """
+    numbers = set()
+    for part in input_str.split(','):
+        if '-' in part:
+            start, end = part.split('-')
+            numbers.update(range(int(start), int(end) + 1))
+        else:
+            numbers.add(int(part.strip()))
+    return numbers
+
+
+def available_years(df):
+    if is_store(df):
+        return sorted(int(year) for year in df.distinct(["Year"])["Year"])
+    years = pd.to_numeric(df["Year"], errors='coerce').dropna().astype(int)
+    # Plain ints: the selected years end up in JSON lineage specs
+    return sorted(int(year) for year in years.unique())
+
+
+def entity_options(df):
+    if is_store(df):
+        return tuple(list(df.distinct([level])[level]) for level in ["Country", "WB Income Group", "ITU Region"])
+    countries = sorted(df["Country"].dropna().unique())
+    income_groups = sorted(df["WB Income Group"].dropna().unique())
+    regions = sorted(df["ITU Region"].dropna().unique())
+    return countries, income_groups, regions
+
+
+def entity_members(df, level):
+    """
+    Distinct (level, Country) pairs, e.g. the countries of each ITU region.
+    """
+    if is_store(df):
+        return df.distinct([level, "Country"])
+    return df[[level, "Country"]].dropna().drop_duplicates()
+
+
+def restrict(df, column, value):
+    # Rows of one group member; a Parquet store filters at the scan instead
+    if is_store(df):
+        return df.where(column, value)
+    return df[df[column] == value]
+
+
+def select_indicators():
     print("\nAvailable Indicators:")
-    for key, val in indicators.items():
+    for key, val in INDICATORS.items():
         print(f"{key}. {val}")
     indicator_input = input("Select indicator(s) (e.g., '1,3-4'): ").strip()
     try:
-        selected_inds = set()
-        for part in indicator_input.split(','):
-            if '-' in part:
-                start, end = part.split('-')
-                selected_inds.update(range(int(start), int(end) + 1))
-            else:
-                selected_inds.add(int(part.strip()))
-        selected_indicators = [indicators[str(i)] for i in selected_inds if str(i) in indicators]
+        selected_inds = parse_number_input(indicator_input)
+        return [INDICATORS[str(i)] for i in selected_inds if str(i) in INDICATORS]
     except Exception as e:
         print(f" Invalid indicator input: {e}")
-        return
+        return None
 
-    # --- Filter years
-    df = df.copy()
-    df["Year"] = pd.to_numeric(df["Year"], errors='coerce')
-    df.dropna(subset=["Year"], inplace=True)
-    df["Year"] = df["Year"].astype(int)
-    years = sorted(df["Year"].unique())
 
+def select_years(years):
     print("\nAvailable Years:")
     for i, yr in enumerate(years, 1):
         print(f"{i}. {yr}")
     year_input = input("Select years (e.g., 'all', '2008-2013', '2008,2010,2012'): ").strip()
     try:
         if year_input.lower() == "all":
-            selected_years = years
-        else:
-            selected_years = set()
-            for part in year_input.split(','):
-                if '-' in part:
-                    start, end = part.split('-')
-                    selected_years.update(range(int(start), int(end) + 1))
-                else:
-                    selected_years.add(int(part.strip()))
-            selected_years = sorted(set(selected_years).intersection(set(years)))
+            return years
+        return sorted(parse_number_input(year_input).intersection(set(years)))
     except Exception as e:
         print(f" Invalid year selection: {e}")
-        return
+        return None
 
-    # --- Chart type
-    print("\nSelect chart type:")
-    print("1. Line")
-    print("2. Bar")
-    print("3. Stacked Column")
-    print("4. 100% Stacked Column")
-    print("5. Pie")
-    print("6. Scatter")
-    chart_type_input = input("Select chart type (1-6 or name): ").strip().lower()
-    chart_type_map = {
-        "1": "line", "line": "line",
-        "2": "bar", "bar": "bar",
-        "3": "stacked", "stacked column": "stacked",
-        "4": "100_stacked", "100%": "100_stacked",
-        "5": "pie", "pie": "pie",
-        "6": "scatter", "scatter": "scatter"
-    }
-    chart_type = chart_type_map.get(chart_type_input, "line")
-    if chart_type == "pie" and len(selected_years) != 1:
-        print(" Pie chart requires exactly one year.")
-        return
-
-    # --- Country/region selection
-    countries = sorted(df["Country"].dropna().unique())
-    income_groups = sorted(df["WB Income Group"].dropna().unique())
-    regions = sorted(df["ITU Region"].dropna().unique())
-    all_options = countries + income_groups + regions + ["World"]
 
+def select_chart_type(selected_years, animated=False, chart_types=None):
+    offered = chart_types or CHART_TYPE_NAMES
+    print("\nSelect chart type:")
+    for idx, (chart_type, name) in enumerate(CHART_TYPE_NAMES.items(), 1):
+        if chart_type in offered and (not animated or chart_type in ANIMATED_CHART_TYPES):
+            print(f"{idx}. {name}")
+    chart_type_input = input("Select chart type (number or name): ").strip().lower()
+    chart_type = CHART_TYPE_MAP.get(chart_type_input, "line")
+    if chart_type not in offered:
+        print(f" Only {', '.join(offered)} charts are available here.")
+        return None
+    if animated:
+        if chart_type not in ANIMATED_CHART_TYPES:
+            print(f" Animations are available for {', '.join(ANIMATED_CHART_TYPES)} charts.")
+            return None
+        if len(selected_years) < 2:
+            print(" An animation needs at least two years.")
+            return None
+        return chart_type
+    if chart_type in ("pie", "map") and len(selected_years) != 1:
+        print(f" {chart_type.capitalize()} chart requires exactly one year.")
+        return None
+    return chart_type
+
+
+def select_aggregation_mode():
+    print("\nAggregate groups as:")
+    modes = list(AGGREGATION_MODES)
+    for idx, mode in enumerate(modes, 1):
+        print(f"{idx}. {AGGREGATION_MODES[mode]}")
+    mode_input = input("Select aggregation (Enter for totals): ").strip().lower()
+    if mode_input.isdigit() and 1 <= int(mode_input) <= len(modes):
+        return modes[int(mode_input) - 1]
+    return mode_input if mode_input in AGGREGATION_MODES else "total"
+
+
+def select_output_format():
+    print("\nSave charts as:")
+    print("1. Raster (JPEG + PNG, 300 dpi)")
+    print("2. Vector (SVG + PDF)")
+    format_input = input("Select format (Enter for raster): ").strip().lower()
+    if format_input in ("2", "vector", "svg", "pdf"):
+        return "vector"
+    return "raster"
+
+
+def select_names(all_options, ranking=None, selector=None):
+    if selector is not None:
+        return selector.prompt(all_options, ranking)
     print("\n Select countries/regions:")
     for idx, name in enumerate(all_options, 1):
         print(f"{idx}. {name}")
+    if ranking is not None:
+        print("Rankings can be mixed in, e.g. 'top10:Subscribers:2023' or 'bottom5:ARPU:2020:region'.")
     country_input = input("Enter numbers (e.g., 1,3-5): ").strip()
     try:
-        selected_nums = set()
+        ranked_names, number_parts = [], []
         for part in country_input.split(','):
-            if '-' in part:
-                start, end = part.split('-')
-                selected_nums.update(range(int(start), int(end) + 1))
-            else:
-                selected_nums.add(int(part.strip()))
+            if ranking is not None and ':' in part:
+                ranked_names += ranking.select(part)
+            elif part.strip():
+                number_parts.append(part)
+        selected_nums = parse_number_input(','.join(number_parts)) if number_parts else set()
         selected_names = [all_options[i - 1] for i in selected_nums if 1 <= i <= len(all_options)]
+        return selected_names + [name for name in ranked_names if name not in selected_names]
     except Exception as e:
         print(f" Invalid selection: {e}")
-        return
+        return None
 
-    # --- Prepare combined chart data
-    combined_chart_data = pd.DataFrame()
-    for selected_indicator in selected_indicators:
-        df_filtered = df[df["Year"].isin(selected_years)]
-        chart_data = pd.DataFrame()
-        for name in selected_names:
-            if name in countries:
-                sub = df_filtered[df_filtered["Country"] == name]
-            elif name in income_groups:
-                sub = df_filtered[df_filtered["WB Income Group"] == name]
-            elif name in regions:
-                sub = df_filtered[df_filtered["ITU Region"] == name]
-            elif name == "World":
-                sub = df_filtered
-            else:
-                continue
 
-            if selected_indicator == "ARPU":
-                ms = sub[sub["Key Indicator"] == "Market Size"].groupby("Year")["Value"].sum()
-                subs = sub[sub["Key Indicator"] == "Subscribers"].groupby("Year")["Value"].sum()
-                val = (ms / subs / 12).reset_index(name="Value")
-            elif selected_indicator == "Penetration Rate":
-                subs = sub[sub["Key Indicator"] == "Subscribers"].groupby("Year")["Value"].sum()
-                pop = sub[sub["Key Indicator"] == "Population"].groupby("Year")["Value"].sum()
-                val = (subs / pop).reset_index(name="Value")
-            else:
-                sub = sub[sub["Key Indicator"] == selected_indicator]
-                if selected_indicator in SUM_INDICATORS:
-                    val = sub.groupby("Year")["Value"].sum().reset_index()
-                else:
-                    val = sub.groupby("Year")["Value"].mean().reset_index()
-            val["Country"] = name
-            val["Indicator"] = selected_indicator
-            chart_data = pd.concat([chart_data, val], ignore_index=True)
-
-        if chart_data.empty:
-            print(f" No data for '{selected_indicator}'.")
+# === Chart data ===
+def scale_indicator_values(chart_data, indicator):
+    chart_data["Value"] = chart_data["Value"] * INDICATOR_REGISTRY[indicator]["scale"]
+    return chart_data
+
+
+_EVALUATION_CACHE = {}
+
+
+def evaluate_indicators(df, by, df_hash=None):
+    """
+    All registered indicators, base and derived, for every group of `by` and every year.
+    Memoized per (data hash, grouping), so repeated charts reuse the same evaluation.
+    """
+    by = list(by)
+    key = (df_hash or data_hash(df), tuple(by))
+    if key not in _EVALUATION_CACHE:
+        if is_store(df):
+            _EVALUATION_CACHE[key] = df.evaluate(by)
+        else:
+            _EVALUATION_CACHE[key] = evaluate_wide(df.dropna(subset=by), by)
+    return _EVALUATION_CACHE[key]
+
+
+def evaluate_grouping(df, group_column, mode="total", df_hash=None):
+    """
+    Wide table of all indicators per (group member, Year) in one aggregation mode.
+    "total" aggregates the raw rows; the mean modes average the country values, and
+    are computed together with one groupby per grouping column, then memoized.
+    """
+    if mode not in AGGREGATION_MODES:
+        raise ValueError(f"Unknown aggregation mode: {mode}")
+    if mode == "total" or group_column == "Country":
+        return evaluate_indicators(df, [group_column, "Year"], df_hash)
+
+    df_hash = df_hash or data_hash(df)
+    key = (df_hash, group_column, "means")
+    if key not in _EVALUATION_CACHE:
+        # Country values within each member, so a country only counts where its rows do
+        country_wide = evaluate_indicators(df, [group_column, "Country", "Year"], df_hash).reset_index()
+        _EVALUATION_CACHE[key] = group_means(country_wide, [group_column, "Year"])
+    return _EVALUATION_CACHE[key][mode]
+
+
+def aggregate_by_group(df, group_column, selected_indicators, selected_years, verbose=True, mode="total",
+                       df_hash=None):
+    """
+    Pre-aggregate the selected indicators for every member of group_column at once.
+    Returns the same long table as prepare_chart_data, with one "Country" per member.
+    """
+    wide = evaluate_grouping(df, group_column, mode, df_hash)
+    wide = wide[wide.index.get_level_values("Year").isin(selected_years)]
+
+    frames = []
+    for selected_indicator in selected_indicators:
+        val = wide[selected_indicator].dropna().reset_index(name="Value").rename(columns={group_column: "Country"})
+        if val.empty:
+            if verbose:
+                print(f" No data for '{selected_indicator}'.")
             continue
-        if selected_indicator in SUM_INDICATORS:
-            chart_data["Value"] /= 1_000_000
-        if selected_indicator == "Market Size":
-            chart_data["Value"] = chart_data["Value"] / 1_000
-        if selected_indicator == "Penetration Rate":
-            chart_data["Value"] *= 100
-        combined_chart_data = pd.concat([combined_chart_data, chart_data], ignore_index=True)
+        val["Indicator"] = selected_indicator
+        frames.append(scale_indicator_values(val, selected_indicator))
 
-    if combined_chart_data.empty:
-        print("❌ No data for any selected indicator.")
-        return
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)[["Year", "Value", "Country", "Indicator"]]
+
+
+def prepare_chart_data(df, selected_indicators, selected_years, selected_names, mode="total"):
+    """
+    Build the long (Year, Value, Country, Indicator) table plotted by create(),
+    ordered by indicator, then by the order the names were selected.
+    """
+    long_data = aggregate_all_entities(df, selected_indicators, selected_years, mode)
+    return select_chart_data(long_data, selected_indicators, selected_names)
 
-    # --- Color palette
-    base_colors = ["#C00000", "#FF6600", "#203864"]
 
-    # --- Color palette: proportional lighter shades
-    def create_mixed_color_grades_from_base(base_colors, grades_per_color=5, sets=3):
-        """
-        Start with original base colors, then generate progressively lighter shades.
-        """
-        all_colors = []
+def select_chart_data(long_data, selected_indicators, selected_names):
+    """
+    Pick and order the selected names from the long table of aggregate_all_entities().
+    """
+    if long_data.empty:
+        return pd.DataFrame()
 
-        for s in range(sets):
-            for i in range(grades_per_color):
-                for color in base_colors:
-                    # Convert hex to RGB
-                    rgb = tuple(int(color[j:j+2], 16)/255 for j in (1, 3, 5))
-                    h, l, s_ = colorsys.rgb_to_hls(*rgb)
+    # A name can only be one entity; countries win over groups as in the selection list
+    chart_data = long_data[long_data["Country"].isin(selected_names)]
+    chart_data = chart_data.drop_duplicates(["Country", "Indicator", "Year"])
+    for selected_indicator in selected_indicators:
+        if not (chart_data["Indicator"] == selected_indicator).any():
+            print(f" No data for '{selected_indicator}'.")
 
-                    # Compute proportional lightness increment
-                    # Lighter shades gradually go from current lightness to 1.0
-                    step_multiplier = 1.8  # >1 = bigger steps, <1 = smaller steps
-                    light_factor = l + (((1 - l) / (grades_per_color * sets - 1)) * (i + s*grades_per_color)) * step_multiplier
+    order = chart_data.assign(
+        _indicator=pd.Categorical(chart_data["Indicator"], categories=list(dict.fromkeys(selected_indicators))),
+        _name=pd.Categorical(chart_data["Country"], categories=list(dict.fromkeys(selected_names)))
+    ).sort_values(["_indicator", "_name", "Year"])
+    return order[["Year", "Value", "Country", "Indicator"]].reset_index(drop=True)
 
-                    new_l = min(1.0, light_factor)
 
-                    # Convert back to RGB and append
-                    new_rgb = colorsys.hls_to_rgb(h, new_l, s_)
-                    all_colors.append(to_hex(new_rgb))
+ENTITY_LEVELS = ["Country", "WB Income Group", "ITU Region", "World"]
+# Subtotal rows of the source sheet listed as countries ("Total - Region & Income Group", "Average - ...")
+SUBTOTAL_PATTERN = re.compile(r'^(Total|Average) - ')
 
-        return all_colors
 
+def aggregate_all_entities(df, selected_indicators, selected_years, mode="total"):
+    """
+    Aggregate the selected indicators for every selectable entity (countries, income groups,
+    regions and World) with one groupby per level. Adds a "Level" column to the long table.
+    """
+    if not is_store(df):
+        df = df.assign(World="World")  # a Parquet store groups "World" by itself
+    df_hash = data_hash(df)  # hashed once for the evaluation cache of every level
+    frames = []
+    for level in ENTITY_LEVELS:
+        level_data = aggregate_by_group(df, level, selected_indicators, selected_years, verbose=False, mode=mode,
+                                        df_hash=df_hash)
+        if not level_data.empty:
+            frames.append(level_data.assign(Level=level))
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def data_hash(df):
+    """
+    Content hash of a DataFrame, used as the key of on-disk caches.
+    """
+    if is_store(df):
+        return df.fingerprint
+    row_hashes = pd.util.hash_pandas_object(df, index=False).values
+    digest = hashlib.sha1(row_hashes.tobytes())
+    digest.update(",".join(map(str, df.columns)).encode())
+    return digest.hexdigest()
 
-    # --- Usage
-    full_colors = create_mixed_color_grades_from_base(base_colors, grades_per_color=6, sets=3)
 
+# === Chart rendering ===
+# Line and scatter charts with this many series get direct labels instead of the bottom legend
+DIRECT_LABEL_MIN_HUES = 8
+DIRECT_LABEL_PAD = 4  # points between a label and its point, or the right edge of the axes
+DIRECT_LABEL_MIN_FONT = 5
 
-    combined_chart_data["Hue"] = combined_chart_data["Country"] + " - " + combined_chart_data["Indicator"]
-    hue_list = combined_chart_data["Hue"].unique()
-    color_repeat = (len(hue_list) // len(full_colors)) + 1
-    palette_dict = dict(zip(hue_list, (full_colors * color_repeat)[:len(hue_list)]))
 
-    # --- Y label
+def y_axis_label(selected_indicators, chart_type, mode="total"):
     if chart_type == "100_stacked":
-        y_label = "Share (%)"
-    elif len(selected_indicators) <= 2:
+        return "Share (%)"
+    if len(selected_indicators) <= 2:
         y_label = indicator_labels.get(selected_indicators[0], "Value")
     else:
         y_label = "Indicator Value"
+    if mode != "total":
+        y_label = f"{y_label}, {AGGREGATION_MODES[mode].lower()}"
+    return y_label
 
-    plt.figure(figsize=(14, 6))
+
+def plot_chart(combined_chart_data, selected_indicators, selected_years, chart_type, mode="total"):
+    """
+    Draw the chart on a new 14x6 figure and return (fig, ax).
+    """
+    if chart_type == "facet":
+        return plot_facets(combined_chart_data, selected_indicators, selected_years, mode)
+    if chart_type == "map":
+        return plot_map(combined_chart_data, selected_indicators, selected_years)
+
+    combined_chart_data = combined_chart_data.copy()
+    combined_chart_data["Hue"] = combined_chart_data["Country"] + " - " + combined_chart_data["Indicator"]
+    hue_list = combined_chart_data["Hue"].unique()
+    palette_dict = build_palette(hue_list)
+
+    y_label = y_axis_label(selected_indicators, chart_type, mode)
+
+    fig, ax = plt.subplots(figsize=(14, 6))
 
     # --- Chart plotting
     if chart_type == "line":
-        ax = sns.lineplot(data=combined_chart_data, x="Year", y="Value", hue="Hue", marker="D", palette=palette_dict)
+        sns.lineplot(data=combined_chart_data, x="Year", y="Value", hue="Hue", marker="D", palette=palette_dict, ax=ax)
     elif chart_type == "bar":
-        ax = sns.barplot(data=combined_chart_data, x="Year", y="Value", hue="Hue", palette=palette_dict)
+        sns.barplot(data=combined_chart_data, x="Year", y="Value", hue="Hue", palette=palette_dict, ax=ax)
     elif chart_type in ["stacked", "100_stacked"]:
         pivot_df = combined_chart_data.pivot(index="Year", columns="Hue", values="Value").fillna(0)
         if chart_type == "100_stacked":
             pivot_df = pivot_df.div(pivot_df.sum(axis=1), axis=0) * 100
-        ax = pivot_df.plot(kind="bar", stacked=True, figsize=(14, 6),
-                           color=[palette_dict.get(col, None) for col in pivot_df.columns])
+        pivot_df.plot(kind="bar", stacked=True, ax=ax,
+                      color=[palette_dict.get(col, None) for col in pivot_df.columns])
         if chart_type == "100_stacked":
             ax.yaxis.set_major_formatter(mtick.PercentFormatter(xmax=100))
             ax.set_ylim(0, 100)
     elif chart_type == "scatter":
-        ax = sns.scatterplot(data=combined_chart_data, x="Year", y="Value", hue="Hue", palette=palette_dict)
+        sns.scatterplot(data=combined_chart_data, x="Year", y="Value", hue="Hue", palette=palette_dict, ax=ax)
     elif chart_type == "pie":
         pie_year = selected_years[0]
         pie_data = combined_chart_data[combined_chart_data["Year"] == pie_year]
@@ -264,64 +472,682 @@ def create(df, charts_path):
         colors = [palette_dict.get(hue, "#999999") for hue in pie_data_grouped.index]
         total = pie_data_grouped.sum()
         combined_labels = [f"{name} {value/total:.1%}" for name, value in zip(pie_data_grouped.index, pie_data_grouped)]
-        fig, ax = plt.subplots(figsize=(14, 6))
-        pie_result = ax.pie(pie_data_grouped, labels=combined_labels, colors=colors,
-                            startangle=30, pctdistance=1.15, labeldistance=1.25)
+        ax.pie(pie_data_grouped, labels=combined_labels, colors=colors,
+               startangle=30, pctdistance=1.15, labeldistance=1.25)
         ax.axis('equal')
-        plt.tight_layout()
+        fig.tight_layout()
 
     # --- Y axis formatting
     if chart_type != "pie":
-        if chart_type == "100_stacked":
-            ax.yaxis.set_major_formatter(mtick.PercentFormatter(xmax=100))
-        elif len(selected_indicators) == 1:
-            si = selected_indicators[0]
-            if si == "Penetration Rate":
-                ax.yaxis.set_major_formatter(mtick.PercentFormatter())
-            elif si in SUM_INDICATORS:
-                ax.yaxis.set_major_formatter(mtick.FuncFormatter(lambda x, _: f'{x:.0f}M'))
-            elif si == "ARPU":
-                ax.yaxis.set_major_formatter(mtick.FormatStrFormatter("%.1f"))
+        formatter = y_tick_formatter(selected_indicators, chart_type)
+        if formatter is not None:
+            ax.yaxis.set_major_formatter(formatter)
         ax.set_ylabel(y_label)
         ax.set_xlabel("Year")
 
     # --- Unified legend placement
-    if chart_type != "pie":
+    direct_labels = chart_type in ("line", "scatter") and len(hue_list) >= DIRECT_LABEL_MIN_HUES
+    if direct_labels:
+        if ax.get_legend() is not None:
+            ax.get_legend().remove()
+    elif chart_type != "pie":
         ncol = 3 if len(hue_list) > 3 else len(hue_list)
         ax.legend(title="", frameon=False, loc='upper center',
                   bbox_to_anchor=(0.5, -0.2), ncol=ncol,
                   fontsize='small', handletextpad=0.5,
                   columnspacing=1.0, borderaxespad=0.5)
-        plt.subplots_adjust(bottom=0.35)
+        fig.subplots_adjust(bottom=0.35)
+
+    ax.tick_params(axis='x', labelrotation=0)
+    fig.tight_layout()
+    if direct_labels:
+        direct_label(fig, ax, combined_chart_data, palette_dict, chart_type)
+    return fig, ax
+
+
+# Small multiples: smaller type than the single-chart rcParams, so 36 panels stay legible
+FACET_RC = {
+    'font.size': 11,
+    'axes.titlesize': 11,
+    'xtick.labelsize': 9,
+    'ytick.labelsize': 9,
+    'legend.fontsize': 11,
+}
+FACET_PANEL_HEIGHT = 1.6  # inches per grid row
 
-    plt.xticks(rotation=0)
-    plt.tight_layout()
 
-    # --- Save charts
+def y_tick_formatter(selected_indicators, chart_type):
+    """
+    Matplotlib formatter of the value axis (registry "format"), or None for the default.
+    """
+    if chart_type == "100_stacked":
+        return mtick.PercentFormatter(xmax=100)
+    if len(selected_indicators) != 1:
+        return None
+    tick_format = INDICATOR_REGISTRY.get(selected_indicators[0], {}).get("format")
+    if tick_format == "percent":
+        return mtick.PercentFormatter()
+    if tick_format == "millions":
+        return mtick.FuncFormatter(lambda x, _: f'{x:.0f}M')
+    if tick_format:
+        return mtick.FormatStrFormatter(tick_format)
+    return None
+
+
+def plot_facets(chart_data, selected_indicators, selected_years, mode="total"):
+    """
+    Small multiples: one panel per country/region in a near-square grid, all panels on the
+    same axes, with one palette over the indicators and one legend. Values come from a single
+    (Year x entity x indicator) array; ticks and tick labels are computed once for the grid
+    (matplotlib's shared axes re-tick every sibling, which costs more than the drawing).
+    Returns (fig, axes).
+    """
+    names = list(dict.fromkeys(chart_data["Country"]))
+    indicators = list(dict.fromkeys(chart_data["Indicator"]))
+    years = sorted(int(y) for y in chart_data["Year"].unique())
+    wide = chart_data.pivot_table(index="Year", columns=["Country", "Indicator"], values="Value", aggfunc="first")
+    wide = wide.reindex(index=years, columns=pd.MultiIndex.from_product([names, indicators]))
+    values = wide.to_numpy(dtype=float).reshape(len(years), len(names), len(indicators))
+    palette = build_palette(indicators)
+
+    # --- One set of limits, ticks and labels for every panel
+    low, high = np.nanmin(values), np.nanmax(values)
+    margin = (high - low) * 0.05 or abs(high) * 0.05 or 1
+    ylim = (min(low - margin, 0) if low >= 0 else low - margin, high + margin)
+    xlim = (years[0] - 0.5, years[-1] + 0.5)
+    yticks = [t for t in mtick.MaxNLocator(nbins=4).tick_values(*ylim) if ylim[0] <= t <= ylim[1]]
+    xticks = [t for t in mtick.MaxNLocator(nbins=4, integer=True).tick_values(*xlim) if xlim[0] <= t <= xlim[1]]
+    formatter = y_tick_formatter(selected_indicators, "facet")
+    ylabels = formatter.format_ticks(yticks) if formatter is not None else [f"{t:g}" for t in yticks]
+    xlabels = [f"{t:.0f}" for t in xticks]
+
+    ncols = math.ceil(math.sqrt(len(names)))
+    nrows = math.ceil(len(names) / ncols)
+    with plt.rc_context(FACET_RC):
+        fig, axes = plt.subplots(nrows, ncols, squeeze=False, figsize=(14, max(6, FACET_PANEL_HEIGHT * nrows)))
+        lines = {}
+        for idx, ax in enumerate(axes.flat):
+            if idx >= len(names):
+                ax.set_visible(False)
+                continue
+            for k, indicator in enumerate(indicators):
+                line, = ax.plot(years, values[:, idx, k], color=palette[indicator], marker="D", markersize=3,
+                                linewidth=1.5)
+                lines.setdefault(indicator, line)
+            ax.set_title(names[idx], pad=3)
+            ax.set_xlim(xlim)
+            ax.set_ylim(ylim)
+            ax.xaxis.set_major_locator(mtick.FixedLocator(xticks))
+            ax.yaxis.set_major_locator(mtick.FixedLocator(yticks))
+            # Tick labels only on the outer panels: bottom row of each column, first column
+            bottom = idx + ncols >= len(names)
+            ax.xaxis.set_major_formatter(mtick.FixedFormatter(xlabels) if bottom else mtick.NullFormatter())
+            ax.yaxis.set_major_formatter(mtick.FixedFormatter(ylabels) if idx % ncols == 0 else mtick.NullFormatter())
+
+        fig.supxlabel("Year")
+        fig.supylabel(y_axis_label(selected_indicators, "facet", mode))
+        top = 0.95
+        if len(indicators) > 1:
+            fig.legend(lines.values(), lines.keys(), loc="upper center", ncol=len(indicators), frameon=False)
+            top = 1 - 0.6 / fig.get_figheight()
+        # Fixed margins: tight_layout over dozens of panels costs more than the drawing
+        fig.subplots_adjust(left=0.08, right=0.98, bottom=0.08, top=top, wspace=0.08, hspace=0.35)
+    return fig, axes
+
+
+# === World map ===
+# Light to crimson, countries without data in light grey
+MAP_NAME = "World map"  # entity name of map requests, used in file names and labels
+MAP_CMAP = LinearSegmentedColormap.from_list("itu_map", ["#fde0dd", "#C00000"]).with_extremes(bad="#e6e6e6")
+_ISO_CODES = {}
+
+
+def country_iso_codes():
+    """
+    Country name -> ISO3 (from the basket exports), loaded once per process.
+    """
+    if not _ISO_CODES:
+        from Entity_Selector import load_iso_codes
+        _ISO_CODES.update(load_iso_codes())
+    return _ISO_CODES
+
+
+def map_chart_data(df, selected_indicators, selected_years):
+    """
+    Long table of every country (no group subtotal rows) for a map; countries are the same in every mode.
+    """
+    chart_data = aggregate_by_group(df, "Country", selected_indicators[:1], selected_years, verbose=False)
+    if chart_data.empty:
+        return chart_data
+    chart_data = chart_data[chart_data["Country"].isin(country_iso_codes())]
+    return chart_data.sort_values(["Country", "Year"]).reset_index(drop=True)
+
+
+def map_values(chart_data, year):
+    """
+    ISO3 -> value of one year of a map_chart_data table.
+    """
+    year_data = chart_data[chart_data["Year"] == year]
+    iso_codes = country_iso_codes()
+    return dict(zip(year_data["Country"].map(iso_codes), year_data["Value"]))
+
+
+def draw_map(ax, values, norm, projection="equal_earth"):
+    """
+    Draw the bundled world geometry on ax, coloured by values (ISO3 -> value): one
+    PolyCollection for all country rings, markers for small states. Returns the artists,
+    which update_map recolours in place (e.g. for one animation frame per year).
+    """
+    geometry = projected_geometry(projection)
+    collection = PolyCollection(geometry["rings"], cmap=MAP_CMAP, norm=norm, edgecolor="white", linewidth=0.3)
+    ax.add_collection(collection)
+    points = ax.scatter(geometry["points"][:, 0], geometry["points"][:, 1], c=np.zeros(len(geometry["points"])),
+                        s=14, cmap=MAP_CMAP, norm=norm,
+                        edgecolor="#666666", linewidth=0.3, zorder=3)
+    coords = np.concatenate(geometry["rings"])
+    ax.set_xlim(coords[:, 0].min(), coords[:, 0].max())
+    ax.set_ylim(coords[:, 1].min(), coords[:, 1].max())
+    ax.set_aspect("equal")
+    ax.axis("off")
+
+    artists = {"collection": collection, "points": points, "geometry": geometry,
+               "label": ax.text(0.01, 0.02, "", transform=ax.transAxes, fontsize='large', fontweight='bold')}
+    update_map(artists, values)
+    return artists
+
+
+def update_map(artists, values, label=""):
+    geometry = artists["geometry"]
+    ring_values = np.array([values.get(iso, np.nan) for iso in geometry["ring_isos"]], dtype=float)
+    artists["collection"].set_array(np.ma.masked_invalid(ring_values))
+    # Small states are only drawn when they have a value
+    point_values = np.array([values.get(iso, np.nan) for iso in geometry["point_isos"]], dtype=float)
+    artists["points"].set_array(np.ma.masked_invalid(point_values))
+    artists["points"].set_sizes(np.where(np.isnan(point_values), 0, 14))
+    artists["label"].set_text(label)
+
+
+def plot_map(chart_data, selected_indicators, selected_years):
+    """
+    Choropleth of the first selected indicator for the last selected year. The colour
+    scale covers every year of chart_data, so maps of different years compare.
+    """
+    fig, ax, _ = map_figure(chart_data, selected_indicators, selected_years[-1])
+    return fig, ax
+
+
+def map_figure(chart_data, selected_indicators, year, figsize=(14, 7), dpi=None):
+    """
+    plot_map on a figure of the given size, also returning the draw_map artists.
+    """
+    norm = Normalize(vmin=np.nanmin(chart_data["Value"]), vmax=np.nanmax(chart_data["Value"]))
+    fig, ax = plt.subplots(figsize=figsize, dpi=dpi)
+    artists = draw_map(ax, map_values(chart_data, year), norm)
+    artists["label"].set_text(str(year))
+
+    colorbar = fig.colorbar(artists["collection"], ax=ax, orientation="horizontal", fraction=0.04, pad=0.02,
+                            shrink=0.5, format=y_tick_formatter(selected_indicators[:1], "map"))
+    colorbar.set_label(y_axis_label(selected_indicators[:1], "map"))
+    colorbar.outline.set_visible(False)
+    fig.subplots_adjust(left=0.01, right=0.99, top=0.99, bottom=0.08)
+    return fig, ax, artists
+
+
+def direct_label(fig, ax, chart_data, palette_dict, chart_type):
+    """
+    Label every series at its last point instead of a legend. Line labels are stacked in the
+    right margin by one sweep over their sorted y positions; scatter labels go next to their
+    point where the collision grid has room, the others join the margin stack.
+    """
+    values = chart_data.dropna(subset=["Value"]).sort_values("Year")
+    ends = values.groupby("Hue", sort=False).tail(1)
+    texts = [
+        ax.text(0, 0, hue, color=palette_dict.get(hue, "#333333"), fontsize='small', clip_on=False, in_layout=False)
+        for hue in ends["Hue"]
+    ]
+    anchors = ends[["Year", "Value"]].to_numpy(dtype=float)
+    points = values[["Year", "Value"]].to_numpy(dtype=float) if chart_type == "scatter" else None
+
+    margin_width = _place_direct_labels(fig, ax, texts, anchors, points)
+    if margin_width:
+        # Make room for the margin labels; the axes move, so place them again
+        fig.tight_layout(rect=(0, 0, 1 - margin_width / fig.bbox.width, 1))
+        _place_direct_labels(fig, ax, texts, anchors, points)
+    for text in texts:
+        text.set_in_layout(True)  # kept by bbox_inches='tight' when saving
+    return texts
+
+
+def _place_direct_labels(fig, ax, texts, anchors, points=None):
+    # Placement is done in pixels, positions are stored in data coordinates so they hold at any dpi.
+    # Returns the width (pixels) the right-margin labels need.
+    renderer = fig.canvas.get_renderer()
+    ax.autoscale_view()
+    box = ax.get_window_extent(renderer)
+    pad = DIRECT_LABEL_PAD * fig.dpi / 72
+    sizes = [(extent.width, extent.height) for extent in (text.get_window_extent(renderer) for text in texts)]
+    anchors_px = ax.transData.transform(anchors)
+    to_data = ax.transData.inverted()
+
+    margin = list(range(len(texts)))
+    if points is not None:
+        half = pad  # markers are about 2 * pad wide
+        obstacles = [(x - half, y - half, x + half, y + half) for x, y in ax.transData.transform(points)]
+        corners = place_point_labels([tuple(p) for p in anchors_px], sizes, (box.x0, box.y0, box.x1, box.y1),
+                                     obstacles, pad)
+        margin = [i for i, corner in enumerate(corners) if corner is None]
+        for text, corner in zip(texts, corners):
+            if corner is not None:
+                text.set_transform(ax.transData)
+                text.set_position(to_data.transform(corner))
+                text.set_horizontalalignment('left')
+                text.set_verticalalignment('bottom')
+
+    if margin:
+        height = max(sizes[i][1] for i in margin)
+        if height * len(margin) > box.height:
+            # More labels than the axes are tall: shrink them to fit the stack
+            scale = box.height / (height * len(margin))
+            for i in margin:
+                texts[i].set_fontsize(max(DIRECT_LABEL_MIN_FONT, texts[i].get_fontsize() * scale))
+            height = max(texts[i].get_window_extent(renderer).height for i in margin)
+        ys = spread_positions([anchors_px[i][1] for i in margin], height,
+                              lower=box.y0 + height / 2, upper=box.y1 - height / 2)
+        x = 1 + pad / box.width
+        for i, y in zip(margin, ys):
+            texts[i].set_transform(blended_transform_factory(ax.transAxes, ax.transData))
+            texts[i].set_position((x, to_data.transform((0, y))[1]))
+            texts[i].set_horizontalalignment('left')
+            texts[i].set_verticalalignment('center')
+        return pad + max(texts[i].get_window_extent(renderer).width for i in margin)
+    return 0
+
+
+def save_chart(fig, charts_path, selected_indicators, selected_names, output_format="raster"):
+    """
+    Save the figure as numbered JPEG and PNG (or SVG and PDF) files and return both paths.
+    """
+    extensions = CHART_FORMATS[output_format]
+    base_path = numbered_chart_base(charts_path, selected_indicators, selected_names, extensions[0])
+    paths = [f"{base_path}.{ext}" for ext in extensions]
+    return write_chart_files(fig, *paths)
+
+
+def numbered_chart_base(charts_path, selected_indicators, selected_names, extension):
+    """
+    Path without extension of the next numbered chart file, e.g. Charts/ARPU_Africa_3.
+    The number is claimed by creating the (still empty) file with extension exclusively,
+    so charts saved in parallel by queued jobs or render_grouping workers never share one.
+    """
     safe_indicators = '_'.join(re.sub(r'\W+', '', ind) for ind in selected_indicators)
     safe_countries = '_'.join(re.sub(r'\W+', '', c) for c in selected_names)
     filename_base = f"{safe_indicators}_{safe_countries}"
-    existing = [f for f in os.listdir(charts_path) if f.startswith(filename_base) and f.endswith(".jpeg")]
+    existing = [f for f in os.listdir(charts_path) if f.startswith(filename_base) and f.endswith(f".{extension}")]
     chart_num = len(existing) + 1
-    base_filename = f"{filename_base}_{chart_num}"
-    jpeg_path = os.path.join(charts_path, f"{base_filename}.jpeg")
-    png_path = os.path.join(charts_path, f"{base_filename}.png")
-    plt.savefig(jpeg_path, format='jpeg', dpi=300, bbox_inches='tight')
-    plt.savefig(png_path, format='png', dpi=300, bbox_inches='tight')
-    plt.show()
-    print(f"✅ Chart saved as:\n- {jpeg_path}\n- {png_path}")
+    while True:
+        base_path = os.path.join(charts_path, f"{filename_base}_{chart_num}")
+        try:
+            os.close(os.open(f"{base_path}.{extension}", os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666))
+            return base_path
+        except FileExistsError:
+            chart_num += 1
+
+
+def write_chart_files(fig, *paths):
+    """
+    Save the figure once per path, in the format of its extension. An SVG also gets
+    the PNG fallback the slide builders embed next to it. With both PNG and JPEG the
+    figure is drawn once: the JPEG is encoded from the saved PNG.
+    """
+    png_path = next((p for p in paths if p.lower().endswith(".png")), None)
+    for path in sorted(paths, key=lambda p: p != png_path):
+        ext = os.path.splitext(path)[1].lstrip(".").lower()
+        if ext in ("jpeg", "jpg") and png_path is not None:
+            with Image.open(png_path) as img:
+                flat = Image.new("RGB", img.size, "white")
+                flat.paste(img, mask=img.getchannel("A") if img.mode == "RGBA" else None)
+                flat.save(path, format="JPEG", dpi=(RASTER_DPI, RASTER_DPI))
+        elif ext in VECTOR_METADATA:
+            with plt.rc_context(VECTOR_RC):
+                fig.savefig(path, format=ext, bbox_inches='tight', metadata=VECTOR_METADATA[ext])
+            if ext == "svg":
+                fallback = svg_fallback_path(path)
+                os.makedirs(os.path.dirname(fallback), exist_ok=True)
+                fig.savefig(fallback, format='png', dpi=FALLBACK_DPI, bbox_inches='tight')
+        else:
+            fig.savefig(path, format=ext, dpi=RASTER_DPI, bbox_inches='tight')
+    return tuple(paths)
+
+
+def benchmark_chart_formats(chart_data, selected_indicators, selected_years, chart_type, mode="total", repeat=3):
+    """
+    Save one chart in every output format (best of `repeat` saves, into a temporary folder)
+    and compare total file size and save time. Returns a DataFrame with one row per format.
+    """
+    import tempfile
+
+    fig, ax = plot_chart(chart_data, selected_indicators, selected_years, chart_type, mode)
+    rows = []
+    with tempfile.TemporaryDirectory() as folder:
+        for output_format, extensions in CHART_FORMATS.items():
+            paths = [os.path.join(folder, f"benchmark.{ext}") for ext in extensions]
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                write_chart_files(fig, *paths)
+                timings.append(time.perf_counter() - start)
+            rows.append({
+                "Format": output_format,
+                "Files": " + ".join(ext.upper() for ext in extensions),
+                "Size KB": round(sum(os.path.getsize(p) for p in paths) / 1024, 1),
+                "Save Seconds": round(min(timings), 3),
+            })
+    plt.close(fig)
+    return pd.DataFrame(rows)
+
+
+def with_int_years(df):
+    if is_store(df):
+        return df  # Year is an integer partition key
+    df = df.copy()
+    df["Year"] = pd.to_numeric(df["Year"], errors='coerce')
+    df = df.dropna(subset=["Year"])
+    df["Year"] = df["Year"].astype(int)
+    return df
+
+
+def ask_chart_request(df, ranking=None, selector=None, animated=False, chart_types=None):
+    """
+    Run the create() prompts and return the chart request as a dict, or None if cancelled.
+    animated: only offer chart types Chart_Animation can play over several years.
+    chart_types: only offer these chart types (e.g. Native_Charts.NATIVE_CHART_TYPES).
+    """
+    # --- Select indicator(s)
+    selected_indicators = select_indicators()
+    if not selected_indicators:
+        return None
+
+    # --- Filter years
+    df = with_int_years(df)
+    selected_years = select_years(available_years(df))
+    if not selected_years:
+        return None
+
+    # --- Chart type
+    chart_type = select_chart_type(selected_years, animated, chart_types)
+    if chart_type is None:
+        return None
+    if chart_type == "map":
+        # Every country of one indicator; no entity selection
+        if len(selected_indicators) > 1:
+            print(f" A map shows one indicator: {selected_indicators[0]}.")
+        return {
+            "selected_indicators": selected_indicators[:1],
+            "selected_years": selected_years,
+            "chart_type": chart_type,
+            "selected_names": [MAP_NAME],
+            "mode": "total",
+        }
+
+    # --- Country/region selection
+    countries, income_groups, regions = entity_options(df)
+    selected_names = select_names(countries + income_groups + regions + ["World"], ranking, selector)
+    if not selected_names:
+        return None
+
+    # --- Group aggregation (countries are the same in every mode)
+    mode = "total"
+    if any(name not in countries for name in selected_names):
+        mode = select_aggregation_mode()
+
+    return {
+        "selected_indicators": selected_indicators,
+        "selected_years": selected_years,
+        "chart_type": chart_type,
+        "selected_names": selected_names,
+        "mode": mode,
+    }
+
+
+def render_chart(df, charts_path, selected_indicators, selected_years, chart_type, selected_names,
+                 mode="total", show=False, output_format="raster"):
+    """
+    Aggregate, plot and save one chart without any prompt.
+    Returns (jpeg, png) or, with output_format="vector", (svg, pdf); None without data.
+    """
+    # --- Prepare combined chart data
+    combined_chart_data = chart_data_for(with_int_years(df), selected_indicators, selected_years, chart_type,
+                                         selected_names, mode)
+    if combined_chart_data.empty:
+        print("❌ No data for any selected indicator.")
+        return None
+
+    fig, ax = plot_chart(combined_chart_data, selected_indicators, selected_years, chart_type, mode)
+
+    # --- Save charts and record where they came from
+    paths = save_chart(fig, charts_path, selected_indicators, selected_names, output_format)
+    spec = {
+        "selected_indicators": selected_indicators, "selected_years": selected_years,
+        "chart_type": chart_type, "selected_names": selected_names, "mode": mode,
+    }
+    record_chart(paths, spec, chart_data_hash(combined_chart_data))
+    if show:
+        plt.show()
+    else:
+        plt.close(fig)
+    return paths
+
+
+def chart_data_hash(chart_data):
+    # Hash of the plotted values only, so a chart is stale only when its own numbers change
+    return data_hash(chart_data.reset_index(drop=True))
+
+
+def spec_chart_data(df, spec):
+    """
+    The long table a recorded chart spec plots, computed from df.
+    """
+    df = with_int_years(df)
+    selected_indicators, selected_years = spec["selected_indicators"], spec["selected_years"]
+    mode = spec.get("mode", "total")
+    if spec.get("group_column"):
+        # One member of a render_grouping fan-out
+        if spec.get("within"):
+            df = restrict(df, *spec["within"])
+        chart_data = aggregate_by_group(df, spec["group_column"], selected_indicators, selected_years,
+                                        verbose=False, mode=mode)
+        if not chart_data.empty:
+            chart_data = chart_data[chart_data["Country"] == spec["selected_names"][0]]
+        return chart_data
+    return chart_data_for(df, selected_indicators, selected_years, spec["chart_type"], spec["selected_names"], mode)
+
+
+def chart_data_for(df, selected_indicators, selected_years, chart_type, selected_names, mode="total"):
+    if chart_type == "map":
+        return map_chart_data(df, selected_indicators, selected_years)
+    return prepare_chart_data(df, selected_indicators, selected_years, selected_names, mode)
+
+
+def redraw_chart(chart_data, spec, *paths):
+    """
+    Re-render a chart from its lineage spec into its existing files (raster or vector).
+    """
+    mode = spec.get("mode", "total")
+    fig, ax = plot_chart(chart_data, spec["selected_indicators"], spec["selected_years"], spec["chart_type"], mode)
+    write_chart_files(fig, *paths)
+    plt.close(fig)
+
+
+def create(df, charts_path, ranking=None, selector=None):
+    request = ask_chart_request(df, ranking, selector)
+    if request is None:
+        return
+    paths = render_chart(df, charts_path, **request, show=True, output_format=select_output_format())
+    if paths:
+        print(f"✅ Chart saved as:\n- {paths[0]}\n- {paths[1]}")
+
 
+# === Fan-out: one chart per member of a grouping ===
+def _init_render_worker():
+    # Worker processes never show figures
+    plt.switch_backend("Agg")
 
 
+def _render_member(task):
+    member, chart_data, selected_indicators, selected_years, chart_type, charts_path, mode, output_format = task
+    start = time.perf_counter()
+    fig, ax = plot_chart(chart_data, selected_indicators, selected_years, chart_type, mode)
+    paths = save_chart(fig, charts_path, selected_indicators, [member], output_format)
+    plt.close(fig)
+    row = {"Entity": member}
+    row.update(zip(_manifest_file_columns(output_format), paths))
+    row["Render Seconds"] = round(time.perf_counter() - start, 3)
+    return row
 
 
+def _manifest_file_columns(output_format):
+    return [ext.upper() for ext in CHART_FORMATS[output_format]]
 
 
+def render_grouping(df, charts_path, selected_indicators, selected_years, chart_type,
+                    group_column, within=None, max_workers=None, mode="total", output_format="raster"):
+    """
+    Render the same chart for every member of group_column on a process pool.
+    within=(column, value) restricts the rows first, e.g. ("WB Income Group", "Low-income")
+    with group_column="Country" gives one chart per low-income country.
+    mode picks how groups combine their countries (see AGGREGATION_MODES).
+    Writes a CSV and JSON manifest to charts_path and returns it as a DataFrame.
+    """
+    if chart_type not in GROUPING_CHART_TYPES:
+        raise ValueError(f"One chart per member needs one of {', '.join(GROUPING_CHART_TYPES)}, not {chart_type}.")
+    if chart_type == "pie" and len(selected_years) != 1:
+        raise ValueError("Pie chart requires exactly one year.")
+
+    df = with_int_years(df)
+    if within is not None:
+        df = restrict(df, *within)
+
+    # --- Aggregate once for all members, then hand each worker its own slice
+    grouped_data = aggregate_by_group(df, group_column, selected_indicators, selected_years, mode=mode)
+    if grouped_data.empty:
+        print("❌ No data for any selected indicator.")
+        return pd.DataFrame()
+
+    tasks = [
+        (member, member_data, selected_indicators, selected_years, chart_type, charts_path, mode, output_format)
+        for member, member_data in grouped_data.groupby("Country", sort=True)
+    ]
+    max_workers = max_workers or min(len(tasks), os.cpu_count() or 1)
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_render_worker) as pool:
+        rows = list(pool.map(_render_member, tasks))
+    total_seconds = time.perf_counter() - start
+
+    file_columns = _manifest_file_columns(output_format)
+    manifest = pd.DataFrame(rows, columns=["Entity", *file_columns, "Render Seconds"])
+    manifest.insert(0, "Grouping", group_column)
+
+    member_hashes = {member: chart_data_hash(member_data) for member, member_data in grouped_data.groupby("Country", sort=True)}
+    for row in rows:
+        spec = {
+            "selected_indicators": selected_indicators, "selected_years": selected_years,
+            "chart_type": chart_type, "selected_names": [row["Entity"]], "mode": mode,
+            "group_column": group_column, "within": list(within) if within else None,
+        }
+        record_chart([row[column] for column in file_columns], spec, member_hashes[row["Entity"]])
+
+    # --- Save manifest
+    safe_indicators = '_'.join(re.sub(r'\W+', '', ind) for ind in selected_indicators)
+    safe_group = re.sub(r'\W+', '', group_column if within is None else f"{group_column}_{within[1]}")
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    manifest_base = os.path.join(charts_path, f"manifest_{safe_indicators}_{safe_group}_{stamp}")
+    manifest.to_csv(f"{manifest_base}.csv", index=False)
+    manifest.to_json(f"{manifest_base}.json", orient="records", indent=2)
 
-    
+    print(f"✅ {len(manifest)} charts rendered in {total_seconds:.1f}s on {max_workers} workers.")
+    print(f"✅ Manifest saved as:\n- {manifest_base}.csv\n- {manifest_base}.json")
+    return manifest
 
 
+def ask_grouping_request(df):
+    """
+    Prompts of create_for_grouping: same as create(), then a grouping column
+    instead of a list of countries. Returns render_grouping keyword arguments, or None.
+    """
+    selected_indicators = select_indicators()
+    if not selected_indicators:
+        return None
 
+    selected_years = select_years(available_years(df))
+    if not selected_years:
+        return None
+
+    chart_type = select_chart_type(selected_years, chart_types=GROUPING_CHART_TYPES)
+    if chart_type is None:
+        return None
+
+    print("\nOne chart per member of:")
+    for key, val in GROUPING_COLUMNS.items():
+        print(f"{key}. {val}")
+    group_column = GROUPING_COLUMNS.get(input("Select grouping: ").strip())
+    if group_column is None:
+        print(" Invalid grouping.")
+        return None
+
+    within = None
+    if group_column == "Country":
+        _, income_groups, regions = entity_options(df)
+        groups = [("WB Income Group", g) for g in income_groups] + [("ITU Region", r) for r in regions]
+        print("\nRestrict countries to:")
+        print("0. World (all countries)")
+        for idx, (_, name) in enumerate(groups, 1):
+            print(f"{idx}. {name}")
+        choice = input("Enter number: ").strip()
+        if choice.isdigit() and 1 <= int(choice) <= len(groups):
+            within = groups[int(choice) - 1]
+
+    mode = select_aggregation_mode() if group_column != "Country" else "total"
+    return {
+        "selected_indicators": selected_indicators,
+        "selected_years": selected_years,
+        "chart_type": chart_type,
+        "group_column": group_column,
+        "within": within,
+        "mode": mode,
+    }
+
+
+def create_for_grouping(df, charts_path):
+    """
+    Interactive wrapper for render_grouping.
+    """
+    request = ask_grouping_request(df)
+    if request is not None:
+        render_grouping(df, charts_path, **request, output_format=select_output_format())
+
+
+_dialog_root = None
+
+
+def dialog_root():
+    """
+    The one hidden Tk root every dialog and preview window shares.
+    Tk is not thread-safe: create and use it from one thread only (ITU_Main runs all dialogs on one).
+    """
+    global _dialog_root
+    if _dialog_root is None:
+        from tkinter import Tk
+        _dialog_root = Tk()
+        _dialog_root.withdraw()
+    return _dialog_root
+
+
+def close_dialog_root():
+    global _dialog_root
+    if _dialog_root is not None:
+        _dialog_root.destroy()
+        _dialog_root = None
 
 
 def select_image_files(charts_path=CHARTS_PATH):
@@ -329,8 +1155,9 @@ def select_image_files(charts_path=CHARTS_PATH):
     Open a file dialog to select image files from the given charts_path folder.
     Returns a list of selected file paths.
     """
-    root = Tk()
-    root.withdraw()
+    from tkinter import filedialog
+
+    root = dialog_root()
 
     # Force root visible just enough to bring dialog to front
     root.deiconify()
@@ -341,9 +1168,10 @@ def select_image_files(charts_path=CHARTS_PATH):
     root.after_idle(root.attributes, '-topmost', False)
 
     file_paths = filedialog.askopenfilenames(
+        parent=root,
         title="Select Image Files for Slide",
         initialdir=charts_path,
-        filetypes=[("Image Files", "*.png *.jpg *.jpeg *.bmp *.gif")]
+        filetypes=[("Image Files", "*.png *.jpg *.jpeg *.bmp *.gif"), ("Vector Charts", "*.svg")]
     )
 
     root.withdraw()  # hide root again, but keep alive
@@ -357,11 +1185,15 @@ def display_images(image_paths):
     """
     Display selected image files in a scrollable Tkinter window.
     """
+    import tkinter as tk
+    from tkinter import Toplevel, Label, Button
+    from PIL import ImageTk
+
     if not image_paths:
         print("No images selected.")
         return
 
-    window = Toplevel()
+    window = Toplevel(dialog_root())
     window.title("Selected Images Preview")
     window.geometry("900x600")  # give a decent default size
 
@@ -393,7 +1225,8 @@ def display_images(image_paths):
     photo_images = []
     for idx, img_path in enumerate(image_paths):
         try:
-            img = Image.open(img_path)
+            # SVG charts are previewed through their PNG fallback
+            img = Image.open(svg_fallback_path(img_path) if img_path.lower().endswith(".svg") else img_path)
             img.thumbnail((400, 300))
             photo = ImageTk.PhotoImage(img)
             photo_images.append(photo)
@@ -0,0 +1,143 @@
+import os
+import json
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+from Create_Charts import SUBTOTAL_PATTERN, data_hash
+from Indicator_Registry import INDICATOR_REGISTRY, BASE_AGGREGATES
+from Parquet_Store import EXPECTED_COLUMNS, parse_values
+
+
+
+# === Paths ===
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+VALIDATION_CACHE_PATH = os.path.join(BASE_PATH, 'Cache', 'validation')
+
+SAMPLE_ROWS = 5  # sample records kept per rule
+BASE_INDICATORS = [name for name, spec in INDICATOR_REGISTRY.items() if spec["aggregate"] in BASE_AGGREGATES]
+KEY_COLUMNS = ['Key Indicator', 'WB Income Group', 'ITU Region', 'Country', 'Year']
+
+# Rule -> what a flagged row or series means, in report order
+RULES = {
+    "missing_value": "rows without a Value (dropped at load)",
+    "non_numeric": "Values that are not numbers (dropped at load)",
+    "invalid_year": "rows without a whole-number Year",
+    "unknown_indicator": "rows of indicators missing from the registry (never charted)",
+    "negative": "negative Values",
+    "duplicate": "duplicate rows for one indicator, entity and year",
+    "subtotal": "'Total - ' / 'Average - ' subtotal rows",
+    "no_group": "country rows without income group or region (left out of group totals)",
+    "missing_base": f"countries lacking one of {', '.join(BASE_INDICATORS)}",
+    "missing_years": "country series with years missing between their first and last year",
+}
+
+
+
+# === Rules ===
+def row_flags(raw):
+    """
+    One boolean column per row-level rule, every rule a vectorized expression over whole columns.
+    """
+    values = parse_values(raw["Value"])
+    years = pd.to_numeric(raw["Year"], errors='coerce')
+    country = raw["Country"].astype("string")
+    subtotal = country.str.match(SUBTOTAL_PATTERN.pattern).fillna(False).astype(bool)
+    return pd.DataFrame({
+        "missing_value": raw["Value"].isna(),
+        "non_numeric": raw["Value"].notna() & values.isna(),
+        "invalid_year": years.isna() | (years != years.round()),
+        "unknown_indicator": ~raw["Key Indicator"].astype(str).isin(INDICATOR_REGISTRY),
+        "negative": values < 0,
+        "duplicate": raw.duplicated(KEY_COLUMNS, keep=False),
+        "subtotal": subtotal,
+        "no_group": ~subtotal & country.notna() & (raw["WB Income Group"].isna() | raw["ITU Region"].isna()),
+    }, index=raw.index)
+
+
+def series_issues(raw, flags):
+    """
+    Country-level rules over the usable country rows: {rule: DataFrame of flagged countries or series}.
+    """
+    usable = ~flags[["missing_value", "non_numeric", "invalid_year", "subtotal"]].any(axis=1)
+    rows = raw.loc[usable & raw["Country"].notna(), ["Country", "Key Indicator", "Year"]]
+    rows = rows.assign(Year=pd.to_numeric(rows["Year"]).astype(int))
+
+    present = pd.crosstab(rows["Country"], rows["Key Indicator"]).reindex(columns=BASE_INDICATORS, fill_value=0) > 0
+    lacking = present[~present.all(axis=1)]
+    missing_base = pd.DataFrame({
+        "Country": lacking.index,
+        "Missing": [", ".join(np.array(BASE_INDICATORS)[~row]) for row in lacking.to_numpy()],
+    })
+
+    spans = rows.groupby(["Country", "Key Indicator"])["Year"].agg(["min", "max", "nunique"])
+    gaps = spans["max"] - spans["min"] + 1 - spans["nunique"]
+    missing_years = gaps[gaps > 0].rename("Missing years").reset_index()
+    return {"missing_base": missing_base, "missing_years": missing_years}
+
+
+def _records(frame, limit=SAMPLE_ROWS):
+    sample = frame.head(limit).astype(object)
+    return json.loads(sample.where(sample.notna(), None).to_json(orient="records", default_handler=str))
+
+
+# === Report ===
+def validate_data(raw, cache_path=VALIDATION_CACHE_PATH):
+    """
+    Run every rule over the raw sheet (before Value parsing drops anything) and return a
+    compact report: {"data_hash", "rows", "checked", "counts": {rule: n}, "samples": {rule: [records]}}.
+    Reports are cached per data hash in Cache/validation, so re-loading the same data skips the checks.
+    """
+    missing = [col for col in EXPECTED_COLUMNS if col not in raw.columns]
+    if missing:
+        raise ValueError(f"Missing columns in Excel: {missing}")
+
+    key = data_hash(raw[EXPECTED_COLUMNS])
+    cache_file = os.path.join(cache_path, f"{key[:20]}.json")
+    if os.path.exists(cache_file):
+        with open(cache_file, encoding="utf-8") as f:
+            return json.load(f)
+
+    raw = raw.reset_index(drop=True)
+    flags = row_flags(raw)
+    counts = {rule: int(flags[rule].sum()) for rule in flags}
+    samples = {rule: _records(raw.loc[flags[rule], EXPECTED_COLUMNS]) for rule in flags if counts[rule]}
+    for rule, issues in series_issues(raw, flags).items():
+        counts[rule] = len(issues)
+        if len(issues):
+            samples[rule] = _records(issues)
+
+    report = {
+        "data_hash": key,
+        "rows": len(raw),
+        "checked": datetime.now().isoformat(timespec="seconds"),
+        "counts": {rule: counts[rule] for rule in RULES},
+        "samples": samples,
+    }
+    os.makedirs(cache_path, exist_ok=True)
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_file, cache_file)
+    return report
+
+
+def describe_report(report, samples=2):
+    """
+    Text summary: one line per failed rule with its count and a few sample records.
+    """
+    failed = [rule for rule in RULES if report["counts"].get(rule)]
+    if not failed:
+        return f"✅ Data checks passed ({report['rows']:,} rows)."
+    lines = [f"⚠️ Data checks on {report['rows']:,} rows:"]
+    for rule in failed:
+        lines.append(f"  - {report['counts'][rule]:,} {RULES[rule]}")
+        for record in report["samples"].get(rule, [])[:samples]:
+            lines.append("      " + ", ".join(f"{k}: {v}" for k, v in record.items() if v is not None))
+    return "\n".join(lines)
+
+
+
+# === Module Guard ===
+if __name__ == "__main__":
+    print("This is a helper module. Please run ITU_Main.py instead.")
@@ -0,0 +1,213 @@
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from Slide_Builder import file_hash
+from File_Manager import list_files
+
+
+
+# === Paths ===
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+PRESENTATIONS_PATH = os.path.join(BASE_PATH, 'Presentations')
+EXPORTS_PATH = os.path.join(PRESENTATIONS_PATH, 'Exports')
+EXPORT_CACHE_PATH = os.path.join(BASE_PATH, 'Cache', 'export')
+
+# Cross-platform replacement for the PowerPoint COM export: LibreOffice renders
+# pptx -> pdf headless, poppler's pdftoppm (or PyMuPDF if installed) turns pdf pages into PNGs.
+SOFFICE_CANDIDATES = [
+    "soffice",
+    "libreoffice",
+    r"C:\Program Files\LibreOffice\program\soffice.exe",
+    "/Applications/LibreOffice.app/Contents/MacOS/soffice",
+]
+CONVERT_TIMEOUT = 180  # seconds per deck
+THUMBNAIL_DPI = 96
+
+
+
+def find_converter():
+    """
+    Path of the LibreOffice binary: $ITU_SOFFICE first, then the usual names and install locations.
+    """
+    for candidate in [os.environ.get("ITU_SOFFICE")] + SOFFICE_CANDIDATES:
+        if not candidate:
+            continue
+        found = shutil.which(candidate) or (candidate if os.path.isfile(candidate) else None)
+        if found:
+            return found
+    return None
+
+
+def _run_soffice(soffice, deck_path, out_dir, profile_dir):
+    # A separate user profile per worker lets several soffice processes run side by side
+    cmd = [
+        soffice,
+        f"-env:UserInstallation={Path(profile_dir).resolve().as_uri()}",
+        "--headless", "--norestore",
+        "--convert-to", "pdf",
+        "--outdir", out_dir,
+        deck_path,
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=CONVERT_TIMEOUT)
+    pdf_path = os.path.join(out_dir, Path(deck_path).stem + ".pdf")
+    if result.returncode != 0 or not os.path.exists(pdf_path):
+        raise RuntimeError(f"LibreOffice failed on {os.path.basename(deck_path)}: {result.stderr.strip() or result.stdout.strip()}")
+    return pdf_path
+
+
+def pdf_to_pngs(pdf_path, out_dir, dpi=THUMBNAIL_DPI):
+    """
+    Render every pdf page to <stem>_slide_<n>.png in out_dir. Returns the PNG paths in page order.
+    """
+    stem = Path(pdf_path).stem
+    prefix = os.path.join(out_dir, f"{stem}_slide")
+
+    pdftoppm = shutil.which("pdftoppm")
+    if pdftoppm:
+        subprocess.run([pdftoppm, "-png", "-r", str(dpi), pdf_path, prefix],
+                       check=True, capture_output=True, timeout=CONVERT_TIMEOUT)
+        # pdftoppm pads page numbers to the page count width; normalize to 3 digits
+        pngs = []
+        for f in sorted(os.listdir(out_dir)):
+            if f.startswith(f"{stem}_slide-") and f.endswith(".png"):
+                page = int(f[len(stem) + len("_slide-"):-4])
+                target = f"{prefix}_{page:03d}.png"
+                os.replace(os.path.join(out_dir, f), target)
+                pngs.append(target)
+        return sorted(pngs)
+
+    try:
+        import fitz  # PyMuPDF, optional
+    except ImportError:
+        print("⚠️ Neither pdftoppm nor PyMuPDF found, slide thumbnails skipped.")
+        return []
+
+    pngs = []
+    with fitz.open(pdf_path) as doc:
+        for page_num, page in enumerate(doc, 1):
+            target = f"{prefix}_{page_num:03d}.png"
+            page.get_pixmap(dpi=dpi).save(target)
+            pngs.append(target)
+    return pngs
+
+
+def _copy_outputs(paths, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    copied = []
+    for path in paths:
+        target = os.path.join(out_dir, os.path.basename(path))
+        shutil.copyfile(path, target)
+        copied.append(target)
+    return copied
+
+
+def export_deck(deck_path, out_dir=EXPORTS_PATH, thumbnails=True, dpi=THUMBNAIL_DPI,
+                soffice=None, profile_dir=None, cache_path=EXPORT_CACHE_PATH):
+    """
+    Export one pptx to PDF (and per-slide PNGs) in out_dir.
+    Outputs are cached by deck content hash, so an unchanged deck is never converted twice.
+    """
+    stem = Path(deck_path).stem
+    cache_dir = os.path.join(cache_path, file_hash(deck_path))
+    cached_pdf = os.path.join(cache_dir, f"{stem}.pdf")
+    png_dir = os.path.join(cache_dir, f"png_{dpi}")
+    cached = os.path.exists(cached_pdf) and (not thumbnails or os.path.isdir(png_dir))
+
+    if not cached:
+        os.makedirs(cache_dir, exist_ok=True)
+        if not os.path.exists(cached_pdf):
+            soffice = soffice or find_converter()
+            if soffice is None:
+                raise RuntimeError("LibreOffice not found. Install it or set ITU_SOFFICE to the soffice binary.")
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                pdf_path = _run_soffice(soffice, deck_path, tmp_dir, profile_dir or os.path.join(tmp_dir, "profile"))
+                os.replace(pdf_path, cached_pdf)
+        if thumbnails:
+            tmp_png_dir = f"{png_dir}.{os.getpid()}.tmp"
+            os.makedirs(tmp_png_dir, exist_ok=True)
+            pdf_to_pngs(cached_pdf, tmp_png_dir, dpi)
+            shutil.rmtree(png_dir, ignore_errors=True)
+            os.replace(tmp_png_dir, png_dir)
+
+    pngs = sorted(os.path.join(png_dir, f) for f in os.listdir(png_dir)) if thumbnails else []
+    outputs = _copy_outputs([cached_pdf] + pngs, out_dir)
+    return {"deck": deck_path, "pdf": outputs[0], "pngs": outputs[1:], "cached": cached}
+
+
+def export_decks(deck_paths, out_dir=EXPORTS_PATH, thumbnails=True, dpi=THUMBNAIL_DPI, max_workers=None):
+    """
+    Export many decks concurrently on a pool of LibreOffice processes, one profile per worker.
+    """
+    if not deck_paths:
+        print("⚠️ Nothing to export: no decks selected.")
+        return []
+    soffice = find_converter()
+    max_workers = max_workers or min(len(deck_paths), os.cpu_count() or 1, 4)
+
+    with tempfile.TemporaryDirectory() as profiles_root:
+        profiles = queue.Queue()
+        for i in range(max_workers):
+            profiles.put(os.path.join(profiles_root, f"profile_{i}"))
+
+        def run(deck_path):
+            profile_dir = profiles.get()
+            try:
+                return export_deck(deck_path, out_dir, thumbnails, dpi, soffice, profile_dir)
+            except Exception as e:
+                return {"deck": deck_path, "error": str(e)}
+            finally:
+                profiles.put(profile_dir)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(run, deck_paths))
+
+
+def export_presentations(presentations_path=PRESENTATIONS_PATH, out_dir=EXPORTS_PATH):
+    """
+    Interactive wrapper: pick presentations by number and export them to PDF and PNG.
+    """
+    presentations = list_files(presentations_path, '*.pptx')
+    if not presentations:
+        print("❌ No presentations found in the Presentations folder.")
+        return
+
+    print("\nAvailable Presentations:")
+    for i, f in enumerate(presentations, 1):
+        print(f"{i}. {f}")
+    selection = input("Select presentations to export (e.g., 1,3-4 or 'all'): ").strip()
+
+    if selection.lower() == "all":
+        selected = presentations
+    else:
+        try:
+            numbers = set()
+            for part in selection.replace(' ', '').split(','):
+                if '-' in part:
+                    start, end = map(int, part.split('-'))
+                    numbers.update(range(start, end + 1))
+                else:
+                    numbers.add(int(part))
+        except ValueError:
+            print("❌ Invalid selection.")
+            return
+        selected = [presentations[n - 1] for n in sorted(numbers) if 1 <= n <= len(presentations)]
+
+    results = export_decks([os.path.join(presentations_path, f) for f in selected], out_dir)
+    for result in results:
+        name = os.path.basename(result["deck"])
+        if "error" in result:
+            print(f"❌ {name}: {result['error']}")
+        else:
+            source = "cache" if result["cached"] else "LibreOffice"
+            print(f"✅ {name} -> {os.path.basename(result['pdf'])} + {len(result['pngs'])} slide images ({source})")
+
+
+
+# === Module Guard ===
+if __name__ == "__main__":
+    print("This is a helper module. Please run ITU_Main.py instead.")
@@ -0,0 +1,449 @@
+import os
+import re
+import zlib
+import difflib
+import hashlib
+import posixpath
+import zipfile
+from lxml import etree
+from pptx.util import Cm
+
+
+
+# === Package parts ===
+NS = {
+    "p": "http://schemas.openxmlformats.org/presentationml/2006/main",
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "pr": "http://schemas.openxmlformats.org/package/2006/relationships",
+    "ct": "http://schemas.openxmlformats.org/package/2006/content-types",
+}
+PRESENTATION = "ppt/presentation.xml"
+CONTENT_TYPES = "[Content_Types].xml"
+SLIDE_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.slide+xml"
+REL_SLIDE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/slide"
+
+# Relationship ids in part XML (r:embed of pictures, r:id of charts and links)
+RID_PATTERN = re.compile(rb'(r:(?:id|embed|link|pict))="(rId\d+)"')
+
+# The slide number box of add_slide_number(): 2 x 1 cm, bottom right, 10 pt bold
+NUMBER_SIZE = (int(Cm(2)), int(Cm(1)))
+NUMBER_BOX = (
+    '<p:sp xmlns:p="{p}" xmlns:a="{a}"><p:nvSpPr><p:cNvPr id="{id}" name="TextBox {index}"/><p:cNvSpPr txBox="1"/>'
+    '<p:nvPr/></p:nvSpPr><p:spPr><a:xfrm><a:off x="{x}" y="{y}"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+    '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom><a:noFill/></p:spPr><p:txBody><a:bodyPr wrap="none">'
+    '<a:spAutoFit/></a:bodyPr><a:lstStyle/><a:p><a:pPr algn="ctr"><a:defRPr sz="1000" b="1"/></a:pPr>'
+    '<a:r><a:t>{number}</a:t></a:r></a:p></p:txBody></p:sp>'
+)
+COVER_MARK = "slide_layout_1_"  # cover slides are not numbered
+
+
+
+def _q(tag):
+    prefix, name = tag.split(":")
+    return f"{{{NS[prefix]}}}{name}"
+
+
+def rels_name(part):
+    folder, name = posixpath.split(part)
+    return posixpath.join(folder, "_rels", f"{name}.rels")
+
+
+def serialize(tree):
+    return etree.tostring(tree, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+
+class DeckPackage:
+    """
+    A pptx as the zip of parts it is. Parts are read and parsed on demand; on save only parts
+    that were edited or added are serialized, all others are copied from the original archive,
+    and the result replaces the target file in one step.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.zip = zipfile.ZipFile(path)
+        self.infos = {info.filename: info for info in self.zip.infolist()}
+        self.added = {}
+        self.trees = {}
+        self.dirty = set()
+        self._by_content = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.zip.close()
+
+    def __contains__(self, name):
+        return name in self.infos or name in self.added
+
+    def names(self):
+        return list(self.infos) + list(self.added)
+
+    def read(self, name):
+        return self.added[name] if name in self.added else self.zip.read(name)
+
+    def xml(self, name):
+        if name not in self.trees:
+            self.trees[name] = etree.fromstring(self.read(name))
+        return self.trees[name]
+
+    def touch(self, name):
+        self.dirty.add(name)
+
+    def content_token(self, name):
+        # Identity of a part's bytes from the zip directory (CRC and size), without reading it
+        if name in self.added:
+            return zlib.crc32(self.added[name]), len(self.added[name])
+        info = self.infos[name]
+        return info.CRC, info.file_size
+
+    def rels(self, part):
+        """
+        {rId: (relationship type, target part name or external URL, is external)} of a part.
+        """
+        name = rels_name(part)
+        if name not in self:
+            return {}
+        rels = {}
+        for rel in self.xml(name):
+            external = rel.get("TargetMode") == "External"
+            target = rel.get("Target")
+            target = target if external else posixpath.normpath(posixpath.join(posixpath.dirname(part), target))
+            rels[rel.get("Id")] = (rel.get("Type"), target, external)
+        return rels
+
+    def add_rel(self, part, reltype, target, rId=None, external=False):
+        name = rels_name(part)
+        if name not in self:
+            self.add_part(name, b'<Relationships xmlns="%s"/>' % NS["pr"].encode(),
+                          "application/vnd.openxmlformats-package.relationships+xml")
+        root = self.xml(name)
+        rId = rId or f"rId{max([int(rel.get('Id')[3:]) for rel in root] + [0]) + 1}"
+        rel = etree.SubElement(root, _q("pr:Relationship"), Id=rId, Type=reltype,
+                               Target=target if external else posixpath.relpath(target, posixpath.dirname(part)))
+        if external:
+            rel.set("TargetMode", "External")
+        self.touch(name)
+        return rId
+
+    def content_type(self, name):
+        types = self.xml(CONTENT_TYPES)
+        for override in types.iterfind(_q("ct:Override")):
+            if override.get("PartName") == f"/{name}":
+                return override.get("ContentType")
+        extension = name.rsplit(".", 1)[-1].lower()
+        for default in types.iterfind(_q("ct:Default")):
+            if default.get("Extension").lower() == extension:
+                return default.get("ContentType")
+        return None
+
+    def add_part(self, name, blob, content_type):
+        self.added[name] = blob
+        if self._by_content is not None:
+            self._by_content.setdefault(self.content_token(name), []).append(name)
+        if self.content_type(name) != content_type:
+            etree.SubElement(self.xml(CONTENT_TYPES), _q("ct:Override"), PartName=f"/{name}",
+                             ContentType=content_type)
+            self.touch(CONTENT_TYPES)
+
+    def find_part(self, blob, folder):
+        """
+        An existing part of the folder with exactly these bytes (media added twice is stored once).
+        """
+        if self._by_content is None:
+            self._by_content = {}
+            for name in self.names():
+                self._by_content.setdefault(self.content_token(name), []).append(name)
+        for name in self._by_content.get((zlib.crc32(blob), len(blob)), []):
+            if posixpath.dirname(name) == folder and self.read(name) == blob:
+                return name
+        return None
+
+    def new_name(self, like):
+        # ppt/media/image3.png -> the next free ppt/media/imageN.png
+        folder, name = posixpath.split(like)
+        stem, extension = posixpath.splitext(name)
+        stem = stem.rstrip("0123456789")
+        pattern = re.compile(rf"^{re.escape(stem)}(\d+){re.escape(extension)}$")
+        taken = [int(m.group(1)) for other in self.names() if posixpath.dirname(other) == folder
+                 for m in [pattern.match(posixpath.basename(other))] if m]
+        return posixpath.join(folder, f"{stem}{max(taken + [0]) + 1}{extension}")
+
+    def save(self, out=None):
+        """
+        Write the package to out (default: in place) through a temporary file in the same folder.
+        Returns the names of the parts that were written anew.
+        """
+        out = out or self.path
+        tmp_path = os.path.join(os.path.dirname(os.path.abspath(out)), f".{os.getpid()}.{os.path.basename(out)}")
+        written = sorted(self.dirty | set(self.added))
+        try:
+            with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as target:
+                for name, info in self.infos.items():
+                    target.writestr(info, serialize(self.trees[name]) if name in self.dirty else self.zip.read(info))
+                for name, blob in self.added.items():
+                    target.writestr(name, serialize(self.trees[name]) if name in self.dirty else blob)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        self.zip.close()  # the original must be closed before it is replaced (Windows)
+        os.replace(tmp_path, out)
+        return written
+
+
+# === Slides ===
+def slide_list(package):
+    """
+    (slide id, slide part name) of every slide, in presentation order.
+    """
+    id_list = package.xml(PRESENTATION).find(_q("p:sldIdLst"))
+    if id_list is None:
+        return []
+    rels = package.rels(PRESENTATION)
+    return [(int(sld.get("id")), rels[sld.get(_q("r:id"))][1]) for sld in id_list]
+
+
+def _shape_text(shape):
+    return "\n".join("".join(t.text or "" for t in p.iter(_q("a:t"))) for p in shape.iter(_q("a:p"))).strip()
+
+
+def _shapes(slide_tree):
+    return slide_tree.find(f"{_q('p:cSld')}/{_q('p:spTree')}")
+
+
+def slide_title(slide_tree):
+    # Text of the first shape that has any, as in the insert menu's slide listing
+    for shape in _shapes(slide_tree).iterfind(_q("p:sp")):
+        text = _shape_text(shape)
+        if text:
+            return text.replace("\n", " ")
+    return None
+
+
+def slide_fingerprint(package, part):
+    """
+    Content hash of a slide: its XML with every relationship id replaced by the identity of
+    what it points to, so the same picture under another rId or media name hashes the same.
+    The slide number box is left out: a slide that was only renumbered is unchanged.
+    """
+    tokens = {}
+    for rId, (reltype, target, external) in package.rels(part).items():
+        token = target if external else "%08x:%d" % package.content_token(target)
+        tokens[rId.encode()] = f"{reltype.rsplit('/', 1)[-1]}:{token}".encode()
+    tree = etree.fromstring(package.read(part))
+    shapes = _shapes(tree)
+    for box in _number_boxes(shapes):
+        shapes.remove(box)
+    xml = RID_PATTERN.sub(lambda m: m.group(1) + b'="' + tokens.get(m.group(2), m.group(2)) + b'"',
+                          etree.tostring(tree))
+    return hashlib.sha1(xml).hexdigest()
+
+
+def deck_slides(path):
+    """
+    One record per slide ({"id", "part", "title", "fingerprint"}), read from the zip without
+    building a python-pptx presentation.
+    """
+    with DeckPackage(path) as package:
+        return [
+            {"id": slide_id, "part": part, "title": slide_title(package.xml(part)),
+             "fingerprint": slide_fingerprint(package, part)}
+            for slide_id, part in slide_list(package)
+        ]
+
+
+# === Diff ===
+def _pair(old, new, old_slides, new_slides):
+    # Within a changed run, pair slides by slide id (kept by in-place saves), then by title
+    pairs, old, new = [], list(old), list(new)
+    for key in ("id", "title"):
+        for i in list(old):
+            match = next((j for j in new if old_slides[i][key] and new_slides[j][key] == old_slides[i][key]), None)
+            if match is not None:
+                old.remove(i)
+                new.remove(match)
+                pairs.append((i, match))
+    return sorted(pairs), old, new
+
+
+def diff_decks(old_path, new_path):
+    """
+    Slides added, removed, changed or moved between two versions of a deck. Slides are compared
+    by content fingerprint and aligned as sequences. Returns records
+    {"change", "old", "new", "title"} with 1-based positions (None where a slide does not exist).
+    """
+    old_slides, new_slides = deck_slides(old_path), deck_slides(new_path)
+    matcher = difflib.SequenceMatcher(None, [s["fingerprint"] for s in old_slides],
+                                      [s["fingerprint"] for s in new_slides], autojunk=False)
+    changed, removed, added = [], [], []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        pairs, gone, new = _pair(range(i1, i2), range(j1, j2), old_slides, new_slides)
+        changed += pairs
+        removed += gone
+        added += new
+
+    # A slide removed in one place and added unchanged in another has moved
+    moved = []
+    for i in list(removed):
+        match = next((j for j in added if new_slides[j]["fingerprint"] == old_slides[i]["fingerprint"]), None)
+        if match is not None:
+            removed.remove(i)
+            added.remove(match)
+            moved.append((i, match))
+
+    changes = [{"change": "changed", "old": i + 1, "new": j + 1, "title": new_slides[j]["title"]} for i, j in changed]
+    changes += [{"change": "moved", "old": i + 1, "new": j + 1, "title": new_slides[j]["title"]} for i, j in moved]
+    changes += [{"change": "added", "old": None, "new": j + 1, "title": new_slides[j]["title"]} for j in added]
+    changes += [{"change": "removed", "old": i + 1, "new": None, "title": old_slides[i]["title"]} for i in removed]
+    return sorted(changes, key=lambda c: (c["new"] if c["new"] is not None else c["old"] - 0.5, c["change"]))
+
+
+def describe_diff(changes):
+    if not changes:
+        return "✅ No slide differences."
+    symbols = {"added": "➕", "removed": "➖", "changed": "✏️", "moved": "↕️"}
+    lines = []
+    for c in changes:
+        where = {"added": f"slide {c['new']}", "removed": f"slide {c['old']}"}.get(
+            c["change"], f"slide {c['old']} → {c['new']}")
+        lines.append(f"{symbols[c['change']]} {c['change']:<7} {where}: {c['title'] or '[No title]'}")
+    return "\n".join(lines)
+
+
+# === Incremental insert ===
+def _layout_names(package):
+    names = {}
+    for name in package.names():
+        if name.startswith("ppt/slideLayouts/") and name.endswith(".xml"):
+            names.setdefault(package.xml(name).find(_q("p:cSld")).get("name"), name)
+    return names
+
+
+def _copy_part(package, source, name, copied):
+    """
+    Copy a part (and what it refers to) from another package. Binary parts already present
+    with the same bytes, such as a chart picture embedded before, are reused instead.
+    """
+    if name in copied:
+        return copied[name]
+    blob = source.read(name)
+    existing = None if name.endswith(".xml") else package.find_part(blob, posixpath.dirname(name))
+    if existing:
+        copied[name] = existing
+        return existing
+
+    new_name = copied[name] = package.new_name(name)
+    package.add_part(new_name, blob, source.content_type(name))
+    for rId, (reltype, target, external) in source.rels(name).items():
+        target = target if external else _copy_part(package, source, target, copied)
+        package.add_rel(new_name, reltype, target, rId, external)
+    return new_name
+
+
+def copy_slide(package, source_path, position=0):
+    """
+    Add a copy of one slide of another pptx to the package (not yet to the slide list):
+    slide XML unchanged, its layout mapped to the deck's layout of the same name, notes dropped.
+    Returns the new slide part name.
+    """
+    with DeckPackage(source_path) as source:
+        slide_part = slide_list(source)[position][1]
+        layouts, copied = _layout_names(package), {}
+        new_part = package.new_name("ppt/slides/slide1.xml")
+        package.add_part(new_part, source.read(slide_part), SLIDE_TYPE)
+        for rId, (reltype, target, external) in source.rels(slide_part).items():
+            kind = reltype.rsplit("/", 1)[-1]
+            if kind == "notesSlide":
+                continue
+            if kind == "slideLayout":
+                layout_name = source.xml(target).find(_q("p:cSld")).get("name")
+                target = layouts.get(layout_name) or next(iter(layouts.values()))
+            elif not external:
+                target = _copy_part(package, source, target, copied)
+            package.add_rel(new_part, reltype, target, rId, external)
+    return new_part
+
+
+def _number_boxes(shapes):
+    boxes = []
+    for shape in shapes.iterfind(_q("p:sp")):
+        ext = shape.find(f"{_q('p:spPr')}/{_q('a:xfrm')}/{_q('a:ext')}")
+        if ext is not None and (int(ext.get("cx")), int(ext.get("cy"))) == NUMBER_SIZE and _shape_text(shape).isdigit():
+            boxes.append(shape)
+    return boxes
+
+
+def renumber_slides(package):
+    """
+    Slide numbers as add_slide_number() draws them: every slide but covers shows its position.
+    Only slides whose number box changes are edited. Returns the number of slides edited.
+    """
+    size = package.xml(PRESENTATION).find(_q("p:sldSz"))
+    x, y = int(size.get("cx")) - int(Cm(2.5)), int(size.get("cy")) - int(Cm(1))
+    edited = 0
+    for number, (_, part) in enumerate(slide_list(package), 1):
+        shapes = _shapes(package.xml(part))
+        boxes = _number_boxes(shapes)
+        cover = any(COVER_MARK in _shape_text(shape) for shape in shapes.iterfind(_q("p:sp")))
+        wanted = [] if cover else [str(number)]
+        if [_shape_text(box) for box in boxes] == wanted:
+            continue
+
+        for box in boxes:
+            shapes.remove(box)
+        if wanted:
+            shape_id = max([int(i) for i in shapes.xpath(".//p:cNvPr/@id", namespaces=NS)] + [0]) + 1
+            box = etree.fromstring(NUMBER_BOX.format(id=shape_id, index=shape_id - 1, x=x, y=y, cx=NUMBER_SIZE[0],
+                                                     cy=NUMBER_SIZE[1], number=number, **NS))
+            ext_list = shapes.find(_q("p:extLst"))
+            if ext_list is None:
+                shapes.append(box)
+            else:
+                ext_list.addprevious(box)
+        package.touch(part)
+        edited += 1
+    return edited
+
+
+def insert_slides(deck_path, slide_files, insert_after, out=None):
+    """
+    Insert the first slide of each slide file after the given slide numbers of the deck (0 = at
+    the start) and renumber the slides, patching the package: the new slides, the slides whose
+    number changes and the slide list are rewritten, every other part and all media already in
+    the deck are copied as they are. Saved in place (or to out) atomically.
+    Returns (0-based position of each inserted slide, names of the parts written).
+    """
+    with DeckPackage(deck_path) as package:
+        presentation = package.xml(PRESENTATION)
+        id_list = presentation.find(_q("p:sldIdLst"))
+        if id_list is None:
+            id_list = etree.Element(_q("p:sldIdLst"))
+            presentation.find(_q("p:sldMasterIdLst")).addnext(id_list)
+        next_id = max([int(sld.get("id")) for sld in id_list] + [255]) + 1
+
+        # Positions refer to the original deck: each insert shifts the later ones by one
+        positions = [None] * len(slide_files)
+        order = sorted(range(len(slide_files)), key=lambda k: insert_after[k])
+        for offset, k in enumerate(order):
+            part = copy_slide(package, slide_files[k])
+            rId = package.add_rel(PRESENTATION, REL_SLIDE, part)
+            sld = etree.Element(_q("p:sldId"), id=str(next_id))
+            sld.set(_q("r:id"), rId)
+            positions[k] = insert_after[k] + offset
+            id_list.insert(positions[k], sld)
+            next_id += 1
+        package.touch(PRESENTATION)
+
+        renumber_slides(package)
+        written = package.save(out)
+    return positions, written
+
+
+
+# === Module Guard ===
+if __name__ == "__main__":
+    print("This is a helper module. Please run ITU_Main.py instead.")
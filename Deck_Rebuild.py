@@ -0,0 +1,174 @@
+import os
+from pptx import Presentation
+from pptx.enum.shapes import MSO_SHAPE_TYPE
+
+from Create_Charts import chart_data_hash, spec_chart_data, redraw_chart
+from Slide_Builder import file_hash, picture_source, is_vector_chart, attach_svg
+from File_Manager import drop_unused_rels, list_files
+from Lineage import chart_record, record_chart, pptx_slides, record_pptx
+from Deck_Patch import DeckPackage, slide_list
+
+
+
+# === Staleness ===
+def stale_charts(df, chart_paths):
+    """
+    Charts whose plotted values, recomputed from df, differ from the values they were drawn with
+    (or whose file is gone). Aggregating is cheap next to a 300 dpi render, so only those are redrawn.
+    Returns ({path: (lineage record, chart data)}, [paths without lineage]).
+    """
+    stale, unknown = {}, []
+    for path in dict.fromkeys(chart_paths):
+        record = chart_record(path)
+        if record is None:
+            unknown.append(path)
+            continue
+        chart_data = spec_chart_data(df, record["spec"])
+        if chart_data.empty:
+            continue
+        if chart_data_hash(chart_data) != record["data_hash"] or not os.path.exists(path):
+            stale[path] = (record, chart_data)
+    return stale, unknown
+
+
+def refresh_charts(stale):
+    """
+    Re-render stale charts in place (JPEG and PNG, or SVG and PDF, of a chart once) and record their new data hash.
+    """
+    done = set()
+    for path, (record, chart_data) in stale.items():
+        if path in done:
+            continue
+        pair = [path] + ([record["sibling"]] if record["sibling"] else [])
+        redraw_chart(chart_data, record["spec"], *pair)
+        record_chart(pair, record["spec"], chart_data_hash(chart_data))
+        done.update(pair)
+    return sorted(done)
+
+
+# === Slides ===
+def lineage_matches(pptx_path, entries):
+    """
+    Whether the recorded slides still line up with the file (slides deleted or added outside
+    this project shift the positions). Counts slides from the zip without loading the deck.
+    """
+    with DeckPackage(pptx_path) as package:
+        count = len(slide_list(package))
+    if count == len(entries):
+        return True
+    print(f"⚠️ {os.path.basename(pptx_path)} has {count} slides but {len(entries)} recorded; skipped. "
+          f"Rebuild it from its slides to record its lineage again.")
+    return False
+
+
+def restamp_pictures(slide, chart_files):
+    """
+    Point the pictures of a slide (in shape order) at the current chart files.
+    Everything else on the slide, including text typed in PowerPoint, is kept.
+    """
+    pictures = [shape for shape in slide.shapes if shape.shape_type == MSO_SHAPE_TYPE.PICTURE]
+    for picture, chart_file in zip(pictures, chart_files):
+        image_file = picture_source(chart_file, picture.width, picture.height)
+        _, rId = slide.part.get_or_add_image_part(image_file)
+        picture._element.blipFill.blip.rEmbed = rId
+        if is_vector_chart(chart_file):
+            attach_svg(slide, picture, chart_file)
+    drop_unused_rels(slide.part)
+
+
+def rebuild_pptx(pptx_path):
+    """
+    Re-stamp only the slides of a pptx whose charts changed since they were embedded,
+    then save it in place. Returns the number of slides re-stamped.
+    """
+    entries = pptx_slides(pptx_path)
+    if not entries or not lineage_matches(pptx_path, entries):
+        return 0
+    affected = []
+    for position, entry in enumerate(entries):
+        charts = entry["charts"]
+        current = [file_hash(c) if os.path.exists(c) else None for c in charts]
+        if charts and current != entry["chart_hashes"] and all(current):
+            affected.append((position, current))
+    if not affected:
+        return 0
+
+    prs = Presentation(pptx_path)
+    slides = list(prs.slides)
+    for position, current in affected:
+        restamp_pictures(slides[position], entries[position]["charts"])
+        entries[position]["chart_hashes"] = current
+    prs.save(pptx_path)
+    record_pptx(pptx_path, entries)
+    return len(affected)
+
+
+def rebuild_deck(df, deck_path):
+    """
+    Bring a deck (or slide file) up to date with df: re-render only the stale charts it uses,
+    then re-stamp only the affected slides of the deck and of the slide files it was compiled from.
+    """
+    entries = pptx_slides(deck_path)
+    if not entries:
+        raise ValueError(f"No lineage recorded for {os.path.basename(deck_path)}.")
+    if not lineage_matches(deck_path, entries):
+        return {"deck": deck_path, "charts": 0, "files": [], "slides": 0, "unknown": [], "skipped": True}
+
+    chart_paths = [chart for entry in entries for chart in entry["charts"]]
+    stale, unknown = stale_charts(df, chart_paths)
+    rendered = refresh_charts(stale)
+
+    sources = [entry["source"] for entry in entries if entry["source"] and os.path.exists(entry["source"])]
+    slides = sum(rebuild_pptx(source) for source in dict.fromkeys(sources))
+    slides += rebuild_pptx(deck_path)
+    return {"deck": deck_path, "charts": len(rendered) // 2, "files": rendered, "slides": slides, "unknown": unknown}
+
+
+def rebuild_decks(df, deck_paths):
+    # One after another: decks often share charts, and a chart is re-rendered only once
+    return [rebuild_deck(df, path) for path in deck_paths]
+
+
+def describe_rebuild(result):
+    if result.get("skipped"):
+        return f"{os.path.basename(result['deck'])}: skipped, its slides no longer match the recorded lineage"
+    message = (f"{os.path.basename(result['deck'])}: {result['charts']} stale chart(s) re-rendered, "
+               f"{result['slides']} slide(s) re-stamped")
+    if result["unknown"]:
+        message += f"; {len(result['unknown'])} chart(s) without a recorded spec left as they are"
+    return message
+
+
+def ask_rebuild_selection(presentations_path, slides_path):
+    """
+    Pick decks (or slide files) that have lineage. Returns their paths.
+    """
+    candidates = [os.path.join(presentations_path, f) for f in list_files(presentations_path, "*.pptx")]
+    candidates += [os.path.join(slides_path, f) for f in list_files(slides_path, "*.pptx")]
+    candidates = [path for path in candidates if pptx_slides(path)]
+    if not candidates:
+        print("❌ No presentations or slides with recorded chart lineage.")
+        return []
+
+    print("\nPresentations and slides with lineage:")
+    for i, path in enumerate(candidates, 1):
+        print(f"{i}. {os.path.relpath(path, os.path.dirname(presentations_path))}")
+    selection = input("Select files to rebuild (e.g., 1,3 or 'all'): ").strip().lower()
+    if selection == "all":
+        return candidates
+    numbers = {int(part) for part in selection.replace(' ', '').split(',') if part.isdigit()}
+    return [candidates[n - 1] for n in sorted(numbers) if 1 <= n <= len(candidates)]
+
+
+def rebuild_presentations(df, presentations_path, slides_path):
+    """
+    Interactive wrapper: pick decks with lineage and rebuild them after a data refresh.
+    """
+    for result in rebuild_decks(df, ask_rebuild_selection(presentations_path, slides_path)):
+        print(f"✅ {describe_rebuild(result)}.")
+
+
+
+# === Module Guard ===
+if __name__ == "__main__":
+    print("This is a helper module. Please run ITU_Main.py instead.")
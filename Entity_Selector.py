@@ -0,0 +1,298 @@
+import os
+import re
+import json
+import bisect
+import unicodedata
+from collections import defaultdict
+
+from Create_Charts import SUBTOTAL_PATTERN, entity_options, entity_members
+from Ranking_Index import is_ranking_selection
+
+
+
+# === Paths ===
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+PRESETS_PATH = os.path.join(BASE_PATH, 'Presets', 'selections.json')
+
+# "region:Africa", "income:Low-income", "country:Kenya", "iso:KEN"
+GROUP_PREFIXES = {
+    "region": "ITU Region", "regions": "ITU Region",
+    "income": "WB Income Group", "incomegroup": "WB Income Group",
+    "country": "Country", "iso": "ISO",
+}
+
+NGRAM = 2
+MIN_SIMILARITY = 0.3
+
+
+
+def normalize(text):
+    """
+    Lower-case ASCII words: accents stripped, punctuation and hyphens turned into spaces.
+    """
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode()
+    return re.sub(r'[^a-z0-9]+', ' ', text.lower()).strip()
+
+
+def ngrams(text, n=NGRAM):
+    padded = f" {text} "
+    return {padded[i:i + n] for i in range(max(len(padded) - n + 1, 1))}
+
+
+class EntitySelector:
+    """
+    In-memory name index over countries, income groups, regions and World.
+    Prefix lookups use a sorted key list (bisect), fuzzy lookups a character bigram index,
+    so a keystroke-sized query never scans every entity.
+    entities: {name: level}, members: {(level, group): [countries]}, iso_codes: {name: ISO3}.
+    """
+
+    def __init__(self, entities, members=None, iso_codes=None):
+        self.levels = dict(entities)
+        self.members = members or {}
+        self.iso_codes = {name: iso for name, iso in (iso_codes or {}).items() if name in self.levels}
+        self._by_iso = {normalize(iso): name for name, iso in self.iso_codes.items()}
+
+        self._exact = {}
+        self._grams = defaultdict(set)
+        self._gram_count = {}
+        keys = []
+        for name in self.levels:
+            key = normalize(name)
+            self._exact.setdefault(key, name)
+            # Every word suffix is a key, so "guinea" finds "Papua New Guinea" by prefix
+            words = key.split()
+            keys += [(" ".join(words[i:]), i, name) for i in range(len(words))]
+            grams = ngrams(key)
+            self._gram_count[name] = len(grams)
+            for gram in grams:
+                self._grams[gram].add(name)
+        for key, name in self._by_iso.items():
+            self._exact.setdefault(key, name)
+
+        keys.sort()
+        self._keys = [key for key, _, _ in keys]
+        self._key_entries = [(position, name) for _, position, name in keys]
+
+    def prefix(self, query):
+        """
+        Names with a word starting with query; matches at the start of the name come first.
+        """
+        query = normalize(query)
+        if not query:
+            return []
+        start = bisect.bisect_left(self._keys, query)
+        hits = []
+        for i in range(start, len(self._keys)):
+            if not self._keys[i].startswith(query):
+                break
+            hits.append(self._key_entries[i])
+        hits.sort(key=lambda hit: (hit[0], hit[1]))
+        return list(dict.fromkeys(name for _, name in hits))
+
+    def fuzzy(self, query, limit=10, min_similarity=MIN_SIMILARITY):
+        """
+        Names ranked by n-gram (Jaccard) similarity, for typos like 'kenia' or 'phillipines'.
+        """
+        grams = ngrams(normalize(query))
+        shared = defaultdict(int)
+        for gram in grams:
+            for name in self._grams.get(gram, ()):
+                shared[name] += 1
+        scored = [
+            (count / (len(grams) + self._gram_count[name] - count), name)
+            for name, count in shared.items()
+        ]
+        scored = [(score, name) for score, name in scored if score >= min_similarity]
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [name for _, name in scored[:limit]]
+
+    def search(self, query, limit=10):
+        """
+        Exact name or ISO code first, then prefix matches, then fuzzy matches.
+        """
+        key = normalize(query)
+        hits = [self._exact[key]] if key in self._exact else []
+        hits += self.prefix(key)
+        if len(hits) < limit:
+            hits += self.fuzzy(key, limit)
+        return list(dict.fromkeys(hits))[:limit]
+
+    def expand(self, level, value):
+        """
+        Members of one group, e.g. expand("ITU Region", "afr") -> the African countries.
+        """
+        if level == "ISO":
+            name = self._by_iso.get(normalize(value))
+            if name is None:
+                raise LookupError(f"Unknown ISO code: {value}")
+            return [name]
+        if level == "Country":
+            return [self._unique(value, [n for n, lvl in self.levels.items() if lvl == "Country"])]
+
+        group = self._unique(value, [group for lvl, group in self.members if lvl == level])
+        # Subtotal rows stored under the Country column are never expanded as group members
+        return [name for name in self.members[(level, group)] if not SUBTOTAL_PATTERN.match(name)]
+
+    def _unique(self, value, candidates):
+        key = normalize(value)
+        exact = [c for c in candidates if normalize(c) == key]
+        if exact:
+            return exact[0]
+        hits = [c for c in candidates if normalize(c).startswith(key)]
+        if len(hits) == 1:
+            return hits[0]
+        raise LookupError(f"'{value}' matches {', '.join(hits) if hits else 'nothing'}.")
+
+    def resolve(self, token):
+        """
+        Names for one typed token: a group expansion, an exact name or ISO code, or a unique prefix.
+        """
+        token = token.strip()
+        if ':' in token:
+            prefix, value = token.split(':', 1)
+            level = GROUP_PREFIXES.get(normalize(prefix).replace(" ", ""))
+            if level is not None:
+                return self.expand(level, value)
+
+        key = normalize(token)
+        if key in self._exact:
+            return [self._exact[key]]
+        hits = self.prefix(key)
+        if len(hits) == 1:
+            return hits
+        suggestions = hits[:5] or self.fuzzy(key, 5)
+        if suggestions:
+            raise LookupError(f"'{token}' is ambiguous or unknown. Did you mean: {', '.join(suggestions)}?")
+        raise LookupError(f"No match for '{token}'.")
+
+    def select(self, text, all_options=(), ranking=None, presets=None):
+        """
+        Resolve a comma-separated selection. Tokens may be names, ISO codes, prefixes, groups
+        ('region:Africa'), presets ('@name'), rankings ('top10:Subscribers:2023') or numbers of
+        all_options ('1,3-5'). Returns (names, problems).
+        """
+        names, problems = [], []
+        for part in text.split(','):
+            part = part.strip()
+            if not part:
+                continue
+            try:
+                if part.startswith("@"):
+                    found = (presets or {})[part[1:].strip()]
+                elif ranking is not None and is_ranking_selection(part):
+                    found = ranking.select(part)
+                elif re.fullmatch(r'\d+(\s*-\s*\d+)?', part):
+                    start, _, end = part.partition('-')
+                    numbers = range(int(start), int(end or start) + 1)
+                    found = [all_options[i - 1] for i in numbers if 1 <= i <= len(all_options)]
+                else:
+                    found = self.resolve(part)
+            except KeyError as e:
+                problems.append(f"Unknown preset or indicator: {e}")
+                continue
+            except (LookupError, ValueError) as e:
+                problems.append(str(e))
+                continue
+            names += [name for name in found if name not in names]
+        return names, problems
+
+    def prompt(self, all_options, ranking=None, presets_path=PRESETS_PATH):
+        """
+        Interactive, incremental selection used by create() instead of the numbered list.
+        """
+        presets = load_presets(presets_path)
+        print("\n Select countries/regions:")
+        print("Type names, ISO codes or prefixes, e.g. 'alb, KEN, region:Africa, income:Low-income, World'.")
+        print("'?text' searches, '@name' uses a preset, 'save:name' saves the selection, 'list' shows all options.")
+        if ranking is not None:
+            print("Rankings can be mixed in, e.g. 'top10:Subscribers:2023' or 'bottom5:ARPU:2020:region'.")
+        if presets:
+            print(f"Presets: {', '.join('@' + name for name in presets)}")
+
+        selected = []
+        while True:
+            line = input(f"Add to selection ({len(selected)} selected, Enter to finish): ").strip()
+            if not line:
+                break
+            if line.lower() == "list":
+                for idx, name in enumerate(all_options, 1):
+                    print(f"{idx}. {name}")
+                continue
+            if line.startswith("?"):
+                hits = self.search(line[1:])
+                print(" " + (", ".join(hits) if hits else "No matches."))
+                continue
+            if line.lower().startswith("save:"):
+                name = line[5:].strip()
+                if name and selected:
+                    presets = save_preset(name, selected, presets_path)
+                    print(f"✅ Preset '@{name}' saved ({len(selected)} entries).")
+                continue
+
+            names, problems = self.select(line, all_options, ranking, presets)
+            for problem in problems:
+                print(f" {problem}")
+            selected += [name for name in names if name not in selected]
+            if names:
+                print(f" Selected: {', '.join(selected)}")
+        return selected or None
+
+
+# === Presets ===
+def load_presets(path=PRESETS_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_preset(name, names, path=PRESETS_PATH):
+    presets = load_presets(path)
+    presets[name] = list(names)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(presets, f, indent=2, ensure_ascii=False)
+    return presets
+
+
+# === Building ===
+def load_iso_codes():
+    """
+    Country name -> ISO3 from the bundled ITU DataHub exports; empty if they are not available.
+    """
+    try:
+        from Basket_Analytics import load_baskets
+        baskets = load_baskets()
+    except (ImportError, OSError):
+        return {}
+    pairs = baskets[["entityName", "entityIso"]].dropna().drop_duplicates("entityName")
+    return dict(zip(pairs["entityName"].astype(str), pairs["entityIso"].astype(str)))
+
+
+def build_entity_selector(df, iso_codes=None):
+    """
+    Entity index over the loaded dataframe, built once at load time.
+    """
+    countries, income_groups, regions = entity_options(df)
+    entities = {name: "Country" for name in countries}
+    entities.update({name: "WB Income Group" for name in income_groups})
+    entities.update({name: "ITU Region" for name in regions})
+    entities["World"] = "World"
+
+    members = {}
+    for level in ["WB Income Group", "ITU Region"]:
+        pairs = entity_members(df, level)
+        for group, group_rows in pairs.groupby(level, sort=True):
+            members[(level, group)] = sorted(group_rows["Country"])
+    members[("World", "World")] = list(countries)
+
+    if iso_codes is None:
+        iso_codes = load_iso_codes()
+    return EntitySelector(entities, members, iso_codes)
+
+
+
+# === Module Guard ===
+if __name__ == "__main__":
+    print("This is a helper module. Please run ITU_Main.py instead.")
@@ -0,0 +1,224 @@
+import os
+import json
+import time
+import shutil
+import fnmatch
+from pptx import Presentation
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+
+from Slide_Builder import file_hash
+from Lineage import pptx_slides, record_pptx
+
+
+
+# === Paths ===
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+CHARTS_PATH = os.path.join(BASE_PATH, 'Charts')
+SLIDES_PATH = os.path.join(BASE_PATH, 'Slides')
+PRESENTATIONS_PATH = os.path.join(BASE_PATH, 'Presentations')
+CACHE_PATH = os.path.join(BASE_PATH, 'Cache')
+INDEX_PATH = os.path.join(CACHE_PATH, 'index')
+
+MANAGED_FOLDERS = {
+    "Charts": CHARTS_PATH,
+    "Slides": SLIDES_PATH,
+    "Presentations": PRESENTATIONS_PATH,
+}
+
+# Cache folders keyed by source file hash (entries start with the first 20 hex digits)
+HASHED_CACHES = ["embed", "export"]
+CACHE_KEY_LENGTH = 20
+
+# Slide relationships that only carry content (pictures, media, embedded files)
+CONTENT_RELS = {RT.IMAGE, RT.MEDIA, RT.VIDEO, RT.AUDIO, RT.OLE_OBJECT, RT.PACKAGE}
+
+SECONDS_PER_DAY = 86400
+
+
+
+# === Folder index ===
+def _index_file(folder, index_path=INDEX_PATH):
+    return os.path.join(index_path, os.path.basename(os.path.normpath(folder)) + ".json")
+
+
+def _write_index(folder, files, index_path=INDEX_PATH):
+    os.makedirs(index_path, exist_ok=True)
+    index = {"folder": os.path.abspath(folder), "dir_mtime_ns": os.stat(folder).st_mtime_ns, "files": files}
+    with open(_index_file(folder, index_path), "w", encoding="utf-8") as f:
+        json.dump(index, f)
+
+
+def folder_index(folder, index_path=INDEX_PATH):
+    """
+    {name: {"size", "mtime"}} for the files in folder, from an on-disk index.
+    The folder is only rescanned when its own modification time changed
+    (a file was added, removed or renamed since the index was written).
+    """
+    index_file = _index_file(folder, index_path)
+    dir_mtime = os.stat(folder).st_mtime_ns
+    if os.path.exists(index_file):
+        with open(index_file, encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("folder") == os.path.abspath(folder) and index.get("dir_mtime_ns") == dir_mtime:
+            return index["files"]
+
+    files = {}
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.is_file():
+                stat = entry.stat()
+                files[entry.name] = {"size": stat.st_size, "mtime": stat.st_mtime}
+    _write_index(folder, files, index_path)
+    return files
+
+
+def list_files(folder, pattern="*", older_than_days=None, index_path=INDEX_PATH):
+    """
+    Sorted file names in folder matching a glob pattern and, optionally, older than n days.
+    """
+    files = folder_index(folder, index_path)
+    names = sorted(name for name in files if fnmatch.fnmatch(name, pattern))
+    if older_than_days is None:
+        return names
+
+    # A file overwritten in place (a rebuilt chart or deck) leaves the folder mtime unchanged,
+    # so its indexed mtime may be stale: the files the index calls old are checked again
+    cutoff = time.time() - older_than_days * SECONDS_PER_DAY
+    old, refreshed = [], False
+    for name in names:
+        if files[name]["mtime"] >= cutoff:
+            continue
+        try:
+            stat = os.stat(os.path.join(folder, name))
+        except FileNotFoundError:
+            continue
+        if stat.st_mtime != files[name]["mtime"] or stat.st_size != files[name]["size"]:
+            files[name] = {"size": stat.st_size, "mtime": stat.st_mtime}
+            refreshed = True
+        if stat.st_mtime < cutoff:
+            old.append(name)
+    if refreshed:
+        _write_index(folder, files, index_path)
+    return old
+
+
+# === Cache ===
+def cache_key(path):
+    return file_hash(path)[:CACHE_KEY_LENGTH]
+
+
+def delete_cache(keys=None, older_than_days=None, caches=HASHED_CACHES, cache_path=CACHE_PATH):
+    """
+    Remove cache entries whose name starts with one of keys and/or that are older than n days.
+    Returns the number of entries removed.
+    """
+    keys = tuple(key[:CACHE_KEY_LENGTH] for key in keys) if keys is not None else None
+    cutoff = time.time() - older_than_days * SECONDS_PER_DAY if older_than_days is not None else None
+    removed = 0
+    for cache in caches:
+        folder = os.path.join(cache_path, cache)
+        if not os.path.isdir(folder):
+            continue
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if keys is not None and not entry.name.startswith(keys):
+                    continue
+                if cutoff is not None and entry.stat().st_mtime >= cutoff:
+                    continue
+                if entry.is_dir():
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                else:
+                    os.remove(entry.path)
+                removed += 1
+    return removed
+
+
+# === Deleting files ===
+def delete_files(folder, names, purge_cache=True, index_path=INDEX_PATH):
+    """
+    Delete the named files of folder in one go, update the folder index without a rescan
+    and drop the cache entries derived from them (resampled pictures, exports).
+    Returns the deleted names.
+    """
+    files = folder_index(folder, index_path)
+    keys, sizes, deleted = [], set(), []
+    for name in names:
+        path = os.path.join(folder, name)
+        if not os.path.isfile(path):
+            continue
+        if purge_cache:
+            keys.append(cache_key(path))
+            sizes.add(os.path.getsize(path))
+        os.remove(path)
+        files.pop(name, None)
+        deleted.append(name)
+
+    _write_index(folder, files, index_path)
+    if keys:
+        # A byte-identical file that stays shares the entries (e.g. an SVG's fallback PNG): keep them
+        kept = {cache_key(os.path.join(folder, name)) for name, entry in files.items() if entry["size"] in sizes}
+        keys = [key for key in keys if key not in kept]
+    if keys:
+        delete_cache(keys)
+    return deleted
+
+
+def delete_matching(folder, pattern="*", older_than_days=None, purge_cache=True, dry_run=False):
+    """
+    Delete every file in folder matching a glob and/or age, e.g.
+    delete_matching(CHARTS_PATH, "ARPU_*", older_than_days=30).
+    """
+    names = list_files(folder, pattern, older_than_days)
+    if dry_run:
+        return names
+    return delete_files(folder, names, purge_cache)
+
+
+# === Presentations ===
+def drop_unused_rels(part):
+    """
+    Drop picture/media relationships that no shape of the part refers to any more,
+    so the media they point to is left out when the package is saved.
+    """
+    xml = part._element.xml
+    unused = [
+        rId for rId, rel in part.rels.items()
+        if rel.reltype in CONTENT_RELS and f'"{rId}"' not in xml
+    ]
+    for rId in unused:
+        part.rels.pop(rId)
+    return len(unused)
+
+
+def delete_slides(pres_path, slide_numbers, out=None):
+    """
+    Delete slides (1-based) and save. Dropped slide parts and media no slide uses any more
+    are not written back, so the file actually shrinks. Returns (size_before, size_after).
+    """
+    size_before = os.path.getsize(pres_path)
+    prs = Presentation(pres_path)
+    slide_ids = prs.slides._sldIdLst
+    entries = pptx_slides(pres_path)
+    entries = entries if len(entries) == len(slide_ids) else None
+    for number in sorted(set(slide_numbers), reverse=True):
+        if 1 <= number <= len(slide_ids):
+            prs.part.drop_rel(slide_ids[number - 1].rId)
+            del slide_ids[number - 1]
+            if entries is not None:
+                del entries[number - 1]
+
+    for slide in prs.slides:
+        drop_unused_rels(slide.part)
+
+    out = out or pres_path
+    prs.save(out)
+    if entries is not None:
+        # Keep the lineage in step with the slides, so deck rebuilds re-stamp the right ones
+        record_pptx(out, entries)
+    return size_before, os.path.getsize(out)
+
+
+
+# === Module Guard ===
+if __name__ == "__main__":
+    print("This is a helper module. Please run ITU_Main.py instead.")
@@ -0,0 +1,315 @@
+import os
+import json
+import time
+import shutil
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import matplotlib
+from PIL import Image
+import pptx
+from pptx import Presentation
+
+from Create_Charts import (MAP_NAME, CHART_TYPE_MAP, data_hash, chart_data_hash, spec_chart_data, redraw_chart,
+                           available_years)
+from Lineage import record_chart
+from Slide_Builder import prepare_slide, build_deck, charts_to_slide_specs, layout_picture_count, LAYOUT_NAMES
+from Deck_Patch import insert_slides
+from ITU_Utilities import load_and_prepare_data, compile_slides
+from Chart_Service import start_service, stop_service, service_url, fetch_chart
+
+
+
+# === Paths ===
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+GOLDEN_PATH = os.path.join(BASE_PATH, 'Golden')  # baseline/ (recorded) and current/ (last check)
+GOLDEN_DATA = os.path.join(BASE_PATH, 'formatted_for_sbrn.xlsx')
+MANIFEST_NAME = "golden.json"
+
+# Images may differ by anti-aliasing, not by content
+SSIM_MIN = 0.98  # structural similarity of the grey images, downscaled to SSIM_WIDTH
+SSIM_WIDTH = 1200
+PIXEL_THRESHOLD = 32  # a pixel has changed when a channel moves by more than this
+CHANGED_MAX = 0.002  # share of changed pixels allowed
+SLOWER_WARN = 1.5  # timing ratio flagged in the report (never a failure)
+
+YEARS = list(range(2008, 2024))
+ALL_YEARS = "all"  # resolved with available_years(df), as the 'all' answer of the year prompt
+REGIONS = ['Africa', 'Americas', 'Arab States', 'Asia-Pacific', 'CIS', 'Europe']
+INCOME_GROUPS = ['High-income', 'Upper-middle-income', 'Lower-middle-income', 'Low-income']
+COUNTRIES = ['Kenya', 'Ghana', 'Nigeria', 'South Africa', 'Brazil', 'India', 'Germany', 'Japan']
+
+
+def _spec(indicators, years, chart_type, names, mode="total"):
+    return {"selected_indicators": indicators, "selected_years": years, "chart_type": chart_type,
+            "selected_names": names, "mode": mode}
+
+
+# Fixed chart specs: every chart type, countries and groups, totals and weighted means
+GOLDEN_CHARTS = {
+    "line_regions": _spec(["ARPU"], YEARS, "line", REGIONS + ["World"]),
+    "line_income_population": _spec(["ARPU", "Penetration Rate"], YEARS, "line", INCOME_GROUPS, "population"),
+    "line_countries": _spec(["Penetration Rate"], YEARS, "line", COUNTRIES),
+    "bar_countries": _spec(["Subscribers"], YEARS[-5:], "bar", COUNTRIES[:4]),
+    "stacked_income": _spec(["Market Size"], YEARS, "stacked", INCOME_GROUPS),
+    "100_stacked_regions": _spec(["Subscribers"], YEARS, "100_stacked", REGIONS),
+    "pie_regions": _spec(["Population"], [2023], "pie", REGIONS),
+    "scatter_mixed": _spec(["Revenue per Capita"], YEARS, "scatter", COUNTRIES[:3] + ["Africa", "World"]),
+    "facet_regions": _spec(["ARPU"], YEARS, "facet", REGIONS, "subscribers"),
+    "map_penetration": _spec(["Penetration Rate"], [2023], "map", [MAP_NAME]),
+    "line_all_years": _spec(["Subscribers"], ALL_YEARS, "line", REGIONS),
+}
+
+
+
+# === Comparisons ===
+def _box_mean(a, size=7):
+    # Mean over size x size windows (valid part only) from an integral image
+    integral = np.pad(a, ((1, 0), (1, 0))).cumsum(0).cumsum(1)
+    total = integral[size:, size:] - integral[:-size, size:] - integral[size:, :-size] + integral[:-size, :-size]
+    return total / (size * size)
+
+
+def ssim(a, b):
+    """
+    Mean structural similarity of two grey images (float arrays in 0-255), 7x7 windows.
+    """
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    mu_a, mu_b = _box_mean(a), _box_mean(b)
+    var_a = _box_mean(a * a) - mu_a ** 2
+    var_b = _box_mean(b * b) - mu_b ** 2
+    cov = _box_mean(a * b) - mu_a * mu_b
+    index = ((2 * mu_a * mu_b + c1) * (2 * cov + c2)) / ((mu_a ** 2 + mu_b ** 2 + c1) * (var_a + var_b + c2))
+    return float(index.mean())
+
+
+def _grey(image, width=SSIM_WIDTH):
+    image = image.convert("L")
+    if image.width > width:
+        image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+    return np.asarray(image, dtype=np.float64)
+
+
+def compare_images(golden_file, current_file):
+    """
+    (ok, detail) of two renders: same size, SSIM >= SSIM_MIN and at most CHANGED_MAX changed pixels.
+    """
+    with Image.open(golden_file) as golden, Image.open(current_file) as current:
+        if golden.size != current.size:
+            return False, f"size {golden.size} → {current.size}"
+        a = np.asarray(golden.convert("RGB"), dtype=np.int16)
+        b = np.asarray(current.convert("RGB"), dtype=np.int16)
+        changed = float((np.abs(a - b).max(axis=2) > PIXEL_THRESHOLD).mean())
+        score = ssim(_grey(golden), _grey(current))
+    ok = score >= SSIM_MIN and changed <= CHANGED_MAX
+    return ok, f"SSIM {score:.4f}, {changed:.3%} pixels changed"
+
+
+def compare_data(golden_file, current):
+    """
+    (ok, detail) of a chart table against its golden copy: exact equality, values and order.
+    """
+    golden = pd.read_parquet(golden_file)
+    current = current.reset_index(drop=True)
+    try:
+        pd.testing.assert_frame_equal(golden, current, check_exact=True, check_dtype=False)
+    except AssertionError as e:
+        if golden.shape != current.shape or list(golden.columns) != list(current.columns):
+            return False, str(e).strip().splitlines()[0]
+        differs = (golden != current) & ~(golden.isna() & current.isna())
+        largest = (current["Value"] - golden["Value"]).abs().max() if "Value" in golden else float("nan")
+        return False, f"{int(differs.any(axis=1).sum())} of {len(current)} rows differ, largest Value change {largest:.6g}"
+    return True, f"{len(current)} rows identical"
+
+
+def shape_inventory(pptx_path):
+    """
+    Per slide, one entry per shape: type, position and size (EMU), text, and pixel size of pictures.
+    """
+    inventory = []
+    for slide in Presentation(pptx_path).slides:
+        shapes = []
+        for shape in slide.shapes:
+            entry = {"type": getattr(shape.shape_type, "name", str(shape.shape_type)),
+                     "box": [shape.left, shape.top, shape.width, shape.height]}
+            if shape.has_text_frame and shape.text_frame.text:
+                entry["text"] = shape.text_frame.text
+            if entry["type"] == "PICTURE":
+                entry["pixels"] = list(shape.image.size)
+            shapes.append(entry)
+        inventory.append(shapes)
+    return inventory
+
+
+def compare_inventory(golden, current):
+    if len(golden) != len(current):
+        return False, f"{len(golden)} → {len(current)} slides"
+    for number, (old, new) in enumerate(zip(golden, current), 1):
+        if len(old) != len(new):
+            return False, f"slide {number}: {len(old)} → {len(new)} shapes"
+        for index, (a, b) in enumerate(zip(old, new), 1):
+            if a != b:
+                field = next(key for key in sorted(set(a) | set(b)) if a.get(key) != b.get(key))
+                return False, f"slide {number}, shape {index} ({a['type']}): {field} {a.get(field)} → {b.get(field)}"
+    return True, f"{len(current)} slides, {sum(map(len, current))} shapes identical"
+
+
+# === Runs ===
+def run_cases(df, out_dir):
+    """
+    Render every golden chart (table as Parquet, image as PNG) and build slides and decks from
+    them the way prepare_slides and print_slides do, into out_dir. Returns the manifest.
+    """
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.makedirs(out_dir)
+    cases, chart_files = {}, []
+
+    for name, spec in GOLDEN_CHARTS.items():
+        if spec["selected_years"] == ALL_YEARS:
+            spec = {**spec, "selected_years": available_years(df)}
+        start = time.perf_counter()
+        chart_data = spec_chart_data(df, spec)
+        aggregated = time.perf_counter()
+        chart_data.reset_index(drop=True).to_parquet(os.path.join(out_dir, f"{name}.parquet"), index=False)
+        image = os.path.join(out_dir, f"{name}.png")
+        redraw_chart(chart_data, spec, image)
+        # Lineage as render_chart records it, into a harness-local database
+        record_chart([image], spec, chart_data_hash(chart_data), lineage_path=os.path.join(out_dir, "lineage.sqlite"))
+        chart_files.append(image)
+        cases[name] = {
+            "kind": "chart", "data_hash": chart_data_hash(chart_data), "rows": len(chart_data),
+            "aggregate_seconds": aggregated - start, "seconds": time.perf_counter() - start,
+        }
+
+    # prepare_slides: one slide file per layout
+    slide_files = []
+    for layout in LAYOUT_NAMES:
+        path = os.path.join(out_dir, f"slide_layout_{layout}.pptx")
+        count = layout_picture_count(layout)
+        start = time.perf_counter()
+        prepare_slide(layout, chart_files[:count], title=LAYOUT_NAMES[layout], out=path)
+        cases[f"slide_layout_{layout}"] = {"kind": "pptx", "seconds": time.perf_counter() - start}
+        slide_files.append(path)
+
+    # prepare_slides_bulk, print_slides (compile), print_slides (insert in place)
+    decks = {
+        "deck_bulk": lambda path: build_deck(charts_to_slide_specs(chart_files, 3), path),
+        "deck_compiled": lambda path: compile_slides(slide_files)[0].save(path),
+        "deck_inserted": lambda path: (shutil.copy(os.path.join(out_dir, "deck_compiled.pptx"), path),
+                                       insert_slides(path, slide_files[2:4], [1, 3])),
+    }
+    for name, build in decks.items():
+        path = os.path.join(out_dir, f"{name}.pptx")
+        start = time.perf_counter()
+        build(path)
+        cases[name] = {"kind": "pptx", "seconds": time.perf_counter() - start}
+
+    for name, case in cases.items():
+        if case["kind"] == "pptx":
+            case["inventory"] = shape_inventory(os.path.join(out_dir, f"{name}.pptx"))
+
+    manifest = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "data_hash": data_hash(df),
+        "versions": {"matplotlib": matplotlib.__version__, "pandas": pd.__version__, "python-pptx": pptx.__version__},
+        "cases": cases,
+    }
+    with open(os.path.join(out_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def golden_data(filename=GOLDEN_DATA):
+    return load_and_prepare_data(filename, validate=False)
+
+
+def record_golden(df=None, golden_path=GOLDEN_PATH):
+    """
+    Record the baseline (Golden/baseline) before changing the chart engine or slide builders.
+    """
+    df = golden_data() if df is None else df
+    manifest = run_cases(df, os.path.join(golden_path, "baseline"))
+    print(f"✅ {len(manifest['cases'])} golden cases recorded in {os.path.join(golden_path, 'baseline')}.")
+    return manifest
+
+
+def check_golden(df=None, golden_path=GOLDEN_PATH):
+    """
+    Re-run every case into Golden/current and compare with the baseline: chart tables exactly,
+    images within SSIM_MIN / CHANGED_MAX, pptx shape inventories exactly, timings side by side
+    (wall time with the project caches as they are, so the first run after a change may be slower).
+    Returns one result per case: {"case", "ok", "checks": [(check, ok, detail)], "seconds", "golden_seconds"}.
+    """
+    baseline_path, current_path = os.path.join(golden_path, "baseline"), os.path.join(golden_path, "current")
+    manifest_file = os.path.join(baseline_path, MANIFEST_NAME)
+    if not os.path.exists(manifest_file):
+        raise FileNotFoundError(f"No golden baseline in {baseline_path}; record it with record_golden().")
+    with open(manifest_file, encoding="utf-8") as f:
+        golden = json.load(f)
+
+    df = golden_data() if df is None else df
+    if data_hash(df) != golden["data_hash"]:
+        print("⚠️ The data differs from the data the baseline was recorded with; differences are expected.")
+    current = run_cases(df, current_path)
+
+    results = []
+    for name, case in golden["cases"].items():
+        now = current["cases"].get(name)
+        if now is None:
+            results.append({"case": name, "ok": False, "checks": [("run", False, "case no longer runs")],
+                            "seconds": None, "golden_seconds": case["seconds"]})
+            continue
+        if case["kind"] == "chart":
+            table = pd.read_parquet(os.path.join(current_path, f"{name}.parquet"))
+            checks = [("data", *compare_data(os.path.join(baseline_path, f"{name}.parquet"), table)),
+                      ("image", *compare_images(os.path.join(baseline_path, f"{name}.png"),
+                                                os.path.join(current_path, f"{name}.png")))]
+        else:
+            checks = [("shapes", *compare_inventory(case["inventory"], now["inventory"]))]
+        results.append({"case": name, "ok": all(ok for _, ok, _ in checks), "checks": checks,
+                        "seconds": now["seconds"], "golden_seconds": case["seconds"]})
+    results.append(check_service_types(df, os.path.join(current_path, "service")))
+    return results
+
+
+def check_service_types(df, cache_path):
+    """
+    Fetch one chart of every chart type from a local chart service by its canonical name
+    (the names its error message advertises). Returns a check_golden() result.
+    """
+    server = start_service(df, port=0, cache_path=cache_path, max_workers=2)
+    start, checks = time.perf_counter(), []
+    try:
+        for chart_type in sorted(set(CHART_TYPE_MAP.values())):
+            years = "2023" if chart_type in ("pie", "map") else "2019-2023"
+            status, _, body = fetch_chart(service_url(server), indicators="Subscribers", names="Africa,Europe",
+                                          years=years, type=chart_type)
+            detail = f"HTTP {status}" if status == 200 else f"HTTP {status}: {body[:120].decode(errors='replace')}"
+            checks.append((f"type={chart_type}", status == 200, detail))
+    finally:
+        stop_service(server)
+    return {"case": "service_types", "ok": all(ok for _, ok, _ in checks), "checks": checks,
+            "seconds": time.perf_counter() - start, "golden_seconds": None}
+
+
+def describe_golden(results):
+    lines = []
+    for result in results:
+        timing = ""
+        if result["seconds"] is not None and result["golden_seconds"] is not None:
+            ratio = result["seconds"] / max(result["golden_seconds"], 1e-9)
+            flag = " ⚠️ slower" if ratio > SLOWER_WARN else ""
+            timing = f"  [{result['golden_seconds']:.3f} s → {result['seconds']:.3f} s, x{ratio:.2f}{flag}]"
+        lines.append(f"{'✅' if result['ok'] else '❌'} {result['case']}{timing}")
+        for check, ok, detail in result["checks"]:
+            if not ok:
+                lines.append(f"    {check}: {detail}")
+    failed = sum(not result["ok"] for result in results)
+    lines.append(f"{len(results) - failed}/{len(results)} golden cases unchanged.")
+    return "\n".join(lines)
+
+
+
+# === Module Guard ===
+if __name__ == "__main__":
+    print("This is a helper module. Please run ITU_Main.py instead.")
@@ -1,7 +1,21 @@
 import os
-
-from ITU_Utilities import load_and_prepare_data, prepare_slides, print_slides, delete, CHARTS_PATH, SLIDES_PATH
-from Create_Charts import create, select_image_files, read_entry
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from ITU_Utilities import (load_and_prepare_data, ask_slide_request, ask_bulk_request, print_slides, delete,
+                           CHARTS_PATH, SLIDES_PATH)
+from Create_Charts import (ask_chart_request, ask_grouping_request, select_output_format, render_chart, render_grouping,
+                           select_image_files, read_entry, close_dialog_root)
+from Slide_Builder import prepare_slide, build_deck, next_numbered_path
+from Native_Charts import native_chart_slide, NATIVE_CHART_LAYOUT, NATIVE_CHART_TYPES
+from Chart_Animation import render_animation, select_animation_format
+from Job_Queue import JobQueue
+from Deck_Rebuild import ask_rebuild_selection, rebuild_decks, describe_rebuild
+from Ranking_Index import build_ranking_index
+from Entity_Selector import build_entity_selector
+from Parquet_Store import ParquetStore, store_exists, DATA_STORE_PATH
+from Chart_Service import start_service, stop_service, service_url
 
 
 # Define paths
@@ -21,8 +35,10 @@ def ensure_dir(path):
         os.mkdir(path)
 
 # Print the main menu
-def print_menu():
+def print_menu(jobs=None):
     print("\nMenu:")
+    if jobs is not None and jobs.summary():
+        print(f"[{jobs.summary()}]")
     print("0. Load dataframe")
     print("1. Create new charts")
     print("2. Read charts")
@@ -30,23 +46,65 @@ def print_menu():
     print("4. Compile slides into presentations")
     print("5. Delete charts and slides")
     print("6. Exit")
+    print("7. Background jobs")
+    print("8. Start/stop local chart service (HTTP)")
+
+# input() on a worker thread, so finished jobs are reported while the prompt is open
+async def ainput(prompt=""):
+    return await asyncio.to_thread(input, prompt)
+
+# Tk is not thread-safe: every dialog runs on this one thread, which owns the single Tk root
+# (Create_Charts.dialog_root). Job notices still print while a dialog is open.
+DIALOG_THREAD = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dialogs")
+
+async def adialog(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(DIALOG_THREAD, functools.partial(fn, *args))
+
+# File dialog and preview of menu 2
+def read_charts():
+    paths = select_image_files(CHARTS_PATH)
+    if paths:
+        read_entry(paths)  # Show images selected the first time
+    else:
+        print("\u274C No files selected.")
+
+def chart_label(request):
+    names = request.get("selected_names") or [request.get("group_column")]
+    shown = ", ".join(names[:3]) + (f" +{len(names) - 3}" if len(names) > 3 else "")
+    return f"{' & '.join(request['selected_indicators'])} | {shown} | {request['chart_type']}"
 
 # Main control function
-def main():
+async def run_menu():
     ensure_dir(PRESENTATIONS_PATH)
     ensure_dir(CHARTS_PATH)
     ensure_dir(SLIDES_PATH)
 
     df = None  # Will hold the loaded dataframe
+    ranking = None  # Top/bottom-N index over the loaded dataframe
+    selector = None  # Name / ISO / group search index over the loaded dataframe
+    jobs = JobQueue()  # Rendering and pptx saving run here while the next request is entered
+    service = None  # Local HTTP chart service over the loaded dataframe
 
     while True:
-        print_menu()
-        choice = input("Choose action: ").strip()
+        print_menu(jobs)
+        choice = (await ainput("Choose action: ")).strip()
 
         if choice == "0":
             try:
-                df = load_and_prepare_data(EXCEL_PATH)
-                print("\u2705 DataFrame loaded and formatted.")
+                source = "1"
+                if store_exists(DATA_STORE_PATH):
+                    print("\n1. Excel file (in memory)")
+                    print("2. Parquet store (out-of-core, for data larger than memory)")
+                    source = (await ainput("Enter option number (Enter for Excel): ")).strip()
+                if source == "2":
+                    df = ParquetStore(DATA_STORE_PATH)
+                else:
+                    df = await asyncio.to_thread(load_and_prepare_data, EXCEL_PATH)
+                ranking = await asyncio.to_thread(build_ranking_index, df)
+                selector = await asyncio.to_thread(build_entity_selector, df)
+                jobs.share(df)  # sent to the job workers once instead of with every job
+                print("\u2705 DataFrame loaded and formatted." if source != "2" else
+                      f"\u2705 Parquet store opened ({df.manifest['rows']:,} rows).")
             except Exception as e:
                 print(f"\u274C Failed to load DataFrame: {e}")
 
@@ -54,47 +112,128 @@ def main():
             if df is None:
                 print("\u26A0\uFE0F Please load the dataframe first (option 0).")
             else:
+                print("\n1. Single chart")
+                print("2. One chart per member of a grouping (region, income group, countries)")
+                print("3. Single chart as an editable PowerPoint chart slide")
+                print("4. Animation over the selected years (GIF or MP4; line, bar or map)")
+                mode = (await ainput("Enter option number (1-4): ")).strip()
                 try:
-                    create(df, CHARTS_PATH)
+                    if mode == "4":
+                        request = await asyncio.to_thread(ask_chart_request, df, ranking, selector, True)
+                        if request:
+                            animation_format = await asyncio.to_thread(select_animation_format)
+                            jobs.submit(chart_label(request), render_animation, df, CHARTS_PATH, **request,
+                                        animation_format=animation_format,
+                                        describe=lambda path: os.path.basename(path) if path else "no data")
+                    elif mode == "2":
+                        request = await asyncio.to_thread(ask_grouping_request, df)
+                        if request:
+                            output_format = await asyncio.to_thread(select_output_format)
+                            # render_grouping starts its own process pool
+                            jobs.submit(chart_label(request), render_grouping, df, CHARTS_PATH, **request,
+                                        output_format=output_format, thread=True,
+                                        describe=lambda manifest: f"{len(manifest)} charts")
+                    elif mode == "3":
+                        request = await asyncio.to_thread(ask_chart_request, df, ranking, selector,
+                                                          chart_types=tuple(NATIVE_CHART_TYPES))
+                        if request:
+                            out = next_numbered_path(SLIDES_PATH, f"slide_layout_{NATIVE_CHART_LAYOUT}",
+                                                     reserved=jobs.pending_outputs())
+                            jobs.submit(chart_label(request), native_chart_slide, df, **request, out=out, output=out,
+                                        describe=lambda path: os.path.basename(path) if path else "no data")
+                    else:
+                        request = await asyncio.to_thread(ask_chart_request, df, ranking, selector)
+                        if request:
+                            output_format = await asyncio.to_thread(select_output_format)
+                            jobs.submit(chart_label(request), render_chart, df, CHARTS_PATH, **request,
+                                        output_format=output_format,
+                                        describe=lambda paths: os.path.basename(paths[0]) if paths else "no data")
                 except Exception as e:
                     print(f"\u274C Chart creation failed: {e}")
 
         elif choice == "2":
             try:
-                paths = select_image_files(CHARTS_PATH)
-                if paths:
-                    read_entry(paths)  # Show images selected the first time
-                else:
-                    print("\u274C No files selected.")
+                await adialog(read_charts)
             except Exception as e:
                 print(f"\u274C Failed to read charts: {e}")
 
 
         elif choice == "3":
+            print("\n1. Single slide")
+            print("2. Deck of chart slides from many charts (one save)")
+            print("3. Rebuild decks after a data change (stale charts and their slides only)")
+            mode = (await ainput("Enter option number (1, 2 or 3): ")).strip()
             try:
-                prepare_slides(SLIDES_PATH, CHARTS_PATH)
+                if mode == "3":
+                    if df is None:
+                        print("\u26A0\uFE0F Please load the dataframe first (option 0).")
+                        continue
+                    deck_paths = await asyncio.to_thread(ask_rebuild_selection, PRESENTATIONS_PATH, SLIDES_PATH)
+                    if deck_paths:
+                        jobs.submit(f"Rebuild {len(deck_paths)} file(s)", rebuild_decks, df, deck_paths,
+                                    describe=lambda results: "; ".join(describe_rebuild(r) for r in results))
+                elif mode == "2":
+                    slide_specs = await adialog(ask_bulk_request, CHARTS_PATH)
+                    if slide_specs:
+                        out = next_numbered_path(PRESENTATIONS_PATH, "Presentation", sep="", reserved=jobs.pending_outputs())
+                        jobs.submit(f"Deck {os.path.basename(out)} ({len(slide_specs)} slides)", build_deck, slide_specs, out,
+                                    output=out, describe=os.path.basename)
+                else:
+                    request = await adialog(ask_slide_request, CHARTS_PATH)
+                    if request:
+                        layout_choice, chart_files = request
+                        out = next_numbered_path(SLIDES_PATH, f"slide_layout_{layout_choice}", reserved=jobs.pending_outputs())
+                        jobs.submit(f"Slide {os.path.basename(out)}", prepare_slide, layout_choice, chart_files, out=out,
+                                    output=out, describe=os.path.basename)
             except Exception as e:
                 print(f"\u274C Prepare slides failed: {e}")
 
         elif choice == "4":
             try:
-                print_slides()
+                await adialog(print_slides)
             except Exception as e:
                 print(f"\u274C Print failed: {e}")
 
         elif choice == "5":
             try:
-                delete()
+                await adialog(delete)
             except Exception as e:
                 print(f"\u274C Delete failed: {e}")
 
         elif choice == "6" or choice.lower() == "exit":
+            await jobs.drain()
+            await adialog(close_dialog_root)
+            DIALOG_THREAD.shutdown()
+            if service is not None:
+                stop_service(service)
             print("\U0001F44B Finished, bye!")
             break
 
+        elif choice == "7":
+            jobs.print_status()
+
+        elif choice == "8":
+            if service is not None:
+                await asyncio.to_thread(stop_service, service)
+                service = None
+                print("\u2705 Chart service stopped.")
+            elif df is None:
+                print("\u26A0\uFE0F Please load the dataframe first (option 0).")
+            else:
+                try:
+                    service = await asyncio.to_thread(start_service, df)
+                    url = service_url(service)
+                    print(f"\u2705 Chart service running at {url}")
+                    print(f"   e.g. {url}/chart.png?indicators=ARPU&names=Africa,Europe&years=2008-2023&type=line")
+                except Exception as e:
+                    print(f"\u274C Chart service failed to start: {e}")
+
         else:
             print("\u2757 Not an option! Try again.")
 
+def main():
+    asyncio.run(run_menu())
+
 # Guard main execution
 if __name__ == "__main__":
     main()
@@ -19,12 +19,8 @@ from pptx.enum.shapes import MSO_AUTO_SHAPE_TYPE
 from pptx.dml.color import RGBColor
 from pptx.enum.text import PP_ALIGN
 from pptx.oxml.xmlchemy import OxmlElement
-import tkinter as tk
-from tkinter import filedialog
-from tkinter.messagebox import showinfo
 from io import BytesIO
 from PIL import Image
-import comtypes.client  # for converting slides to images (Windows only)
 import shutil
 from datetime import datetime
 
@@ -40,23 +36,24 @@ os.makedirs(SLIDES_PATH, exist_ok=True)
 PRESENTATIONS_PATH = os.path.join(BASE_PATH, 'Presentations')
 os.makedirs(PRESENTATIONS_PATH, exist_ok=True)
 
-from Create_Charts import (select_image_files, display_images, read_entry)
+from Create_Charts import (select_image_files, display_images, read_entry, dialog_root)
+from Deck_Export import export_presentations  # cross-platform pptx -> pdf/png via LibreOffice
+from File_Manager import list_files, delete_files, delete_slides  # indexed listings, bulk delete, deck pruning
+from Lineage import record_pptx, pptx_slides  # which charts and slide files went into which deck
+from Parquet_Store import coerce_values  # column check and Value parsing, shared with the Parquet store
+from Deck_Patch import deck_slides, insert_slides, diff_decks, describe_diff  # zip-level deck edits and slide diff
+from Data_Validation import validate_data, describe_report  # load-time data checks, cached per data hash
 
 
 
 
 # === Load & Clean Excel Data ===
-def load_and_prepare_data(filename):
-    df = pd.read_excel(filename, header=0)
-    expected_columns = ['Key Indicator', 'WB Income Group', 'ITU Region', 'Country', 'Year', 'Value']
-    missing = [col for col in expected_columns if col not in df.columns]
-    if missing:
-        raise ValueError(f"Missing columns in Excel: {missing}")
-
-    df = df.dropna(subset=['Value'])
-    df['Value'] = df['Value'].astype(str).str.replace('%', '').str.replace(',', '', regex=False)
-    df['Value'] = pd.to_numeric(df['Value'], errors='coerce')
-    df = df.dropna(subset=['Value'])
+def load_and_prepare_data(filename, validate=True):
+    raw = pd.read_excel(filename, header=0)
+    if validate:
+        # Flags only; cached per data hash, so re-loading unchanged data skips the checks
+        print(describe_report(validate_data(raw)))
+    df = coerce_values(raw)
 
     def format_value(row):
         indicator = str(row['Key Indicator'])
@@ -66,7 +63,6 @@ def load_and_prepare_data(filename):
         else:
             return f"{int(value):,}" if pd.notnull(value) else ""
 
-    df['Key Indicator'] = df['Key Indicator'].astype(str)
     df['Formatted Value'] = df.apply(format_value, axis=1)
     return df
 
@@ -95,267 +91,111 @@ plt.rcParams.update({
 
 
 # Compilation of content on the key slide layouts
-SLIDE_WIDTH = Cm(33.867)
-SLIDE_HEIGHT = Cm(19.05)
-CRIMSON = RGBColor(192, 0, 0)
-
-
-
-def add_textbox(slide, text, left, top, width, height, font_size,
-                bold=False, italic=False, align="left", bullet=False,
-                line_spacing=None, space_before=None, space_after=None,  font_color=RGBColor(0, 0, 0)):
-    box = slide.shapes.add_textbox(left, top, width, height)
-    frame = box.text_frame
-    frame.clear()
-
-    # zero margins
-    frame.margin_top = 0
-    frame.margin_bottom = 0
-    frame.margin_left = 0
-    frame.margin_right = 0
-
-    p = frame.paragraphs[0]
-    p.text = text
-    p.font.name = 'Calibri'
-    p.font.size = Pt(font_size)
-    p.font.bold = bold
-    p.font.italic = italic
-
-    if align == "center":
-        p.alignment = PP_ALIGN.CENTER
-    elif align == "right":
-        p.alignment = PP_ALIGN.RIGHT
-    else:
-        p.alignment = PP_ALIGN.LEFT
-
-    # *** Here's the bullet fix ***
-    if bullet:
-        p.bullet = True
-        p.level = 0
-        # The bullet character:
-        # This sets a proper bullet char and font for PowerPoint
-        run = p.runs[0]
-        run.text = text  # Ensure run has the correct text
-        run.font.name = 'Calibri'
-        run.font.color.rgb = RGBColor(0, 0, 0)  # Black bullet text color
-        # No need to use _element.set for bullet char here
-
-    else:
-        run = p.runs[0]
-        run.font.color.rgb = RGBColor(0, 0, 0)  # Default black text
-
-    return box
-
+# Layout shapes are defined once in Slide_Builder and stamped into slides from XML templates
+from Slide_Builder import (SLIDE_WIDTH, SLIDE_HEIGHT, CRIMSON, LAYOUT_NAMES, add_textbox, add_line,
+                           new_presentation, stamp_layout, layout_picture_count,
+                           charts_to_slide_specs, build_deck, next_numbered_path,
+                           prepare_slide, prepare_deck)
 
 
-def add_line(slide, top, width, left, thickness):
-    shape = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, left, top, width, Pt(1))
-    shape.fill.background()
-    shape.line.color.rgb = CRIMSON
-    shape.line.width = Pt(thickness)
 
+# Slides embed raster charts or SVG (with its PNG fallback); the PDF of a vector chart cannot be embedded
+CHART_FILETYPES = [("Image Files", "*.jpg *.jpeg *.png *.svg")]
 
-def prepare_slides(slides_path=SLIDES_PATH, charts_path=CHARTS_PATH):
-    prs = Presentation()
-    prs.slide_width = SLIDE_WIDTH
-    prs.slide_height = SLIDE_HEIGHT
 
-    root = tk.Tk()
-    root.withdraw()
+# Interactive wrappers: Tkinter is only imported when a dialog is actually shown
+def ask_layout_choice(layouts=LAYOUT_NAMES):
+    from tkinter import simpledialog
 
-    layout_choice = tk.simpledialog.askinteger(
+    options = "\n".join(f"{k}. {v}" for k, v in layouts.items())
+    return simpledialog.askinteger(
         "Slide Layout",
-        "Choose slide layout:\n1. Cover Slide\n2. Executive Summary\n3. 2-chart Slide\n4. 3-chart Slide",
-        minvalue=1,
-        maxvalue=4
+        f"Choose slide layout:\n{options}",
+        minvalue=min(layouts),
+        maxvalue=max(layouts),
+        parent=dialog_root()
     )
 
-    if not layout_choice:
-        return
-
-    slide = prs.slides.add_slide(prs.slide_layouts[6])  # blank slide
-
-    if layout_choice == 1:
-        # Cover Slide
-        add_textbox(slide, "Adjust Title", left=Cm(2), top=Cm(7), width=Cm(30), height=Cm(1.5), font_size=32, bold=True, align="center")
-        add_line(slide, top=Cm(8.5), width=Cm(30), left=Cm(2), thickness=1.2)
-        add_textbox(slide, "Adjust Text", left=Cm(2), top=Cm(17.5), width=Cm(30), height=Cm(1.5), font_size=16, bold=True, align="center")
-
-    elif layout_choice == 2:
-        # Executive Summary Slide
-        add_textbox(slide, "Adjust Title", left=Cm(2), top=Cm(1), width=Cm(30), height=Cm(1.2), font_size=24, bold=True)
-        add_line(slide, top=Cm(2.2), width=Cm(30), left=Cm(2), thickness=1)
-
-        # Bullet list text box
-        add_textbox(slide, text="Key Insight 1\nKey Insight 2\nKey Insight 3", left=Cm(2), top=Cm(2.7), width=Cm(30), height=Cm(12), font_size=14, bullet=True, line_spacing=Pt(12), space_before=Pt(0), space_after=Pt(0))
-
-        
-
-    elif layout_choice == 3:
-        # 2-chart Slide
-        # 1. Title
-        add_textbox(slide, "Adjust Title", left=Cm(2), top=Cm(1), width=Cm(30), height=Cm(1.2), font_size=24, bold=True)
-        title_box = add_textbox(slide, "Adjust Title", left=Cm(2), top=Cm(1), width=Cm(30), height=Cm(1.2), font_size=24, bold=True)
-        title_right_x = title_box.left + title_box.width
-
-        # 2. Title line directly under title
-        add_line(slide, top=Cm(2.2), width=Cm(30), left=Cm(2), thickness=1)
-
-        # 3. Key Message textbox 0.4 cm below the line
-        add_textbox(slide, "Adjust Text", left=Cm(2), top=Cm(2.6), width=Cm(30), height=Cm(7), font_size=14, bold=True, bullet=True)
-
-        
-
-         # Ask for 2 chart images
-        chart_files = filedialog.askopenfilenames(
-            title="Select 2 charts",
-            initialdir=CHARTS_PATH,
-            filetypes=[("Image Files", "*.jpg *.jpeg *.png *.pdf")]
-        )
-
-        if len(chart_files) < 2:
-            print("❗ Please select at least 2 charts.")
-            return
-
-        # === Left and Right Charts ===
-        # Chart 1 (left-hand chart)
-        top_y = Cm(2.6) + Cm(7) + Cm(0.5)   # Key Message from top + its height + 0.2 cm below Key Message box
-
-        add_textbox(slide, "Adjust Header", left=Cm(2), top=top_y, width=Cm(14), height=Cm(0.6), font_size=12, bold=True)
-        add_line(slide, top=top_y + Cm(0.7), width=Cm(14), left=Cm(2), thickness=1)
-        slide.shapes.add_picture(chart_files[0], Cm(2), top_y + Cm(0.9), width=Cm(14), height=Cm(6))
-
-        # Chart 2 (right-hand chart)
-        # Align right edge of quadrant 2 to title's right edge
-        chart_width = Cm(14)
-        right_x = title_right_x - chart_width
-
-        # Now apply this right_x:
-        add_textbox(slide, "Adjust Header", left=right_x, top=top_y, width=Cm(14), height=Cm(0.6), font_size=12, bold=True)
-        add_line(slide, top=top_y + Cm(0.7), width=Cm(14), left=right_x, thickness=1)
-        slide.shapes.add_picture(chart_files[1], right_x, top_y + Cm(0.9), width=Cm(14), height=Cm(6))
-
-
-        # Source text
-        source_width = Cm(12)
-        source_left = title_right_x - source_width  # align right edge
-
-        add_textbox(slide, "Source: ITU", left=source_left, top=SLIDE_HEIGHT - Cm(1.5), width=source_width, height=Cm(1), font_size=8, italic=True, bold=True, align="right")
 
+def ask_slide_request(charts_path=CHARTS_PATH):
+    """
+    Layout and chart dialogs of prepare_slides. Returns (layout, chart_files), or None if cancelled.
+    """
+    from tkinter import filedialog
 
-    elif layout_choice == 4:
-        # 4-Quadrant Slide
-
-        # 1. Title
-        add_textbox(slide, "Adjust Title", left=Cm(2), top=Cm(1), width=Cm(30), height=Cm(1.2), font_size=24, bold=True)
-        title_box = add_textbox(slide, "Adjust Title", left=Cm(2), top=Cm(1), width=Cm(30), height=Cm(1.2), font_size=24, bold=True)
-        title_right_x = title_box.left + title_box.width
-
-        # 2. Title line directly under title
-        add_line(slide, top=Cm(2.2), width=Cm(30), left=Cm(2), thickness=1)
-
-        # 3. Key Message textbox 0.4 cm below the line
-        add_textbox(slide, "Adjust Text", left=Cm(2), top=Cm(2.6), width=Cm(30), height=Cm(0.8), font_size=14, bold=True, bullet=True)
+    layout_choice = ask_layout_choice()
+    if not layout_choice:
+        return None
 
-        
-        # Ask for 3 chart images
+    # Ask for the chart images the layout needs
+    chart_count = layout_picture_count(layout_choice)
+    chart_files = []
+    if chart_count:
         chart_files = filedialog.askopenfilenames(
-            title="Select 3 charts",
-            initialdir=CHARTS_PATH,
-            filetypes=[("Image Files", "*.jpg *.jpeg *.png *.pdf")]
+            parent=dialog_root(),
+            title=f"Select {chart_count} charts",
+            initialdir=charts_path,
+            filetypes=CHART_FILETYPES
         )
 
-        if len(chart_files) < 3:
-            print("❗ Please select at least 3 charts.")
-            return
-
-        # === TOP Quadrants ===
-        # 4. Quadrant 1 (top-left text box)
-        top_y = Cm(2.6) + Cm(0.8) + Cm(0.2)   # 0.2 cm below Key Message box
-
-        add_textbox(slide, "Adjust Header", left=Cm(2), top=top_y, width=Cm(14), height=Cm(0.6), font_size=12, bold=True)
-        add_line(slide, top=top_y + Cm(0.7), width=Cm(14), left=Cm(2), thickness=1)
-        add_textbox(slide, "Adjust Text", left=Cm(2), top=top_y + Cm(0.9), width=Cm(14), height=Cm(4), font_size=11, bullet=True)
-
-        # 5. Quadrant 2 (top-right chart)
-        # Align right edge of quadrant 2 to title's right edge
-        chart_width = Cm(14)
-        right_x = title_right_x - chart_width
-
-        # Now apply this right_x:
-        add_textbox(slide, "Adjust Header", left=right_x, top=top_y, width=Cm(14), height=Cm(0.6), font_size=12, bold=True)
-        add_line(slide, top=top_y + Cm(0.7), width=Cm(14), left=right_x, thickness=1)
-        slide.shapes.add_picture(chart_files[0], right_x, top_y + Cm(0.9), width=Cm(14), height=Cm(6))
-
-
-        # === BOTTOM Quadrants ===
-        bottom_y = top_y + Cm(7.0)  # Ensure no overlap
-
-        # 6. Quadrant 3 (bottom-left chart)
-        add_textbox(slide, "Adjust Header", left=Cm(2), top=bottom_y, width=Cm(14), height=Cm(0.6), font_size=12, bold=True)
-        add_line(slide, top=bottom_y + Cm(0.7), width=Cm(14), left=Cm(2), thickness=1)
-        slide.shapes.add_picture(chart_files[1], Cm(2), bottom_y + Cm(0.9), width=Cm(14), height=Cm(6))
-
-        # 7. Quadrant 4 (bottom-right chart)
-        # Align right edge of quadrant 4 to title's right edge
-        chart_width = Cm(14)
-        right_x = title_right_x - chart_width
-
-        # Now apply this right_x:
-        add_textbox(slide, "Adjust Header", left=right_x, top=bottom_y, width=Cm(14), height=Cm(0.6), font_size=12, bold=True)
-        add_line(slide, top=bottom_y + Cm(0.7), width=Cm(14), left=right_x, thickness=1)
-        slide.shapes.add_picture(chart_files[2], right_x, bottom_y + Cm(0.9), width=Cm(14), height=Cm(6))
-
-
-        # 8. Source text
-        source_width = Cm(12)
-        source_left = title_right_x - source_width  # align right edge
-
-        add_textbox(slide, "Source: ITU", left=source_left, top=SLIDE_HEIGHT - Cm(1.5), width=source_width, height=Cm(1), font_size=8, italic=True, bold=True, align="right")
-
-
-
-
-
-    # --- Save the slides ---
-    # Ensure the Slides folder exists
-    os.makedirs(SLIDES_PATH, exist_ok=True)
-
-    # --- Create safe layout prefix ---
-    layout_prefix = f"slide_layout_{layout_choice}"
-    safe_prefix = re.sub(r'\W+', '_', layout_prefix)
-
-    # --- Count existing files with the same prefix ---
-    # Match pattern: slide_layout_3_1.pptx, slide_layout_3_2.pptx, etc.
-    pattern = re.compile(rf'{re.escape(safe_prefix)}_(\d+)\.pptx')
-
-    existing_indices = [
-        int(match.group(1))
-        for f in os.listdir(slides_path)
-        if (match := pattern.match(f))
-    ]
-
-    next_index = max(existing_indices, default=0) + 1
-    filename = f"{safe_prefix}_{next_index}.pptx"
-    save_path = os.path.join(SLIDES_PATH, filename)
-
-    # --- Save the slide status ---
-    prs.save(save_path)
-    showinfo("Slide Saved", f"✅ Slide saved to:\n{save_path}")
-
-
-
-
-
+        if len(chart_files) < chart_count:
+            print(f"❗ Please select at least {chart_count} charts.")
+            return None
+    return layout_choice, list(chart_files)
 
 
+def prepare_slides(slides_path=SLIDES_PATH, charts_path=CHARTS_PATH):
+    from tkinter.messagebox import showinfo
 
+    request = ask_slide_request(charts_path)
+    if request is None:
+        return
 
+    # --- Save the slide as slide_layout_3_1.pptx, slide_layout_3_2.pptx, etc. ---
+    layout_choice, chart_files = request
+    save_path = prepare_slide(layout_choice, chart_files, slides_path=slides_path)
+    showinfo("Slide Saved", f"✅ Slide saved to:\n{save_path}", parent=dialog_root())
 
 
+def ask_bulk_request(charts_path=CHARTS_PATH):
+    """
+    Layout and chart dialogs of prepare_slides_bulk. Returns the slide specs, or None if cancelled.
+    """
+    from tkinter import filedialog
 
+    chart_layouts = {k: v for k, v in LAYOUT_NAMES.items() if layout_picture_count(k)}
+    layout_choice = ask_layout_choice(chart_layouts)
+    if not layout_choice:
+        return None
 
+    chart_files = filedialog.askopenfilenames(
+        parent=dialog_root(),
+        title="Select charts, in slide order",
+        initialdir=charts_path,
+        filetypes=CHART_FILETYPES
+    )
+    slide_specs = charts_to_slide_specs(list(chart_files), layout_choice)
+    if not chart_files or not slide_specs:
+        print("❗ Please select at least one chart.")
+        return None
+
+    leftover = len(chart_files) % layout_picture_count(layout_choice)
+    if leftover:
+        print(f"⚠️ The last slide has only {leftover} chart(s); its other picture slots are left empty.")
+    return slide_specs
+
+
+def prepare_slides_bulk(presentations_path=PRESENTATIONS_PATH, charts_path=CHARTS_PATH):
+    """
+    Stamp one chart layout for every group of selected charts into a single deck, saved once.
+    """
+    slide_specs = ask_bulk_request(charts_path)
+    if slide_specs is None:
+        return
 
+    save_path = next_numbered_path(presentations_path, "Presentation", sep="")
+    build_deck(slide_specs, save_path)
+    print(f"\n✅ {len(slide_specs)} slides saved as {os.path.basename(save_path)} in 'Presentations' folder.")
 
 
 
@@ -371,15 +211,85 @@ def add_slide_number(slide, number, final_ppt):
     p.alignment = 2  # Right
 
 
+def compile_slides(slide_paths):
+    """
+    One presentation of all slides of the given slide files, in order, numbered (covers excepted).
+    Returns the unsaved presentation and the lineage of its slides.
+    """
+    final_ppt = Presentation()
+    final_ppt.slide_width = Inches(13.33)
+    final_ppt.slide_height = Inches(7.5)
+
+    origins = []
+    for path in slide_paths:
+        src_ppt = Presentation(path)
+
+        for position, slide in enumerate(src_ppt.slides):
+            origins.append(_copied_slide_origin(path, position))
+            blank_slide_layout = final_ppt.slide_layouts[6]
+            new_slide = final_ppt.slides.add_slide(blank_slide_layout)
+
+            image_shapes = []
+            for shape in slide.shapes:
+                try:
+                    if shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
+                        image_shapes.append({
+                            "blob": shape.image.blob,
+                            "left": shape.left,
+                            "top": shape.top,
+                            "width": shape.width,
+                            "height": shape.height
+                        })
+                    else:
+                        el = shape.element
+                        new_slide.shapes._spTree.insert_element_before(el, 'p:extLst')
+                except Exception as e:
+                    print(f"⚠️ Error copying shape: {e}")
+
+            for img in image_shapes:
+                new_slide.shapes.add_picture(
+                    BytesIO(img["blob"]),
+                    img["left"],
+                    img["top"],
+                    width=img["width"],
+                    height=img["height"]
+                )
+
+    # --- Clean up old slide numbers ---
+    for slide in final_ppt.slides:
+        for shape in list(slide.shapes):
+            if shape.has_text_frame and shape.text_frame.text.strip().isdigit():
+                if shape.width == Cm(2) and shape.height == Cm(1):
+                    slide.shapes._spTree.remove(shape._element)
+
+    # --- Add slide numbers (skip cover slides) ---
+    for i, slide in enumerate(final_ppt.slides, 1):
+        is_cover = False
+        for shape in slide.shapes:
+            if shape.has_text_frame and "slide_layout_1_" in shape.text_frame.text:
+                is_cover = True
+                break
+        if not is_cover:
+            add_slide_number(slide, i, final_ppt)
+
+    return final_ppt, origins
+
+
 def print_slides():
     print("\nSelect an option:")
     print("1. Create a new presentation from selected slides.")
     print("2. Insert slide(s) into an existing presentation.")
-    option = input("Enter option number (1 or 2): ").strip()
+    print("3. Export presentation(s) to PDF and slide images.")
+    print("4. Compare two presentations (added, removed and changed slides).")
+    option = input("Enter option number (1, 2, 3 or 4): ").strip()
+
+    if option == "3":
+        export_presentations(PRESENTATIONS_PATH)
+        return
 
     if option == "2":
         # --- Step 1: Choose the target presentation ---
-        presentations = sorted(f for f in os.listdir(PRESENTATIONS_PATH) if f.endswith('.pptx'))
+        presentations = list_files(PRESENTATIONS_PATH, '*.pptx')
         if not presentations:
             print("❌ No presentations found in the Presentations folder.")
             return
@@ -395,11 +305,13 @@ def print_slides():
             print("❌ Invalid selection.")
             return
 
-        target_ppt = Presentation(pres_path)
-        max_slide_number = len(target_ppt.slides)
+        deck = deck_slides(pres_path)
+        max_slide_number = len(deck)
+        origins = pptx_slides(pres_path)
+        origins = origins if len(origins) == max_slide_number else [{}] * max_slide_number
 
         # --- Step 2: Choose slides to insert ---
-        slide_files = sorted(f for f in os.listdir(SLIDES_PATH) if f.endswith('.pptx'))
+        slide_files = list_files(SLIDES_PATH, '*.pptx')
         print("\nAvailable Slide Files:")
         for i, f in enumerate(slide_files, 1):
             print(f"{i}. {f}")
@@ -411,13 +323,8 @@ def print_slides():
         print(f"Presentation has {max_slide_number} slides.")
 
         # Show slide titles
-        for i, slide in enumerate(target_ppt.slides, 1):
-            title = None
-            for shape in slide.shapes:
-                if shape.has_text_frame and shape.text_frame.text.strip():
-                    title = shape.text_frame.text.strip().replace("\n", " ")
-                    break
-            print(f"{i}. {title if title else '[No title]'}")
+        for i, slide in enumerate(deck, 1):
+            print(f"{i}. {slide['title'] or '[No title]'}")
 
         insert_input = input(f"Insert after which slide number(s)? (e.g., 2,4): ")
 
@@ -430,78 +337,27 @@ def print_slides():
             print("❌ Number of insert positions must be either 1 or match the number of slides.")
             return
 
-        # Process each (slide to insert, position) pair
-        offset = 0
-        for slide_index, insert_after in zip(selected_slide_indices, insert_after_indices):
-            slide_path = os.path.join(SLIDES_PATH, slide_files[slide_index - 1])
-            source_ppt = Presentation(slide_path)
-            src_slide = source_ppt.slides[0]  # Always insert first slide only
-
-            blank_slide_layout = target_ppt.slide_layouts[6]
-            new_slide = target_ppt.slides.add_slide(blank_slide_layout)
-
-            image_shapes = []
-            for shape in src_slide.shapes:
-                try:
-                    if shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
-                        image_shapes.append({
-                            "blob": shape.image.blob,
-                            "left": shape.left,
-                            "top": shape.top,
-                            "width": shape.width,
-                            "height": shape.height
-                        })
-                    else:
-                        el = shape.element
-                        new_slide.shapes._spTree.insert_element_before(el, 'p:extLst')
-                except Exception as e:
-                    print(f"⚠️ Error copying shape: {e}")
-
-            for img in image_shapes:
-                new_slide.shapes.add_picture(
-                    BytesIO(img["blob"]),
-                    img["left"],
-                    img["top"],
-                    width=img["width"],
-                    height=img["height"]
-                )
+        # --- Step 4: Save in place, or once as an Updated_ copy ---
+        name = presentations[pres_index]
+        as_copy = input("Save in place (Enter) or as a copy (c)? ").strip().lower() == "c"
+        new_name = f"Updated_{name}" if as_copy and not name.startswith("Updated_") else name
+        save_path = os.path.join(PRESENTATIONS_PATH, new_name)
 
-            # Reorder slides: move inserted to correct index
-            xml_slides = target_ppt.slides._sldIdLst
-            slides = list(xml_slides)
-            xml_slides.remove(slides[-1])
-            insert_position = insert_after + offset
-            xml_slides.insert(insert_position, slides[-1])
-            offset += 1  # Account for growing slide list
-
-        # Re-number slides (skip cover slides)
-        # First: Remove old slide number textboxes
-        for slide in target_ppt.slides:
-            for shape in list(slide.shapes):  # convert to list to avoid iteration issues while deleting
-                if shape.has_text_frame and shape.text_frame.text.strip().isdigit():
-                    if shape.width == Cm(2) and shape.height == Cm(1):
-                        slide.shapes._spTree.remove(shape._element)
-
-        # Then: Re-number slides (skip covers)
-        for i, slide in enumerate(target_ppt.slides, 1):
-            is_cover = False
-            for shape in slide.shapes:
-                if shape.has_text_frame and "slide_layout_1_" in shape.text_frame.text:
-                    is_cover = True
-                    break
-            if not is_cover:
-                add_slide_number(slide, i, target_ppt)
+        # Only the new slides, renumbered slides and the slide list are rewritten; media is reused
+        slide_paths = [os.path.join(SLIDES_PATH, slide_files[i - 1]) for i in selected_slide_indices]
+        positions, written = insert_slides(pres_path, slide_paths, insert_after_indices, out=save_path)
+        for position, slide_path in sorted(zip(positions, slide_paths)):
+            origins.insert(position, _copied_slide_origin(slide_path))
+        record_pptx(save_path, origins)
+        print(f"\n✅ Slides inserted and saved as {new_name} in 'Presentations' folder "
+              f"({len(written)} parts written).")
 
-
-        # Save updated presentation
-        new_name = f"Updated_{presentations[pres_index]}"
-        save_path = os.path.join(PRESENTATIONS_PATH, new_name)
-        target_ppt.save(save_path)
-        print(f"\n✅ Slides inserted and saved as {new_name} in 'Presentations' folder.")
+    elif option == "4":
+        compare_presentations()
 
     elif option == "1":
         # --- Step 1: Load available slide files ---
-        files = sorted(f for f in os.listdir(SLIDES_PATH) if f.endswith('.pptx'))
+        files = list_files(SLIDES_PATH, '*.pptx')
         if not files:
             print("No slide files found in the Slides folder.")
             return
@@ -515,63 +371,10 @@ def print_slides():
         selected_indices = parse_slide_input(user_input, len(files))
 
         # --- Step 3: Compile new presentation ---
-        final_ppt = Presentation()
-        final_ppt.slide_width = Inches(13.33)
-        final_ppt.slide_height = Inches(7.5)
-
-        slide_counter = 1
-        for index in selected_indices:
-            path = os.path.join(SLIDES_PATH, files[index - 1])
-            src_ppt = Presentation(path)
-
-            for slide in src_ppt.slides:
-                blank_slide_layout = final_ppt.slide_layouts[6]
-                new_slide = final_ppt.slides.add_slide(blank_slide_layout)
-
-                image_shapes = []
-                for shape in slide.shapes:
-                    try:
-                        if shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
-                            image_shapes.append({
-                                "blob": shape.image.blob,
-                                "left": shape.left,
-                                "top": shape.top,
-                                "width": shape.width,
-                                "height": shape.height
-                            })
-                        else:
-                            el = shape.element
-                            new_slide.shapes._spTree.insert_element_before(el, 'p:extLst')
-                    except Exception as e:
-                        print(f"⚠️ Error copying shape: {e}")
-
-                for img in image_shapes:
-                    new_slide.shapes.add_picture(
-                        BytesIO(img["blob"]),
-                        img["left"],
-                        img["top"],
-                        width=img["width"],
-                        height=img["height"]
-                    )
-
-        # --- Step 4: Clean up old slide numbers ---
-        for slide in final_ppt.slides:
-            for shape in list(slide.shapes):
-                if shape.has_text_frame and shape.text_frame.text.strip().isdigit():
-                    if shape.width == Cm(2) and shape.height == Cm(1):
-                        slide.shapes._spTree.remove(shape._element)
-
-        # --- Step 5: Add slide numbers (skip cover slides) ---
-        for i, slide in enumerate(final_ppt.slides, 1):
-            is_cover = False
-            for shape in slide.shapes:
-                if shape.has_text_frame and "slide_layout_1_" in shape.text_frame.text:
-                    is_cover = True
-                    break
-            if not is_cover:
-                add_slide_number(slide, i, final_ppt)
+        paths = [os.path.join(SLIDES_PATH, files[index - 1]) for index in selected_indices]
+        final_ppt, origins = compile_slides(paths)
 
-        # --- Step 6: Save new presentation ---
+        # --- Step 4: Save new presentation ---
         base_name = "Presentation"
         existing_files = [f for f in os.listdir(PRESENTATIONS_PATH) if f.startswith(base_name) and f.endswith('.pptx')]
         numbers = [int(f[len(base_name):-5]) for f in existing_files if f[len(base_name):-5].isdigit()]
@@ -580,9 +383,42 @@ def print_slides():
         final_path = os.path.join(PRESENTATIONS_PATH, final_name)
 
         final_ppt.save(final_path)
+        record_pptx(final_path, origins)
         print(f"\n✅ Presentation saved as {final_name} in 'Presentations' folder.")
 
 
+def compare_presentations():
+    """
+    Slide diff of two presentations (e.g. a deck and its Updated_ copy), read from the pptx zips.
+    """
+    presentations = list_files(PRESENTATIONS_PATH, '*.pptx')
+    if len(presentations) < 2:
+        print("❌ At least two presentations are needed to compare.")
+        return
+
+    print("\nAvailable Presentations:")
+    for i, f in enumerate(presentations, 1):
+        print(f"{i}. {f}")
+    try:
+        old_index, new_index = (int(part) - 1 for part in input("Old and new presentation (e.g., 1,2): ").split(","))
+        old_name, new_name = presentations[old_index], presentations[new_index]
+    except (ValueError, IndexError):
+        print("❌ Invalid selection.")
+        return
+
+    print(f"\n{old_name} → {new_name}:")
+    print(describe_diff(diff_decks(os.path.join(PRESENTATIONS_PATH, old_name),
+                                   os.path.join(PRESENTATIONS_PATH, new_name))))
+
+
+def _copied_slide_origin(slide_path, position=0):
+    # Lineage of a slide copied from a slide file: its charts, plus the file it came from
+    source_slides = pptx_slides(slide_path)
+    origin = dict(source_slides[position]) if position < len(source_slides) else {}
+    origin["source"] = slide_path
+    return origin
+
+
 # Supporting helper function to parse slide input 
 def parse_slide_input(input_str, max_num):
     slides = set()
@@ -608,6 +444,18 @@ def parse_slide_input(input_str, max_num):
 
 
 
+def select_for_delete(folder_path, files, prompt):
+    """
+    Files chosen by numbers ('1,3-4'), a glob ('ARPU_*.png') or age ('older:30' days).
+    """
+    delete_input = input(prompt).strip()
+    if delete_input.lower().startswith("older:"):
+        return list_files(folder_path, older_than_days=float(delete_input[6:]))
+    if any(ch in delete_input for ch in "*?["):
+        return list_files(folder_path, delete_input)
+    return [files[idx - 1] for idx in parse_selection_input(delete_input, len(files))]
+
+
 def delete(): 
     folder_map = {
         "1": ("Charts", CHARTS_PATH),
@@ -625,7 +473,7 @@ def delete():
         return
 
     folder_name, folder_path = folder_map[choice]
-    files = [f for f in os.listdir(folder_path) if os.path.isfile(os.path.join(folder_path, f))]
+    files = list_files(folder_path)
     if not files:
         print(f"No files found in {folder_name}.")
         return
@@ -635,34 +483,33 @@ def delete():
         print(f"{idx}. {f}")
 
     if choice != "3":
-        # For Charts and Slides — basic delete
-        delete_input = input("Enter file numbers to delete (e.g., 1,3-4): ").strip()
-        delete_indices = parse_selection_input(delete_input, len(files))
-        for idx in delete_indices:
-            file_to_delete = os.path.join(folder_path, files[idx - 1])
-            os.remove(file_to_delete)
-            print(f"✅ Deleted: {files[idx - 1]}")
+        # For Charts and Slides — numbers, glob or age, deleted in one go
+        to_delete = select_for_delete(folder_path, files, "Enter file numbers (e.g., 1,3-4), a pattern (e.g., ARPU_*) or 'older:30' (days): ")
+        if len(to_delete) > 1 and input(f"Delete {len(to_delete)} files? (y/n): ").strip().lower() != "y":
+            return
+        for name in delete_files(folder_path, to_delete):
+            print(f"✅ Deleted: {name}")
 
     else:
         # === Presentation Menu ===
         print("\nPresentation management options:")
         print("1. Delete Slides from Presentation")
-        print("2. Delete Entire Presentation")
+        print("2. Delete Entire Presentation(s)")
         sub_choice = input("Enter your choice (1 or 2): ").strip()
 
         if sub_choice not in {"1", "2"}:
             print("❌ Invalid option.")
             return
 
-        pres_num = input("Select presentation number: ").strip()
-        if not pres_num.isdigit() or int(pres_num) < 1 or int(pres_num) > len(files):
-            print("❌ Invalid presentation number.")
-            return
+        if sub_choice == "1":
+            pres_num = input("Select presentation number: ").strip()
+            if not pres_num.isdigit() or int(pres_num) < 1 or int(pres_num) > len(files):
+                print("❌ Invalid presentation number.")
+                return
 
-        pres_file = files[int(pres_num) - 1]
-        pres_path = os.path.join(folder_path, pres_file)
+            pres_file = files[int(pres_num) - 1]
+            pres_path = os.path.join(folder_path, pres_file)
 
-        if sub_choice == "1":
             # === Delete Slides ===
             prs = Presentation(pres_path)
             print(f"\nSlides in {pres_file}:")
@@ -670,19 +517,19 @@ def delete():
                 print(f"{i}. {slide.shapes.title.text if slide.shapes.title else 'Untitled Slide'}")
 
             del_input = input("Enter slide numbers to delete (e.g., 1,3-4): ").strip()
-            indices_to_delete = sorted(parse_selection_input(del_input, len(prs.slides)), reverse=True)
-
+            indices_to_delete = parse_selection_input(del_input, len(prs.slides))
+            size_before, size_after = delete_slides(pres_path, indices_to_delete)
             for idx in indices_to_delete:
-                delete_slide(prs, idx - 1)
                 print(f"✅ Deleted slide {idx}")
-
-            prs.save(pres_path)
-            print("✅ Presentation updated.")
+            print(f"✅ Presentation updated ({size_before / 1e6:.1f} MB -> {size_after / 1e6:.1f} MB).")
 
         elif sub_choice == "2":
-            # === Delete Entire Presentation ===
-            os.remove(pres_path)
-            print(f"✅ Deleted entire presentation: {pres_file}")
+            # === Delete Entire Presentation(s) ===
+            to_delete = select_for_delete(folder_path, files, "Select presentation number(s), a pattern or 'older:30' (days): ")
+            if len(to_delete) > 1 and input(f"Delete {len(to_delete)} presentations? (y/n): ").strip().lower() != "y":
+                return
+            for name in delete_files(folder_path, to_delete):
+                print(f"✅ Deleted entire presentation: {name}")
 
 
 # === Helper functions for Delete, Presentations ===
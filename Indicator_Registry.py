@@ -0,0 +1,141 @@
+import pandas as pd
+
+
+
+# === Indicator registry ===
+# One entry per chart indicator. Adding a metric means adding one entry here:
+#   aggregate  "sum" / "mean": base indicator, read from the "Key Indicator" rows
+#              "ratio": numerator / denominator of the aggregated dependencies (ratio of sums)
+#   depends    [numerator, denominator] for ratios; entries may depend on other derived ones
+#   factor     constant applied to a ratio (e.g. 1/12 for monthly ARPU)
+#   scale      unit scaling for charts (e.g. 1e-6 for millions, 100 for percent)
+#   label      y-axis label
+#   format     y-axis tick format: "millions", "percent" or a %-format string
+INDICATOR_REGISTRY = {
+    "ARPU": {
+        "aggregate": "ratio", "depends": ["Market Size", "Subscribers"], "factor": 1 / 12,
+        "scale": 1, "label": "ARPU (US$)", "format": "%.1f",
+    },
+    "Population": {
+        "aggregate": "sum", "scale": 1e-6, "label": "Population (Millions)", "format": "millions",
+    },
+    "Subscribers": {
+        "aggregate": "sum", "scale": 1e-6, "label": "Subscribers (Millions)", "format": "millions",
+    },
+    "Market Size": {
+        "aggregate": "sum", "scale": 1e-9, "label": "Market Size (Billions)", "format": "millions",
+    },
+    "Penetration Rate": {
+        "aggregate": "ratio", "depends": ["Subscribers", "Population"],
+        "scale": 100, "label": "Penetration Rate (%)", "format": "percent",
+    },
+    "Revenue per Capita": {
+        "aggregate": "ratio", "depends": ["Market Size", "Population"],
+        "scale": 1, "label": "Revenue per Capita (US$)", "format": "%.1f",
+    },
+}
+
+BASE_AGGREGATES = ("sum", "mean")
+
+# How groups (income groups, regions, World) combine their countries:
+#   total        registry rule: sums, and ratios of the summed dependencies
+#   mean         simple mean of the country values
+#   population   mean of the country values weighted by Population
+#   subscribers  mean of the country values weighted by Subscribers
+AGGREGATION_MODES = {
+    "total": "Totals",
+    "mean": "Simple mean",
+    "population": "Population-weighted mean",
+    "subscribers": "Subscriber-weighted mean",
+}
+MODE_WEIGHTS = {"population": "Population", "subscribers": "Subscribers"}
+
+
+
+def evaluation_order(registry=INDICATOR_REGISTRY):
+    """
+    Indicator names with every dependency before the indicators that use it.
+    """
+    order, visiting = [], set()
+
+    def visit(name):
+        if name in order:
+            return
+        if name in visiting:
+            raise ValueError(f"Circular indicator dependency at '{name}'.")
+        if name not in registry:
+            raise KeyError(f"Unknown indicator dependency: '{name}'.")
+        visiting.add(name)
+        for dep in registry[name].get("depends", []):
+            visit(dep)
+        visiting.discard(name)
+        order.append(name)
+
+    for name in registry:
+        visit(name)
+    return order
+
+
+def evaluate_wide(data, by, registry=INDICATOR_REGISTRY):
+    """
+    Evaluate every registered indicator for every group of `by` in one pass.
+    Base indicators come from one pivot per aggregation rule, derived ones are
+    vectorized column arithmetic in dependency order. Values are unscaled.
+    """
+    frames = []
+    for rule in BASE_AGGREGATES:
+        names = [name for name, spec in registry.items() if spec["aggregate"] == rule]
+        rows = data[data["Key Indicator"].isin(names)]
+        if not rows.empty:
+            frames.append(rows.pivot_table(index=by, columns="Key Indicator", values="Value", aggfunc=rule))
+    wide = pd.concat(frames, axis=1) if frames else pd.DataFrame(index=pd.MultiIndex.from_tuples([], names=by))
+    return derive_indicators(wide, registry)
+
+
+def derive_indicators(wide, registry=INDICATOR_REGISTRY):
+    """
+    Add the derived indicators to a wide table of aggregated base indicators (one column
+    per base indicator, missing ones allowed) and return all registered columns in order.
+    """
+    wide.columns.name = None
+    for name in evaluation_order(registry):
+        spec = registry[name]
+        if spec["aggregate"] in BASE_AGGREGATES:
+            if name not in wide.columns:
+                wide[name] = float("nan")
+            continue
+        if spec["aggregate"] != "ratio":
+            raise ValueError(f"Unknown aggregation rule for '{name}': {spec['aggregate']}")
+        numerator, denominator = spec["depends"]
+        wide[name] = wide[numerator] / wide[denominator] * spec.get("factor", 1)
+
+    return wide[list(registry)]
+
+
+def group_means(country_wide, by, weights=MODE_WEIGHTS, registry=INDICATOR_REGISTRY):
+    """
+    Simple and weighted means of every indicator over the country rows of country_wide,
+    grouped by the `by` columns. All modes come from a single groupby-sum of the value,
+    weighted value, weight and count columns. Returns {mode: wide table}.
+    """
+    values = country_wide[list(registry)]
+    present = values.notna()
+    parts = {"sum": values.fillna(0), "count": present.astype(float)}
+    for mode, weight_name in weights.items():
+        # Each indicator is weighted only where both the value and the weight exist
+        weight = country_wide[weight_name]
+        used = present & weight.notna().to_numpy()[:, None]
+        parts[f"{mode}_value"] = values.mul(weight, axis=0).where(used, 0)
+        parts[f"{mode}_weight"] = used.mul(weight.fillna(0), axis=0)
+    totals = pd.concat(parts, axis=1).groupby([country_wide[col] for col in by]).sum()
+
+    means = {"mean": totals["sum"] / totals["count"]}
+    for mode in weights:
+        means[mode] = totals[f"{mode}_value"] / totals[f"{mode}_weight"]
+    return means
+
+
+
+# === Module Guard ===
+if __name__ == "__main__":
+    print("This is a helper module. Please run ITU_Main.py instead.")
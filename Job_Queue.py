@@ -0,0 +1,161 @@
+import os
+import time
+import asyncio
+import functools
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from Create_Charts import _init_render_worker
+
+
+
+# === Worker side ===
+_shared_data = None  # the dataframe this worker received at start-up (JobQueue.share)
+
+
+class SharedData:
+    """
+    Stands in for the shared dataframe in a job's arguments, so it is not pickled per job.
+    """
+
+
+def _init_job_worker(data=None):
+    global _shared_data
+    _shared_data = data
+    _init_render_worker()
+
+
+def _run_job(fn, args, kwargs):
+    args = [_shared_data if isinstance(arg, SharedData) else arg for arg in args]
+    kwargs = {key: _shared_data if isinstance(value, SharedData) else value for key, value in kwargs.items()}
+    return fn(*args, **kwargs)
+
+
+# === Queue ===
+class JobQueue:
+    """
+    Background jobs of the menu loop. Chart renders and pptx saves run on a process pool
+    (matplotlib is not thread-safe), jobs that start their own pool run on a thread,
+    and a short notice is printed as each job finishes while the next prompt is open.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or min(os.cpu_count() or 1, 4)
+        self.shared = None
+        self.processes = self._process_pool()
+        self.threads = ThreadPoolExecutor(max_workers=2)
+        self.jobs = []
+        self._tasks = set()
+
+    def _process_pool(self, data=None):
+        return ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_job_worker, initargs=(data,))
+
+    def share(self, data):
+        """
+        Hand data (the loaded dataframe) to the worker processes once, at their start-up.
+        Process jobs passing this same object then send a placeholder instead of a pickled copy.
+        Jobs already queued finish on the previous pool.
+        """
+        previous = self.processes
+        self.processes = self._process_pool(data)
+        self.shared = data
+        previous.shutdown(wait=False)
+
+    def _placeholder(self, value):
+        return SharedData() if self.shared is not None and value is self.shared else value
+
+    def submit(self, label, fn, *args, thread=False, output=None, describe=None, **kwargs):
+        """
+        Queue fn(*args, **kwargs) and return the job record immediately.
+        output is the file the job will write (reserved until it exists);
+        describe(result) turns the result into the completion message.
+        """
+        if thread:
+            call = functools.partial(fn, *args, **kwargs)
+        else:
+            call = functools.partial(_run_job, fn, [self._placeholder(arg) for arg in args],
+                                     {key: self._placeholder(value) for key, value in kwargs.items()})
+        executor = self.threads if thread else self.processes
+        job = {
+            "id": len(self.jobs) + 1,
+            "label": label,
+            "output": output,
+            "submitted": time.perf_counter(),
+            "finished": None,
+            "future": executor.submit(call),
+            "result": None,
+            "error": None,
+        }
+        self.jobs.append(job)
+        task = asyncio.get_running_loop().create_task(self._track(job, describe))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        print(f"⏳ Job {job['id']} queued: {label}")
+        return job
+
+    async def _track(self, job, describe):
+        try:
+            job["result"] = await asyncio.wrap_future(job["future"])
+            message = describe(job["result"]) if describe else "done"
+            print(f"\n✅ Job {job['id']} finished ({self.elapsed(job):.1f}s): {job['label']} - {message}")
+        except Exception as e:
+            job["error"] = str(e)
+            print(f"\n❌ Job {job['id']} failed: {job['label']} - {e}")
+        finally:
+            job["finished"] = time.perf_counter()
+
+    @staticmethod
+    def status(job):
+        future = job["future"]
+        if job["finished"] is not None or future.done():
+            return "failed" if job["error"] or (future.done() and future.exception()) else "done"
+        return "running" if future.running() else "queued"
+
+    @staticmethod
+    def elapsed(job):
+        return (job["finished"] or time.perf_counter()) - job["submitted"]
+
+    def pending(self):
+        return [job for job in self.jobs if self.status(job) in ("queued", "running")]
+
+    def pending_outputs(self):
+        return [job["output"] for job in self.pending() if job["output"]]
+
+    def summary(self):
+        """
+        One line for the menu header, e.g. 'Jobs: 1 running, 2 queued, 4 done'.
+        """
+        counts = {}
+        for job in self.jobs:
+            counts[self.status(job)] = counts.get(self.status(job), 0) + 1
+        parts = [f"{counts[s]} {s}" for s in ("running", "queued", "done", "failed") if counts.get(s)]
+        return f"Jobs: {', '.join(parts)}" if parts else ""
+
+    def print_status(self):
+        if not self.jobs:
+            print("No background jobs yet.")
+            return
+        done = sum(self.status(job) in ("done", "failed") for job in self.jobs)
+        print(f"\nBackground jobs ({done}/{len(self.jobs)} finished):")
+        for job in self.jobs:
+            line = f"{job['id']:>3}. {self.status(job):<8} {self.elapsed(job):>6.1f}s  {job['label']}"
+            if job["error"]:
+                line += f"  ({job['error']})"
+            print(line)
+
+    async def drain(self):
+        """
+        Wait for every queued job, printing progress, then stop the executors.
+        """
+        pending = self.pending()
+        if pending:
+            print(f"⏳ Waiting for {len(pending)} background job(s) to finish...")
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+        self.processes.shutdown()
+        self.threads.shutdown()
+
+
+
+# === Module Guard ===
+if __name__ == "__main__":
+    print("This is a helper module. Please run ITU_Main.py instead.")
@@ -0,0 +1,125 @@
+import math
+from collections import defaultdict
+
+
+
+# Candidate spots around a point, tried in order: (dx, dy) as fractions of the label size
+# from the point to the label's lower-left corner, plus a pixel gap in that direction
+POINT_CANDIDATES = [
+    (0.0, -0.5, 1, 0),    # right
+    (-1.0, -0.5, -1, 0),  # left
+    (-0.5, 0.0, 0, 1),    # above
+    (-0.5, -1.0, 0, -1),  # below
+    (0.0, 0.0, 1, 1),     # upper right
+    (0.0, -1.0, 1, -1),   # lower right
+    (-1.0, 0.0, -1, 1),   # upper left
+    (-1.0, -1.0, -1, -1), # lower left
+]
+
+
+
+# === 1-D sweep ===
+def spread_positions(positions, min_gap, lower=None, upper=None):
+    """
+    Move 1-D label positions (e.g. end-of-series y in pixels) at least min_gap apart,
+    keeping each as close as possible to where it wants to be (least squares).
+    One sweep over the sorted positions merges colliding labels into blocks centred
+    on their targets (pool-adjacent-violators), so it is O(n log n) for the sort.
+    Returns the new positions in input order.
+    """
+    n = len(positions)
+    if n == 0:
+        return []
+    order = sorted(range(n), key=lambda i: positions[i])
+
+    # With z_k = y_k - k * gap the gap constraint becomes "z is non-decreasing"
+    blocks = []  # [mean z, count]
+    for k, i in enumerate(order):
+        blocks.append([positions[i] - k * min_gap, 1])
+        while len(blocks) > 1 and blocks[-2][0] >= blocks[-1][0]:
+            z, count = blocks.pop()
+            previous = blocks[-1]
+            previous[0] = (previous[0] * previous[1] + z * count) / (previous[1] + count)
+            previous[1] += count
+
+    placed = [0.0] * n
+    k = 0
+    for z, count in blocks:
+        for _ in range(count):
+            if upper is not None:
+                z_k = min(z, upper - (n - 1) * min_gap)
+            else:
+                z_k = z
+            if lower is not None:
+                z_k = max(z_k, lower)
+            placed[order[k]] = z_k + k * min_gap
+            k += 1
+    return placed
+
+
+# === 2-D grid ===
+class LabelGrid:
+    """
+    Uniform grid of occupied boxes (x0, y0, x1, y1), so a collision check only
+    looks at the boxes in the cells a candidate covers instead of every placed label.
+    """
+
+    def __init__(self, cell_size):
+        self.cell_size = max(cell_size, 1e-9)
+        self.cells = defaultdict(list)
+
+    def _cells(self, box):
+        x0, y0, x1, y1 = box
+        size = self.cell_size
+        for cx in range(math.floor(x0 / size), math.floor(x1 / size) + 1):
+            for cy in range(math.floor(y0 / size), math.floor(y1 / size) + 1):
+                yield cx, cy
+
+    def collides(self, box):
+        x0, y0, x1, y1 = box
+        for cell in self._cells(box):
+            for ox0, oy0, ox1, oy1 in self.cells.get(cell, ()):
+                if x0 < ox1 and ox0 < x1 and y0 < oy1 and oy0 < y1:
+                    return True
+        return False
+
+    def add(self, box):
+        for cell in self._cells(box):
+            self.cells[cell].append(box)
+
+
+def place_point_labels(points, sizes, bounds, obstacles=(), pad=4.0):
+    """
+    Greedy placement of one label next to each point, in the given (priority) order.
+    points: (x, y) anchors; sizes: (width, height) of each label; bounds: (x0, y0, x1, y1)
+    the labels must stay inside; obstacles: boxes labels must not cover (e.g. markers).
+    Returns the lower-left corner of each label, or None where no candidate spot was free.
+    """
+    if not points:
+        return []
+    cell_size = max(max(w for w, _ in sizes), max(h for _, h in sizes))
+    grid = LabelGrid(cell_size)
+    for box in obstacles:
+        grid.add(box)
+
+    bx0, by0, bx1, by1 = bounds
+    corners = []
+    for (x, y), (w, h) in zip(points, sizes):
+        corner = None
+        for fx, fy, gx, gy in POINT_CANDIDATES:
+            left, bottom = x + fx * w + gx * pad, y + fy * h + gy * pad
+            box = (left, bottom, left + w, bottom + h)
+            if box[0] < bx0 or box[1] < by0 or box[2] > bx1 or box[3] > by1:
+                continue
+            if not grid.collides(box):
+                grid.add(box)
+                corner = (left, bottom)
+                break
+        corners.append(corner)
+    return corners
+
+
+
+# === Module Guard ===
+if __name__ == "__main__":
+    print("This is a helper module. Please run ITU_Main.py instead.")
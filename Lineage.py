@@ -0,0 +1,112 @@
+import os
+import json
+import sqlite3
+from datetime import datetime
+
+
+
+# === Paths ===
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+LINEAGE_PATH = os.path.join(BASE_PATH, 'lineage.sqlite')
+
+# data hash -> chart spec -> chart files -> slides of a pptx (slide file or deck)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS charts (
+    path TEXT PRIMARY KEY,
+    sibling TEXT,
+    data_hash TEXT,
+    spec TEXT,
+    created TEXT
+);
+CREATE TABLE IF NOT EXISTS slides (
+    pptx TEXT,
+    position INTEGER,
+    layout INTEGER,
+    title TEXT,
+    charts TEXT,
+    chart_hashes TEXT,
+    source TEXT,
+    created TEXT,
+    PRIMARY KEY (pptx, position)
+);
+"""
+
+
+
+def _key(path):
+    return os.path.abspath(path) if path else None
+
+
+def connect(lineage_path=LINEAGE_PATH):
+    # Render and save jobs write from several processes; SQLite serializes them
+    con = sqlite3.connect(lineage_path, timeout=30)
+    con.executescript(SCHEMA)
+    return con
+
+
+def record_chart(paths, spec, data_hash, lineage_path=LINEAGE_PATH):
+    """
+    Record the chart files (JPEG and PNG of one chart) with the spec and data hash they came from.
+    """
+    paths = [_key(p) for p in paths]
+    now = datetime.now().isoformat(timespec="seconds")
+    rows = [
+        (path, next((p for p in paths if p != path), None), data_hash, json.dumps(spec), now)
+        for path in paths
+    ]
+    with connect(lineage_path) as con:
+        con.executemany("INSERT OR REPLACE INTO charts VALUES (?, ?, ?, ?, ?)", rows)
+    con.close()
+
+
+def record_pptx(pptx_path, slides, lineage_path=LINEAGE_PATH):
+    """
+    Replace the slide records of a pptx. slides: one dict per slide, in order, with
+    layout, title, charts (picture order), chart_hashes (content hash of each chart
+    when it was embedded) and source (slide file the slide was copied from).
+    """
+    now = datetime.now().isoformat(timespec="seconds")
+    rows = [
+        (_key(pptx_path), position, slide.get("layout"), slide.get("title"),
+         json.dumps([_key(c) for c in slide.get("charts", [])]),
+         json.dumps(list(slide.get("chart_hashes", []))),
+         _key(slide.get("source")), now)
+        for position, slide in enumerate(slides, 1)
+    ]
+    with connect(lineage_path) as con:
+        con.execute("DELETE FROM slides WHERE pptx = ?", (_key(pptx_path),))
+        con.executemany("INSERT INTO slides VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    con.close()
+
+
+def chart_record(chart_path, lineage_path=LINEAGE_PATH):
+    with connect(lineage_path) as con:
+        row = con.execute("SELECT path, sibling, data_hash, spec FROM charts WHERE path = ?",
+                          (_key(chart_path),)).fetchone()
+    con.close()
+    if row is None:
+        return None
+    return {"path": row[0], "sibling": row[1], "data_hash": row[2], "spec": json.loads(row[3])}
+
+
+def pptx_slides(pptx_path, lineage_path=LINEAGE_PATH):
+    """
+    Slide records of a pptx in slide order (empty if it was not built by this project).
+    """
+    with connect(lineage_path) as con:
+        rows = con.execute(
+            "SELECT layout, title, charts, chart_hashes, source FROM slides WHERE pptx = ? ORDER BY position",
+            (_key(pptx_path),)
+        ).fetchall()
+    con.close()
+    return [
+        {"layout": layout, "title": title, "charts": json.loads(charts),
+         "chart_hashes": json.loads(chart_hashes), "source": source}
+        for layout, title, charts, chart_hashes, source in rows
+    ]
+
+
+
+# === Module Guard ===
+if __name__ == "__main__":
+    print("This is a helper module. Please run ITU_Main.py instead.")
@@ -0,0 +1,233 @@
+import os
+import re
+import functools
+import pandas as pd
+from pptx.chart.data import CategoryChartData, XyChartData
+from pptx.dml.color import RGBColor
+from pptx.enum.chart import XL_CHART_TYPE, XL_LEGEND_POSITION
+from pptx.util import Pt
+
+from Create_Charts import (INDICATOR_REGISTRY, build_palette, spec_chart_data, y_axis_label, with_int_years,
+                           aggregate_all_entities, select_chart_data)
+from Slide_Builder import (SLIDES_PATH, new_presentation, stamp_layout, next_numbered_path, load_deck_spec,
+                           lineage_entry)
+from Lineage import record_pptx
+
+
+
+# Editable PowerPoint charts (chart XML plus an embedded workbook) instead of 300 dpi pictures
+NATIVE_CHART_TYPES = {
+    "line": XL_CHART_TYPE.LINE_MARKERS,
+    "bar": XL_CHART_TYPE.COLUMN_CLUSTERED,
+    "stacked": XL_CHART_TYPE.COLUMN_STACKED,
+    "100_stacked": XL_CHART_TYPE.COLUMN_STACKED_100,
+    "pie": XL_CHART_TYPE.PIE,
+    "scatter": XL_CHART_TYPE.XY_SCATTER,
+}
+
+# Values are already unit-scaled by create(), so formats only add the suffix
+NUMBER_FORMATS = {"percent": '0"%"', "millions": '#,##0"M"'}
+NATIVE_CHART_LAYOUT = 5  # 1-chart Slide
+
+
+
+def number_format(selected_indicators, chart_type):
+    """
+    Excel number format matching the matplotlib y-axis formatter of plot_chart.
+    """
+    if chart_type == "100_stacked":
+        return '0%'
+    if len(selected_indicators) != 1:
+        return 'General'
+    tick_format = INDICATOR_REGISTRY.get(selected_indicators[0], {}).get("format")
+    if tick_format in NUMBER_FORMATS:
+        return NUMBER_FORMATS[tick_format]
+    decimals = re.match(r'%\.(\d+)f', tick_format or "")
+    if decimals:
+        return '0' + ('.' + '0' * int(decimals.group(1)) if int(decimals.group(1)) else '')
+    return 'General'
+
+
+def _rgb(hex_color):
+    return RGBColor.from_string(hex_color.lstrip("#").upper())
+
+
+def _values(series):
+    return [None if pd.isna(v) else float(v) for v in series]
+
+
+def add_native_chart(slide, left, top, width, height, chart_data, selected_indicators, selected_years,
+                     chart_type, mode="total"):
+    """
+    Write the long (Year, Value, Country, Indicator) table of create() as a native chart
+    in the given frame, with the same series, palette and number formats as plot_chart.
+    """
+    if chart_type not in NATIVE_CHART_TYPES:
+        raise ValueError(f"'{chart_type}' charts are only rendered as pictures.")
+    chart_data = chart_data.copy()
+    chart_data["Hue"] = chart_data["Country"] + " - " + chart_data["Indicator"]
+    hue_list = list(chart_data["Hue"].unique())
+    palette = build_palette(hue_list)
+    fmt = number_format(selected_indicators, chart_type)
+
+    if chart_type == "pie":
+        pie_data = chart_data[chart_data["Year"] == selected_years[0]]
+        pie_data = pie_data.groupby("Hue")["Value"].sum().sort_values(ascending=False)
+        data = CategoryChartData()
+        data.categories = list(pie_data.index)
+        data.add_series(str(selected_years[0]), _values(pie_data))
+    elif chart_type == "scatter":
+        data = XyChartData()
+        for hue in hue_list:
+            series = data.add_series(hue, number_format=fmt)
+            for year, value in chart_data.loc[chart_data["Hue"] == hue, ["Year", "Value"]].itertuples(index=False):
+                series.add_data_point(int(year), float(value))
+    else:
+        wide = chart_data.pivot_table(index="Year", columns="Hue", values="Value", aggfunc="first").reindex(columns=hue_list)
+        if chart_type in ("stacked", "100_stacked"):
+            wide = wide.fillna(0)
+        data = CategoryChartData(number_format=fmt)
+        data.categories = [str(year) for year in wide.index]
+        for hue in hue_list:
+            data.add_series(hue, _values(wide[hue]))
+
+    frame = slide.shapes.add_chart(NATIVE_CHART_TYPES[chart_type], left, top, width, height, data)
+    chart = frame.chart
+    chart.font.name = 'Calibri'
+    chart.font.size = Pt(9)
+    chart.has_legend = True
+    chart.legend.position = XL_LEGEND_POSITION.BOTTOM
+    chart.legend.include_in_layout = False
+
+    plot = chart.plots[0]
+    if chart_type == "pie":
+        for point, hue in zip(plot.series[0].points, pie_data.index):
+            point.format.fill.solid()
+            point.format.fill.fore_color.rgb = _rgb(palette[hue])
+        plot.has_data_labels = True
+        plot.data_labels.show_percentage = True
+        plot.data_labels.show_value = False
+        plot.data_labels.number_format = '0.0%'
+        plot.data_labels.number_format_is_linked = False
+        return frame
+
+    for series, hue in zip(plot.series, hue_list):
+        color = _rgb(palette[hue])
+        if chart_type in ("line", "scatter"):
+            series.format.line.color.rgb = color
+            series.marker.format.fill.solid()
+            series.marker.format.fill.fore_color.rgb = color
+            if chart_type == "scatter":
+                series.format.line.fill.background()  # markers only, like sns.scatterplot
+        else:
+            series.format.fill.solid()
+            series.format.fill.fore_color.rgb = color
+    if chart_type in ("bar", "stacked", "100_stacked"):
+        plot.gap_width = 80
+        if chart_type != "bar":
+            plot.overlap = 100
+
+    value_axis = chart.value_axis
+    value_axis.tick_labels.number_format = fmt
+    value_axis.tick_labels.number_format_is_linked = False
+    value_axis.has_major_gridlines = False
+    value_axis.has_title = True
+    value_axis.axis_title.text_frame.text = y_axis_label(selected_indicators, chart_type, mode)
+    value_axis.axis_title.text_frame.paragraphs[0].runs[0].font.size = Pt(9)
+    return frame
+
+
+def native_chart(chart_data, spec):
+    """
+    Slot writer for Slide_Builder.stamp_layout: fills a picture slot with a native chart.
+    """
+    return functools.partial(_fill_slot, chart_data=chart_data, spec=spec)
+
+
+def _fill_slot(slide, left, top, width, height, chart_data, spec):
+    return add_native_chart(slide, left, top, width, height, chart_data, spec["selected_indicators"],
+                            spec["selected_years"], spec["chart_type"], spec.get("mode", "total"))
+
+
+def chart_title(spec):
+    names = spec["selected_names"]
+    shown = ", ".join(names[:4]) + (f" +{len(names) - 4}" if len(names) > 4 else "")
+    return f"{' & '.join(spec['selected_indicators'])}: {shown}"
+
+
+# === Slides and decks ===
+def native_chart_slide(df, selected_indicators, selected_years, chart_type, selected_names, mode="total",
+                       out=None, slides_path=SLIDES_PATH):
+    """
+    create() without rasterizing: one editable chart on a 1-chart slide. Returns the path, or None without data.
+    The lineage records the slide without charts: its data lives in the embedded workbook, so a
+    rebuild keeps it in place but never redraws it.
+    """
+    spec = {
+        "selected_indicators": selected_indicators, "selected_years": selected_years,
+        "chart_type": chart_type, "selected_names": selected_names, "mode": mode,
+    }
+    chart_data = spec_chart_data(df, spec)
+    if chart_data.empty:
+        print("❌ No data for any selected indicator.")
+        return None
+
+    if out is None:
+        os.makedirs(slides_path, exist_ok=True)
+        out = next_numbered_path(slides_path, f"slide_layout_{NATIVE_CHART_LAYOUT}")
+    prs = new_presentation()
+    stamp_layout(prs, NATIVE_CHART_LAYOUT, [native_chart(chart_data, spec)], chart_title(spec))
+    prs.save(out)
+    record_pptx(out, [lineage_entry(NATIVE_CHART_LAYOUT, [], chart_title(spec))])
+    return out
+
+
+def _deck_chart_data(df, spec, long_tables):
+    # Charts of a deck usually share indicators, years and mode: aggregate those once
+    if spec.get("group_column"):
+        return spec_chart_data(df, spec)
+    key = (tuple(spec["selected_indicators"]), tuple(spec["selected_years"]), spec.get("mode", "total"))
+    if key not in long_tables:
+        long_tables[key] = aggregate_all_entities(df, *key[:2], key[2])
+    return select_chart_data(long_tables[key], spec["selected_indicators"], spec["selected_names"])
+
+
+def prepare_native_deck(df, deck_spec, out=None):
+    """
+    Slide_Builder.prepare_deck where a chart entry may also be a chart spec
+    ({"selected_indicators", "selected_years", "chart_type", "selected_names", "mode"});
+    those are written as native charts from df, file paths are embedded as pictures.
+    """
+    deck_spec = load_deck_spec(deck_spec)
+    out = out or deck_spec.get("out")
+    if not out:
+        raise ValueError("Deck spec needs an output path ('out').")
+
+    df = with_int_years(df)
+    long_tables = {}
+    prs = new_presentation()
+    for slide_spec in deck_spec["slides"]:
+        charts = []
+        for chart in slide_spec.get("charts", []):
+            if isinstance(chart, dict):
+                chart_data = _deck_chart_data(df, chart, long_tables)
+                if chart_data.empty:
+                    print(f"⚠️ No data for '{chart_title(chart)}', slot left empty.")
+                    chart = None
+                else:
+                    chart = native_chart(chart_data, chart)
+            charts.append(chart)
+        stamp_layout(prs, int(slide_spec["layout"]), charts, slide_spec.get("title"))
+    prs.save(out)
+    # Only the picture charts are tracked; native charts are not redrawn by a rebuild
+    record_pptx(out, [
+        lineage_entry(int(slide_spec["layout"]), slide_spec.get("charts", []), slide_spec.get("title"))
+        for slide_spec in deck_spec["slides"]
+    ])
+    return out
+
+
+
+# === Module Guard ===
+if __name__ == "__main__":
+    print("This is a helper module. Please run ITU_Main.py instead.")
@@ -0,0 +1,280 @@
+import os
+import copy
+import json
+import shutil
+import hashlib
+from datetime import datetime
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from Indicator_Registry import INDICATOR_REGISTRY, BASE_AGGREGATES, derive_indicators
+
+
+
+# === Paths ===
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+DATA_STORE_PATH = os.path.join(BASE_PATH, 'Data_Store')
+MANIFEST_NAME = "_store.json"  # leading underscore: not read as data by pyarrow
+
+EXPECTED_COLUMNS = ['Key Indicator', 'WB Income Group', 'ITU Region', 'Country', 'Year', 'Value']
+STORE_SCHEMA = pa.schema([
+    ("Key Indicator", pa.string()),
+    ("WB Income Group", pa.string()),
+    ("ITU Region", pa.string()),
+    ("Country", pa.string()),
+    ("Year", pa.int32()),
+    ("Value", pa.float64()),
+])
+# Key Indicator=<name>/Year=<year>/part-0.parquet: indicator and year filters skip whole directories
+PARTITIONING = ds.partitioning(pa.schema([("Key Indicator", pa.string()), ("Year", pa.int32())]), flavor="hive")
+
+CHUNK_ROWS = 500_000  # rows read from a source file at a time
+SCAN_ROWS = 1_000_000  # scanned rows aggregated together; bounds query memory
+COMBINE_EVERY = 64  # partial aggregates kept before they are folded together
+
+
+
+# === Cleaning ===
+def parse_values(values):
+    """
+    Value column as numbers ("12.5%", "1,234" parse; anything else becomes NaN).
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        return values
+    cleaned = values.astype(str).str.replace('%', '').str.replace(',', '', regex=False)
+    return pd.to_numeric(cleaned, errors='coerce').where(values.notna())
+
+
+def coerce_values(df, source="Excel"):
+    """
+    Check the expected columns and parse Value ("12.5%", "1,234") as numbers;
+    rows without a numeric value are dropped.
+    """
+    missing = [col for col in EXPECTED_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns in {source}: {missing}")
+
+    df = df.dropna(subset=['Value'])
+    if not pd.api.types.is_numeric_dtype(df['Value']):
+        df['Value'] = parse_values(df['Value'])
+        df = df.dropna(subset=['Value'])
+    df['Key Indicator'] = df['Key Indicator'].astype(str)
+    return df
+
+
+# === Sources ===
+def iter_csv_chunks(path, chunk_rows=CHUNK_ROWS):
+    """
+    DataFrames of at most chunk_rows rows from a long-format CSV (also .csv.zip).
+    """
+    yield from pd.read_csv(path, usecols=EXPECTED_COLUMNS, chunksize=chunk_rows)
+
+
+def iter_excel_chunks(path, chunk_rows=CHUNK_ROWS):
+    """
+    DataFrames of at most chunk_rows rows from the first sheet of a workbook,
+    streamed row by row (openpyxl read-only mode) instead of loading the sheet.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [str(cell) if cell is not None else "" for cell in next(rows)]
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == chunk_rows:
+                yield pd.DataFrame(chunk, columns=header)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=header)
+    finally:
+        workbook.close()
+
+
+def iter_source_chunks(path, chunk_rows=CHUNK_ROWS):
+    if path.lower().endswith((".xlsx", ".xlsm")):
+        return iter_excel_chunks(path, chunk_rows)
+    return iter_csv_chunks(path, chunk_rows)
+
+
+# === Building ===
+def _store_batches(chunks, digest, counts):
+    for chunk in chunks:
+        chunk = coerce_values(chunk, "source")[EXPECTED_COLUMNS]
+        chunk = chunk.astype({"Year": "int32"}).reset_index(drop=True)
+        for column in ("WB Income Group", "ITU Region", "Country"):
+            chunk[column] = chunk[column].astype("string")
+        digest.update(pd.util.hash_pandas_object(chunk, index=False).values.tobytes())
+        counts["rows"] += len(chunk)
+        yield from pa.Table.from_pandas(chunk, schema=STORE_SCHEMA, preserve_index=False).to_batches()
+
+
+def build_store(source_paths, store_path=DATA_STORE_PATH, chunk_rows=CHUNK_ROWS):
+    """
+    Convert long-format sources (CSV, CSV.zip or Excel) into a Parquet store partitioned
+    by indicator and year, one chunk at a time, so memory stays bounded by chunk_rows.
+    The store is written next to the old one and swapped in at the end. Returns its manifest.
+    """
+    if isinstance(source_paths, str):
+        source_paths = [source_paths]
+    digest, counts = hashlib.sha1(), {"rows": 0}
+    chunks = (chunk for path in source_paths for chunk in iter_source_chunks(path, chunk_rows))
+
+    tmp_path = f"{store_path}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    ds.write_dataset(_store_batches(chunks, digest, counts), tmp_path, schema=STORE_SCHEMA, format="parquet",
+                     partitioning=PARTITIONING, basename_template="part-{i}.parquet",
+                     max_rows_per_group=chunk_rows, existing_data_behavior="overwrite_or_ignore")
+
+    manifest = {
+        "hash": digest.hexdigest(),
+        "rows": counts["rows"],
+        "sources": [os.path.basename(path) for path in source_paths],
+        "created": datetime.now().isoformat(timespec="seconds"),
+    }
+    with open(os.path.join(tmp_path, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    shutil.rmtree(store_path, ignore_errors=True)
+    os.replace(tmp_path, store_path)
+    return manifest
+
+
+def store_exists(store_path=DATA_STORE_PATH):
+    return os.path.exists(os.path.join(store_path, MANIFEST_NAME))
+
+
+# === Reading ===
+class ParquetStore:
+    """
+    Out-of-core stand-in for the loaded dataframe. The chart engine only asks it for
+    aggregated tables, distinct entities and a content hash; every query is a scan that
+    reads just the needed columns and partitions and folds groupby partials batch by batch.
+    """
+
+    def __init__(self, store_path=DATA_STORE_PATH):
+        if not store_exists(store_path):
+            raise FileNotFoundError(f"No Parquet store at {store_path}; build it with build_store().")
+        with open(os.path.join(store_path, MANIFEST_NAME), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self.path = store_path
+        self.dataset = ds.dataset(store_path, schema=STORE_SCHEMA, format="parquet", partitioning=PARTITIONING)
+        self.filter = None
+        self.conditions = []
+
+    def where(self, column, value):
+        """
+        A view of the rows where column == value (e.g. one income group); filters push down to the scan.
+        """
+        view = copy.copy(self)
+        expression = ds.field(column) == value
+        view.filter = expression if self.filter is None else self.filter & expression
+        view.conditions = self.conditions + [[column, value]]
+        return view
+
+    @property
+    def fingerprint(self):
+        # Data hash of the view: the content hash written at build time plus the filters
+        digest = hashlib.sha1(self.manifest["hash"].encode())
+        digest.update(json.dumps(self.conditions, default=str).encode())
+        return digest.hexdigest()
+
+    def _filter(self, expression=None):
+        if self.filter is None:
+            return expression
+        return self.filter if expression is None else self.filter & expression
+
+    def count_rows(self, expression=None):
+        return self.dataset.count_rows(filter=self._filter(expression))
+
+    def scan(self, columns=None, expression=None, rows=SCAN_ROWS):
+        """
+        Tables of about `rows` rows of the given columns, filtered at the scan. Small
+        fragments (one per indicator and year) are gathered so each table is worth a groupby.
+        """
+        buffered, count = [], 0
+        for batch in self.dataset.to_batches(columns=columns, filter=self._filter(expression), batch_size=rows):
+            if batch.num_rows:
+                buffered.append(batch)
+                count += batch.num_rows
+            if count >= rows:
+                yield pa.Table.from_batches(buffered)
+                buffered, count = [], 0
+        if buffered:
+            yield pa.Table.from_batches(buffered)
+
+    def to_pandas(self, columns=None, expression=None):
+        """
+        A filtered subset in memory, shaped like load_and_prepare_data() (for notebook analyses), e.g.
+        store.to_pandas(expression=ds.field("Country") == "Kenya").
+        """
+        df = self.dataset.to_table(columns=columns, filter=self._filter(expression)).to_pandas()
+        if "Year" in df:
+            df["Year"] = df["Year"].astype("int64")
+        return df
+
+    def distinct(self, columns):
+        """
+        Distinct non-null rows of the given columns, deduplicated per scanned table.
+        """
+        columns = list(columns)
+        expression = None
+        for column in columns:
+            valid = ds.field(column).is_valid()
+            expression = valid if expression is None else expression & valid
+        seen = set()
+        for table in self.scan(columns, expression):
+            unique = table.group_by(columns).aggregate([])
+            seen.update(zip(*(unique.column(column).to_pylist() for column in columns)))
+        return pd.DataFrame(sorted(seen), columns=columns)
+
+    def evaluate(self, by, registry=INDICATOR_REGISTRY):
+        """
+        evaluate_wide() over the store: base indicators are summed and counted per group in
+        each scanned batch, the partials are folded together, and derived indicators are
+        computed on the small result. A "World" column in `by` means all rows together.
+        """
+        by = list(by)
+        keys = [column for column in by if column != "World"]
+        rules = {name: spec["aggregate"] for name, spec in registry.items() if spec["aggregate"] in BASE_AGGREGATES}
+        expression = ds.field("Key Indicator").isin(list(rules))
+        for column in keys:
+            expression = expression & ds.field(column).is_valid()
+
+        group_keys = keys + ["Key Indicator"]
+        partials = []
+        for table in self.scan(group_keys + ["Value"], expression):
+            partials.append(table.group_by(group_keys).aggregate([("Value", "sum"), ("Value", "count")]))
+            if len(partials) >= COMBINE_EVERY:
+                partials = [_fold(partials, group_keys)]
+        if not partials:
+            return derive_indicators(pd.DataFrame(index=pd.MultiIndex.from_tuples([], names=by)), registry)
+
+        totals = _fold(partials, group_keys).to_pandas()
+        if "Year" in totals:
+            totals["Year"] = totals["Year"].astype("int64")
+        is_mean = totals["Key Indicator"].map(rules) == "mean"
+        totals["Value"] = totals["Value_sum"].where(~is_mean, totals["Value_sum"] / totals["Value_count"])
+        if "World" in by:
+            totals["World"] = "World"
+        wide = totals.pivot_table(index=by, columns="Key Indicator", values="Value", aggfunc="first")
+        return derive_indicators(wide, registry)
+
+
+def _fold(partials, group_keys):
+    table = pa.concat_tables(partials)
+    folded = table.group_by(group_keys).aggregate([("Value_sum", "sum"), ("Value_count", "sum")])
+    return folded.rename_columns([{"Value_sum_sum": "Value_sum", "Value_count_sum": "Value_count"}.get(name, name)
+                                  for name in folded.column_names])
+
+
+def is_store(data):
+    return isinstance(data, ParquetStore)
+
+
+
+# === Module Guard ===
+if __name__ == "__main__":
+    print("This is a helper module. Please run ITU_Main.py instead.")
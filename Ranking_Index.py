@@ -0,0 +1,122 @@
+import re
+import numpy as np
+import pandas as pd
+
+from Create_Charts import INDICATORS, SUBTOTAL_PATTERN, aggregate_all_entities, available_years
+
+
+
+LEVEL_ALIASES = {
+    "country": "Country", "countries": "Country",
+    "income": "WB Income Group", "incomegroup": "WB Income Group",
+    "region": "ITU Region", "regions": "ITU Region",
+}
+
+# e.g. top10:Subscribers:2023, bottom5:ARPU:2020:region
+SELECTION_PATTERN = re.compile(r'^(top|bottom)(\d+):([^:]+):(\d{4})(?::(\w+))?$', re.IGNORECASE)
+
+
+
+class RankingIndex:
+    """
+    Entities sorted by value once per (indicator, year, level), with rank and percentile.
+    top()/bottom() only slice the pre-sorted arrays, so a query costs O(n) in its output.
+    """
+
+    def __init__(self, long_data, entity="Country", indicator="Indicator", year="Year",
+                 value="Value", level="Level"):
+        data = long_data.dropna(subset=[value])
+        data = data[~data[entity].astype(str).str.match(SUBTOTAL_PATTERN.pattern)]  # not real countries
+        if level not in data.columns:
+            data = data.assign(**{level: "Country"})
+        data = data.sort_values([indicator, year, level, value], ascending=[True, True, True, False], kind="stable")
+
+        self.indicators = list(pd.unique(data[indicator]))
+        self._slices = {}
+        keys = data[[indicator, year, level]].to_numpy()
+        entities = data[entity].to_numpy(dtype=object)
+        values = data[value].to_numpy(dtype=float)
+
+        # Group boundaries of the sorted table: one contiguous block per key
+        change = np.ones(len(data), dtype=bool)
+        if len(data) > 1:
+            change[1:] = (keys[1:] != keys[:-1]).any(axis=1)
+        starts = np.flatnonzero(change)
+        ends = np.append(starts[1:], len(data))
+
+        for start, end in zip(starts, ends):
+            count = end - start
+            ranks = np.arange(1, count + 1)
+            percentiles = 100.0 * (count - ranks) / (count - 1) if count > 1 else np.array([100.0])
+            ind, yr, lvl = keys[start]
+            self._slices[(ind, int(yr), lvl)] = (entities[start:end], values[start:end], ranks, percentiles)
+
+    def _frame(self, entities, values, ranks, percentiles):
+        return pd.DataFrame({"Rank": ranks, "Entity": entities, "Value": values, "Percentile": percentiles})
+
+    def _get(self, indicator, year, level):
+        key = (indicator, int(year), level)
+        if key not in self._slices:
+            raise KeyError(f"No ranking for {indicator} in {year} ({level}).")
+        return self._slices[key]
+
+    def top(self, indicator, year, n=10, level="Country"):
+        entities, values, ranks, percentiles = self._get(indicator, year, level)
+        return self._frame(entities[:n], values[:n], ranks[:n], percentiles[:n])
+
+    def bottom(self, indicator, year, n=10, level="Country"):
+        entities, values, ranks, percentiles = (arr[::-1][:n] for arr in self._get(indicator, year, level))
+        return self._frame(entities, values, ranks, percentiles)
+
+    def rank_of(self, entity, indicator, year, level="Country"):
+        entities, values, ranks, percentiles = self._get(indicator, year, level)
+        hits = np.flatnonzero(entities == entity)
+        if not len(hits):
+            return None
+        i = hits[0]
+        return {"Rank": int(ranks[i]), "Value": values[i], "Percentile": percentiles[i], "Of": len(entities)}
+
+    def resolve_indicator(self, name):
+        """
+        Match an indicator by number (as in the create() menu) or case-insensitive name.
+        """
+        name = name.strip()
+        if name in INDICATORS:
+            return INDICATORS[name]
+        for indicator in self.indicators:
+            if indicator.lower().replace(" ", "") == name.lower().replace(" ", ""):
+                return indicator
+        raise KeyError(f"Unknown indicator: {name}")
+
+    def select(self, selection):
+        """
+        Entity names for a selection like 'top10:Subscribers:2023' or 'bottom5:ARPU:2020:region'.
+        """
+        match = SELECTION_PATTERN.match(selection.strip())
+        if not match:
+            raise ValueError(f"Not a ranking selection: {selection}")
+        direction, n, indicator, year, level = match.groups()
+        indicator = self.resolve_indicator(indicator)
+        level = LEVEL_ALIASES.get((level or "country").lower().replace("_", ""), "Country")
+        picked = (self.top if direction.lower() == "top" else self.bottom)(indicator, int(year), int(n), level)
+        return list(picked["Entity"])
+
+
+def is_ranking_selection(token):
+    return bool(SELECTION_PATTERN.match(token.strip()))
+
+
+def build_ranking_index(df, indicators=None, years=None):
+    """
+    Ranking index over all chart indicators and years of the loaded dataframe, built at load time.
+    Values are the aggregated, unit-scaled values plotted by create().
+    """
+    indicators = list(indicators or INDICATORS.values())
+    years = list(years or available_years(df))
+    return RankingIndex(aggregate_all_entities(df, indicators, years))
+
+
+
+# === Module Guard ===
+if __name__ == "__main__":
+    print("This is a helper module. Please run ITU_Main.py instead.")
@@ -0,0 +1,534 @@
+import os
+import re
+import copy
+import json
+import hashlib
+from pptx import Presentation
+from pptx.util import Pt, Cm
+from pptx.enum.shapes import MSO_SHAPE
+from pptx.dml.color import RGBColor
+from pptx.enum.text import PP_ALIGN
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.package import Part
+from pptx.oxml.ns import qn
+from lxml import etree
+from PIL import Image
+
+from Lineage import record_pptx
+
+
+
+# === Paths ===
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+SLIDES_PATH = os.path.join(BASE_PATH, 'Slides')
+EMBED_CACHE_PATH = os.path.join(BASE_PATH, 'Cache', 'embed')
+
+
+# === Slide geometry ===
+SLIDE_WIDTH = Cm(33.867)
+SLIDE_HEIGHT = Cm(19.05)
+CRIMSON = RGBColor(192, 0, 0)
+BLANK_LAYOUT = 6
+
+LAYOUT_NAMES = {
+    1: "Cover Slide",
+    2: "Executive Summary",
+    3: "2-chart Slide",
+    4: "3-chart Slide",
+    5: "1-chart Slide"
+}
+
+
+
+def add_textbox(slide, text, left, top, width, height, font_size,
+                bold=False, italic=False, align="left", bullet=False,
+                line_spacing=None, space_before=None, space_after=None,  font_color=RGBColor(0, 0, 0)):
+    box = slide.shapes.add_textbox(left, top, width, height)
+    frame = box.text_frame
+    frame.clear()
+
+    # zero margins
+    frame.margin_top = 0
+    frame.margin_bottom = 0
+    frame.margin_left = 0
+    frame.margin_right = 0
+
+    p = frame.paragraphs[0]
+    p.text = text
+    p.font.name = 'Calibri'
+    p.font.size = Pt(font_size)
+    p.font.bold = bold
+    p.font.italic = italic
+
+    if align == "center":
+        p.alignment = PP_ALIGN.CENTER
+    elif align == "right":
+        p.alignment = PP_ALIGN.RIGHT
+    else:
+        p.alignment = PP_ALIGN.LEFT
+
+    # *** Here's the bullet fix ***
+    if bullet:
+        p.bullet = True
+        p.level = 0
+        # The bullet character:
+        # This sets a proper bullet char and font for PowerPoint
+        run = p.runs[0]
+        run.text = text  # Ensure run has the correct text
+        run.font.name = 'Calibri'
+        run.font.color.rgb = RGBColor(0, 0, 0)  # Black bullet text color
+        # No need to use _element.set for bullet char here
+
+    else:
+        run = p.runs[0]
+        run.font.color.rgb = RGBColor(0, 0, 0)  # Default black text
+
+    return box
+
+
+
+def add_line(slide, top, width, left, thickness):
+    shape = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, left, top, width, Pt(1))
+    shape.fill.background()
+    shape.line.color.rgb = CRIMSON
+    shape.line.width = Pt(thickness)
+
+
+
+# === Layout definitions ===
+# Each function draws the static shapes of one layout on a blank slide
+# and returns the picture slots (left, top, width, height) in chart order.
+def add_title(slide, font_size=24, top=Cm(1), height=Cm(1.2), align="left"):
+    title_box = add_textbox(slide, "Adjust Title", left=Cm(2), top=top, width=Cm(30), height=height, font_size=font_size, bold=True, align=align)
+    title_box.name = "Title"
+    return title_box
+
+
+def draw_cover_slide(slide):
+    add_title(slide, font_size=32, top=Cm(7), height=Cm(1.5), align="center")
+    add_line(slide, top=Cm(8.5), width=Cm(30), left=Cm(2), thickness=1.2)
+    add_textbox(slide, "Adjust Text", left=Cm(2), top=Cm(17.5), width=Cm(30), height=Cm(1.5), font_size=16, bold=True, align="center")
+    return []
+
+
+def draw_executive_summary(slide):
+    add_title(slide)
+    add_line(slide, top=Cm(2.2), width=Cm(30), left=Cm(2), thickness=1)
+
+    # Bullet list text box
+    add_textbox(slide, text="Key Insight 1\nKey Insight 2\nKey Insight 3", left=Cm(2), top=Cm(2.7), width=Cm(30), height=Cm(12), font_size=14, bullet=True, line_spacing=Pt(12), space_before=Pt(0), space_after=Pt(0))
+    return []
+
+
+def add_chart_header(slide, left, top):
+    add_textbox(slide, "Adjust Header", left=left, top=top, width=Cm(14), height=Cm(0.6), font_size=12, bold=True)
+    add_line(slide, top=top + Cm(0.7), width=Cm(14), left=left, thickness=1)
+    return (left, top + Cm(0.9), Cm(14), Cm(6))
+
+
+def add_source(slide, title_right_x):
+    source_width = Cm(12)
+    source_left = title_right_x - source_width  # align right edge
+    add_textbox(slide, "Source: ITU", left=source_left, top=SLIDE_HEIGHT - Cm(1.5), width=source_width, height=Cm(1), font_size=8, italic=True, bold=True, align="right")
+
+
+def draw_two_chart_slide(slide):
+    # 1. Title and the line directly under it
+    title_box = add_title(slide)
+    title_right_x = title_box.left + title_box.width
+    add_line(slide, top=Cm(2.2), width=Cm(30), left=Cm(2), thickness=1)
+
+    # 2. Key Message textbox 0.4 cm below the line
+    add_textbox(slide, "Adjust Text", left=Cm(2), top=Cm(2.6), width=Cm(30), height=Cm(7), font_size=14, bold=True, bullet=True)
+
+    # 3. Left and right charts, right edge aligned to the title's right edge
+    top_y = Cm(2.6) + Cm(7) + Cm(0.5)
+    right_x = title_right_x - Cm(14)
+    slots = [
+        add_chart_header(slide, Cm(2), top_y),
+        add_chart_header(slide, right_x, top_y)
+    ]
+
+    add_source(slide, title_right_x)
+    return slots
+
+
+def draw_three_chart_slide(slide):
+    # 1. Title and the line directly under it
+    title_box = add_title(slide)
+    title_right_x = title_box.left + title_box.width
+    add_line(slide, top=Cm(2.2), width=Cm(30), left=Cm(2), thickness=1)
+
+    # 2. Key Message textbox 0.4 cm below the line
+    add_textbox(slide, "Adjust Text", left=Cm(2), top=Cm(2.6), width=Cm(30), height=Cm(0.8), font_size=14, bold=True, bullet=True)
+
+    # 3. Quadrant 1 (top-left text box), 0.2 cm below Key Message box
+    top_y = Cm(2.6) + Cm(0.8) + Cm(0.2)
+    add_textbox(slide, "Adjust Header", left=Cm(2), top=top_y, width=Cm(14), height=Cm(0.6), font_size=12, bold=True)
+    add_line(slide, top=top_y + Cm(0.7), width=Cm(14), left=Cm(2), thickness=1)
+    add_textbox(slide, "Adjust Text", left=Cm(2), top=top_y + Cm(0.9), width=Cm(14), height=Cm(4), font_size=11, bullet=True)
+
+    # 4. Quadrants 2-4: top-right, bottom-left and bottom-right charts
+    right_x = title_right_x - Cm(14)
+    bottom_y = top_y + Cm(7.0)  # Ensure no overlap
+    slots = [
+        add_chart_header(slide, right_x, top_y),
+        add_chart_header(slide, Cm(2), bottom_y),
+        add_chart_header(slide, right_x, bottom_y)
+    ]
+
+    add_source(slide, title_right_x)
+    return slots
+
+
+def draw_one_chart_slide(slide):
+    # Title, line and one chart across the full content width
+    title_box = add_title(slide)
+    title_right_x = title_box.left + title_box.width
+    add_line(slide, top=Cm(2.2), width=Cm(30), left=Cm(2), thickness=1)
+
+    add_source(slide, title_right_x)
+    return [(Cm(2), Cm(2.8), Cm(30), Cm(14.5))]
+
+
+LAYOUT_BUILDERS = {
+    1: draw_cover_slide,
+    2: draw_executive_summary,
+    3: draw_two_chart_slide,
+    4: draw_three_chart_slide,
+    5: draw_one_chart_slide
+}
+
+
+
+# === Chart embedding ===
+# Charts are saved at 300 dpi for a 14x6 inch figure but shown in 14x6 cm frames.
+# Before embedding they are resampled to EMBED_DPI for the frame size and,
+# optionally, recompressed as JPEG. Variants are cached by (source hash, size).
+EMBED_DPI = 200          # None embeds the original file unchanged
+EMBED_AS_JPEG = True
+EMBED_JPEG_QUALITY = 88
+EMU_PER_INCH = 914400
+
+_source_hashes = {}
+
+
+def file_hash(path):
+    """
+    SHA-1 of a file's content, memoized per (path, size, mtime).
+    """
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _source_hashes:
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        _source_hashes[key] = digest.hexdigest()
+    return _source_hashes[key]
+
+
+def embed_picture(chart_file, width, height, dpi=EMBED_DPI, as_jpeg=EMBED_AS_JPEG,
+                  quality=EMBED_JPEG_QUALITY, cache_path=EMBED_CACHE_PATH):
+    """
+    Return the path of a variant of chart_file sized for a width x height (EMU) frame at dpi.
+    Images are never upscaled; files Pillow cannot open are returned unchanged.
+    """
+    if not dpi:
+        return chart_file
+    target_w = max(1, round(width / EMU_PER_INCH * dpi))
+    target_h = max(1, round(height / EMU_PER_INCH * dpi))
+
+    ext = "jpeg" if as_jpeg else os.path.splitext(chart_file)[1].lstrip(".").lower()
+    cache_name = f"{file_hash(chart_file)[:20]}_{target_w}x{target_h}" + (f"_q{quality}" if as_jpeg else "") + f".{ext}"
+    cached = os.path.join(cache_path, cache_name)
+    if os.path.exists(cached):
+        return cached
+
+    try:
+        with Image.open(chart_file) as img:
+            # Keep the aspect ratio; cover the frame so PowerPoint only scales down
+            scale = min(1.0, max(target_w / img.width, target_h / img.height))
+            size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+            resized = img.resize(size, Image.LANCZOS) if scale < 1.0 else img.copy()
+    except OSError:
+        return chart_file
+
+    os.makedirs(cache_path, exist_ok=True)
+    tmp_path = f"{cached}.{os.getpid()}.tmp"
+    if as_jpeg:
+        if resized.mode in ("RGBA", "LA", "P"):
+            resized = resized.convert("RGBA")
+            background = Image.new("RGB", resized.size, (255, 255, 255))
+            background.paste(resized, mask=resized.getchannel("A"))
+            resized = background
+        resized.convert("RGB").save(tmp_path, format="JPEG", quality=quality, optimize=True, progressive=True)
+    else:
+        resized.save(tmp_path, format=resized.format or ext.upper().replace("JPG", "JPEG"), optimize=True)
+    os.replace(tmp_path, cached)
+    return cached
+
+
+# === Vector charts ===
+# SVG charts are embedded the way PowerPoint 2016+ inserts them: a PNG picture
+# (for older viewers) whose blip carries an svgBlip extension pointing at the SVG part.
+SVG_BLIP_URI = "{96DAC541-7B7A-43D3-8B79-37D633B846F1}"
+SVG_BLIP_NS = "http://schemas.microsoft.com/office/drawing/2016/SVG/main"
+
+
+def is_vector_chart(chart_file):
+    return isinstance(chart_file, str) and chart_file.lower().endswith(".svg")
+
+
+def svg_fallback_path(svg_file, cache_path=EMBED_CACHE_PATH):
+    """
+    Raster stand-in of an SVG chart, written by Create_Charts when the SVG is saved.
+    """
+    return os.path.join(cache_path, f"{file_hash(svg_file)[:20]}_fallback.png")
+
+
+def _blank_fallback(cache_path=EMBED_CACHE_PATH):
+    blank = os.path.join(cache_path, "blank_fallback.png")
+    if not os.path.exists(blank):
+        os.makedirs(cache_path, exist_ok=True)
+        Image.new("RGB", (1, 1), (255, 255, 255)).save(blank)
+    return blank
+
+
+def _svg_part(package, svg_file):
+    with open(svg_file, "rb") as f:
+        blob = f.read()
+    # A chart used on several slides is stored once
+    for part in package.iter_parts():
+        if part.partname.ext == "svg" and part.blob == blob:
+            return part
+    return Part(package.next_image_partname("svg"), "image/svg+xml", package, blob)
+
+
+def attach_svg(slide, picture, svg_file):
+    """
+    Point the svgBlip extension of a picture at svg_file (added or replaced).
+    """
+    rId = slide.part.relate_to(_svg_part(slide.part.package, svg_file), RT.IMAGE)
+    blip = picture._element.blipFill.blip
+    ext_lst = blip.find(qn("a:extLst"))
+    if ext_lst is None:
+        ext_lst = etree.SubElement(blip, qn("a:extLst"))
+    for ext in ext_lst.findall(qn("a:ext")):
+        if ext.get("uri") == SVG_BLIP_URI:
+            ext_lst.remove(ext)
+    ext = etree.SubElement(ext_lst, qn("a:ext"), uri=SVG_BLIP_URI)
+    svg_blip = etree.SubElement(ext, f"{{{SVG_BLIP_NS}}}svgBlip", nsmap={"asvg": SVG_BLIP_NS})
+    svg_blip.set(qn("r:embed"), rId)
+
+
+def picture_source(chart_file, width, height, dpi=EMBED_DPI, as_jpeg=EMBED_AS_JPEG):
+    """
+    The raster file a picture shape shows for chart_file (the fallback PNG for SVG charts).
+    """
+    if not is_vector_chart(chart_file):
+        return embed_picture(chart_file, width, height, dpi=dpi, as_jpeg=as_jpeg)
+    fallback = svg_fallback_path(chart_file)
+    if os.path.exists(fallback):
+        return fallback
+    print(f"⚠️ No PNG fallback for {os.path.basename(chart_file)}; older PowerPoint versions will show a blank picture.")
+    return _blank_fallback()
+
+
+def add_chart_picture(slide, chart_file, left, top, width, height, dpi=EMBED_DPI, as_jpeg=EMBED_AS_JPEG):
+    picture = slide.shapes.add_picture(picture_source(chart_file, width, height, dpi, as_jpeg),
+                                       left, top, width=width, height=height)
+    if is_vector_chart(chart_file):
+        attach_svg(slide, picture, chart_file)
+        picture.name = os.path.basename(chart_file)
+    return picture
+
+
+# === Layout template engine ===
+# The static shapes of every layout are drawn once on a scratch slide and
+# kept as XML; stamping a slide only deep-copies those elements.
+_LAYOUT_TEMPLATES = {}
+
+
+def new_presentation():
+    prs = Presentation()
+    prs.slide_width = SLIDE_WIDTH
+    prs.slide_height = SLIDE_HEIGHT
+    return prs
+
+
+def get_layout_template(layout):
+    """
+    Return (shape_elements, picture_slots) for a layout, building it on first use.
+    """
+    if layout not in LAYOUT_BUILDERS:
+        raise ValueError(f"Unknown slide layout: {layout}")
+    if layout not in _LAYOUT_TEMPLATES:
+        scratch = new_presentation()
+        slide = scratch.slides.add_slide(scratch.slide_layouts[BLANK_LAYOUT])
+        slots = LAYOUT_BUILDERS[layout](slide)
+        sp_tree = slide.shapes._spTree
+        elements = [el for el in sp_tree.iter_shape_elms()]
+        _LAYOUT_TEMPLATES[layout] = (elements, slots)
+    return _LAYOUT_TEMPLATES[layout]
+
+
+def layout_picture_count(layout):
+    return len(get_layout_template(layout)[1])
+
+
+def set_slide_title(slide, title):
+    for shape in slide.shapes:
+        if shape.name == "Title" and shape.has_text_frame:
+            # Keep the template's run formatting, only swap the text
+            shape.text_frame.paragraphs[0].runs[0].text = title
+            return shape
+    return None
+
+
+def stamp_layout(prs, layout, chart_files=(), title=None, embed_dpi=EMBED_DPI, embed_as_jpeg=EMBED_AS_JPEG):
+    """
+    Append a slide with the given layout to prs and fill its picture slots from chart_files.
+    An entry may also be a callable(slide, left, top, width, height) that fills the slot itself,
+    or None to leave the slot empty.
+    """
+    elements, slots = get_layout_template(layout)
+    if len(chart_files) < len(slots):
+        raise ValueError(f"Layout {layout} needs {len(slots)} charts, got {len(chart_files)}.")
+
+    slide = prs.slides.add_slide(prs.slide_layouts[BLANK_LAYOUT])
+    sp_tree = slide.shapes._spTree
+    for el in elements:
+        sp_tree.append(copy.deepcopy(el))
+
+    for chart_file, (left, top, width, height) in zip(chart_files, slots):
+        if chart_file is None:
+            continue
+        if callable(chart_file):
+            # Slot writer, e.g. a native PowerPoint chart instead of a picture
+            chart_file(slide, left, top, width, height)
+            continue
+        add_chart_picture(slide, chart_file, left, top, width, height, dpi=embed_dpi, as_jpeg=embed_as_jpeg)
+    if title:
+        set_slide_title(slide, title)
+    return slide
+
+
+def charts_to_slide_specs(chart_files, layout):
+    """
+    Split a list of charts into (layout, charts) specs, one slide per group of picture slots.
+    Leftover charts go on a last slide whose remaining slots are left empty (None).
+    """
+    per_slide = layout_picture_count(layout)
+    if per_slide == 0:
+        return [(layout, [])]
+    chart_files = list(chart_files)
+    return [
+        (layout, chart_files[i:i + per_slide] + [None] * max(0, i + per_slide - len(chart_files)))
+        for i in range(0, len(chart_files), per_slide)
+    ]
+
+
+def lineage_entry(layout, chart_files=(), title=None, source=None):
+    """
+    Lineage record of one stamped slide: which chart files, with which content, fill its pictures.
+    """
+    chart_files = [c for c in chart_files if isinstance(c, str)]
+    return {
+        "layout": layout, "title": title, "charts": chart_files,
+        "chart_hashes": [file_hash(c) if os.path.exists(c) else None for c in chart_files],
+        "source": source,
+    }
+
+
+def build_deck(slide_specs, save_path, embed_dpi=EMBED_DPI, embed_as_jpeg=EMBED_AS_JPEG):
+    """
+    Stamp every (layout, chart_files) spec into one presentation and save it once.
+    """
+    prs = new_presentation()
+    for layout, chart_files in slide_specs:
+        stamp_layout(prs, layout, chart_files, embed_dpi=embed_dpi, embed_as_jpeg=embed_as_jpeg)
+    prs.save(save_path)
+    record_pptx(save_path, [lineage_entry(layout, chart_files) for layout, chart_files in slide_specs])
+    return save_path
+
+
+# === Headless API ===
+# No dialogs and no Tkinter: usable in CI, on render servers and in benchmark loops.
+def prepare_slide(layout, charts=(), title=None, out=None, slides_path=SLIDES_PATH,
+                  embed_dpi=EMBED_DPI, embed_as_jpeg=EMBED_AS_JPEG):
+    """
+    Build a single-slide pptx and return its path.
+    Without out the slide is numbered like the interactive ones, e.g. Slides/slide_layout_3_2.pptx.
+    """
+    if out is None:
+        os.makedirs(slides_path, exist_ok=True)
+        out = next_numbered_path(slides_path, f"slide_layout_{layout}")
+    prs = new_presentation()
+    stamp_layout(prs, layout, list(charts), title, embed_dpi, embed_as_jpeg)
+    prs.save(out)
+    record_pptx(out, [lineage_entry(layout, charts, title)])
+    return out
+
+
+def load_deck_spec(deck_spec):
+    """
+    Accept a deck spec as a dict or as a path to a JSON file with the same content:
+    {"out": "Presentations/Deck.pptx",
+     "slides": [{"layout": 1, "title": "Mobile Voice"},
+                {"layout": 3, "charts": ["a.png", "b.png"], "title": "ARPU"}],
+     "embed_dpi": 200, "embed_as_jpeg": true}
+    embed_dpi and embed_as_jpeg are optional and default to EMBED_DPI and EMBED_AS_JPEG.
+    """
+    if isinstance(deck_spec, (str, os.PathLike)):
+        with open(deck_spec, encoding="utf-8") as f:
+            deck_spec = json.load(f)
+    if isinstance(deck_spec, list):
+        deck_spec = {"slides": deck_spec}
+    return deck_spec
+
+
+def prepare_deck(deck_spec, out=None):
+    """
+    Build every slide of a deck spec into one presentation, saved once. Returns the path.
+    """
+    deck_spec = load_deck_spec(deck_spec)
+    out = out or deck_spec.get("out")
+    if not out:
+        raise ValueError("Deck spec needs an output path ('out').")
+
+    embed_dpi = deck_spec.get("embed_dpi", EMBED_DPI)
+    embed_as_jpeg = deck_spec.get("embed_as_jpeg", EMBED_AS_JPEG)
+
+    prs = new_presentation()
+    for slide_spec in deck_spec["slides"]:
+        stamp_layout(prs, int(slide_spec["layout"]), list(slide_spec.get("charts", [])), slide_spec.get("title"),
+                     embed_dpi, embed_as_jpeg)
+    prs.save(out)
+    record_pptx(out, [
+        lineage_entry(int(slide_spec["layout"]), slide_spec.get("charts", []), slide_spec.get("title"))
+        for slide_spec in deck_spec["slides"]
+    ])
+    return out
+
+
+def next_numbered_path(folder, prefix, sep="_", reserved=()):
+    """
+    Next free path like <folder>/<prefix><sep><n>.pptx.
+    reserved holds paths that queued jobs will write but that do not exist yet.
+    """
+    pattern = re.compile(rf'{re.escape(prefix)}{re.escape(sep)}(\d+)\.pptx')
+    names = os.listdir(folder) + [os.path.basename(path) for path in reserved]
+    existing_indices = [
+        int(match.group(1))
+        for f in names
+        if (match := pattern.match(f))
+    ]
+    next_index = max(existing_indices, default=0) + 1
+    return os.path.join(folder, f"{prefix}{sep}{next_index}.pptx")
+
+
+
+# === Module Guard ===
+if __name__ == "__main__":
+    print("This is a helper module. Please run ITU_Main.py instead.")
@@ -0,0 +1,115 @@
+import os
+import json
+import hashlib
+import numpy as np
+
+
+
+# === Paths ===
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+GEOMETRY_PATH = os.path.join(BASE_PATH, 'world_countries_110m.json')
+MAP_CACHE_PATH = os.path.join(BASE_PATH, 'Cache', 'maps')
+
+# Bundled geometry: Natural Earth 1:110m countries (public domain), outer rings only,
+# simplified and rounded to 0.01 degrees, keyed by ISO3. States too small for that scale
+# are listed as points and drawn as markers.
+_PROJECTED = {}
+
+
+
+# === Projection ===
+def equal_earth(lon, lat):
+    """
+    Equal Earth projection (Šavrič, Patterson & Jenny 2018) of degrees, on a unit sphere.
+    """
+    a1, a2, a3, a4 = 1.340264, -0.081106, 0.000893, 0.003796
+    lam, phi = np.radians(lon), np.radians(lat)
+    theta = np.arcsin(np.sqrt(3) / 2 * np.sin(phi))
+    t2 = theta * theta
+    t6 = t2 * t2 * t2
+    x = 2 * np.sqrt(3) * lam * np.cos(theta) / (3 * (a1 + 3 * a2 * t2 + t6 * (7 * a3 + 9 * a4 * t2)))
+    y = theta * (a1 + a2 * t2 + t6 * (a3 + a4 * t2))
+    return x, y
+
+
+def plate_carree(lon, lat):
+    return np.asarray(lon, dtype=float), np.asarray(lat, dtype=float)
+
+
+PROJECTIONS = {
+    "equal_earth": equal_earth,
+    "plate_carree": plate_carree,
+}
+
+
+# === Projected geometry ===
+def _geometry_key(geometry_path, projection):
+    digest = hashlib.sha1()
+    with open(geometry_path, "rb") as f:
+        digest.update(f.read())
+    digest.update(projection.encode())
+    return digest.hexdigest()[:20]
+
+
+def _project(geometry_path, projection):
+    with open(geometry_path, encoding="utf-8") as f:
+        geometry = json.load(f)
+    project = PROJECTIONS[projection]
+
+    ring_isos, rings = [], []
+    for iso, country in geometry["countries"].items():
+        for ring in country["rings"]:
+            ring_isos.append(iso)
+            rings.append(np.asarray(ring, dtype=float))
+    coords = np.concatenate(rings)
+    x, y = project(coords[:, 0], coords[:, 1])
+    offsets = np.cumsum([0] + [len(ring) for ring in rings])
+
+    point_isos = list(geometry.get("points", {}))
+    lonlat = np.asarray([geometry["points"][iso] for iso in point_isos], dtype=float).reshape(-1, 2)
+    px, py = project(lonlat[:, 0], lonlat[:, 1])
+    return {
+        "coords": np.column_stack([x, y]),
+        "offsets": offsets,
+        "ring_isos": np.asarray(ring_isos),
+        "point_isos": np.asarray(point_isos),
+        "points": np.column_stack([px, py]),
+    }
+
+
+def projected_geometry(projection="equal_earth", geometry_path=GEOMETRY_PATH, cache_path=MAP_CACHE_PATH):
+    """
+    Projected country rings and small-state points, cached in memory and as an .npz in
+    Cache/maps keyed by the geometry file and projection, so only the first map ever projects.
+    Returns {"rings": [array (n, 2)], "ring_isos", "point_isos", "points"}.
+    """
+    key = _geometry_key(geometry_path, projection)
+    if key in _PROJECTED:
+        return _PROJECTED[key]
+
+    cache_file = os.path.join(cache_path, f"{key}_{projection}.npz")
+    if os.path.exists(cache_file):
+        with np.load(cache_file) as cached:
+            arrays = {name: cached[name] for name in cached.files}
+    else:
+        arrays = _project(geometry_path, projection)
+        os.makedirs(cache_path, exist_ok=True)
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_file, **arrays)
+        os.replace(tmp_file, cache_file)
+
+    offsets = arrays["offsets"]
+    geometry = {
+        "rings": [arrays["coords"][start:end] for start, end in zip(offsets[:-1], offsets[1:])],
+        "ring_isos": arrays["ring_isos"],
+        "point_isos": arrays["point_isos"],
+        "points": arrays["points"],
+    }
+    _PROJECTED[key] = geometry
+    return geometry
+
+
+
+# === Module Guard ===
+if __name__ == "__main__":
+    print("This is a helper module. Please run ITU_Main.py instead.")